@@ -1,3 +1,14 @@
 # ASL Recognition package
-from asl_recognition.utils import landmark_extraction
-from asl_recognition.models import classifier 
\ No newline at end of file
+# Submodules are imported on first access, so importing the package (e.g. for
+# asl_recognition.models.inference) does not load MediaPipe or scikit-learn
+import importlib
+
+_SUBMODULES = {
+    'landmark_extraction': 'asl_recognition.utils.landmark_extraction',
+    'classifier': 'asl_recognition.models.classifier'
+}
+
+def __getattr__(name):
+    if name in _SUBMODULES:
+        return importlib.import_module(_SUBMODULES[name])
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
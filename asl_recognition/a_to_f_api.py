@@ -1,14 +1,15 @@
-from fastapi import FastAPI, File, UploadFile, HTTPException, Form
+from fastapi import FastAPI, File, UploadFile, HTTPException, Form, Request
 from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.concurrency import run_in_threadpool
 import numpy as np
 import cv2
-import mediapipe as mp
 from io import BytesIO
 import base64
+import logging
 import uvicorn
 from pydantic import BaseModel
-from typing import Optional, List, Dict
+from typing import Optional, List, Dict, Union, Literal
 import os
 import sys
 
@@ -19,12 +20,30 @@ if parent_dir not in sys.path:
 
 # Use relative imports when running as a module or absolute when running directly
 try:
-    from utils.landmark_extraction import extract_landmarks, normalize_landmarks
+    from utils.landmark_extraction import extract_landmarks, normalize_landmarks, HandsPool
+    from utils.admission import AdmissionController, client_id_from_request
+    from utils.batching import MicroBatcher
+    from utils.motion_gate import MotionGate
+    from utils.degradation import DegradationController, decode_image
+    from utils.traffic import TrafficRecorder
+    from utils.logging_utils import setup_logging, get_logger, RequestLog
+    from utils.response_encoding import encode_response, encode_batch_response
     from models.a_to_f_classifier import ASLAtoFClassifier
 except ImportError:
-    from asl_recognition.utils.landmark_extraction import extract_landmarks, normalize_landmarks
+    from asl_recognition.utils.landmark_extraction import extract_landmarks, normalize_landmarks, HandsPool
+    from asl_recognition.utils.admission import AdmissionController, client_id_from_request
+    from asl_recognition.utils.batching import MicroBatcher
+    from asl_recognition.utils.motion_gate import MotionGate
+    from asl_recognition.utils.degradation import DegradationController, decode_image
+    from asl_recognition.utils.traffic import TrafficRecorder
+    from asl_recognition.utils.logging_utils import setup_logging, get_logger, RequestLog
+    from asl_recognition.utils.response_encoding import encode_response, encode_batch_response
     from asl_recognition.models.a_to_f_classifier import ASLAtoFClassifier
 
+# Configure logging (level, sampling and format come from ASL_LOG_* environment variables)
+setup_logging()
+logger = get_logger('a_to_f_api')
+
 # Initialize FastAPI app
 app = FastAPI(
     title="ASL A-F Recognition API",
@@ -41,35 +60,90 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialize MediaPipe Hands
-mp_hands = mp.solutions.hands
-hands = mp_hands.Hands(
+# Admission control for the prediction endpoints (configured from ASL_* environment variables)
+admission = AdmissionController.from_env()
+
+# Initialize MediaPipe Hands, one instance per concurrent request
+hands_pool = HandsPool(
+    admission.max_concurrency,
     static_image_mode=True,
     max_num_hands=1,
     min_detection_confidence=0.5  # Same as in api.py
 )
 
+# Lighter Hands instances used when the server is overloaded
+lite_hands_pool = HandsPool(
+    admission.max_concurrency,
+    static_image_mode=True,
+    max_num_hands=1,
+    min_detection_confidence=0.5,
+    model_complexity=0
+)
+
+# Degrade quality under overload (configured from ASL_DEGRADE_* environment variables)
+degradation = DegradationController.from_env()
+
 # Initialize the ASL classifier
 classifier = ASLAtoFClassifier()
 MODEL_PATH = os.path.join(os.path.dirname(__file__), 'data/asl_a_to_f_model.pkl')
 
+# Batch classifier calls from concurrent requests (configured from ASL_BATCH_* environment variables);
+# requests served at the 'fewer_trees' degradation level are batched separately
+def predict_batch(landmarks):
+    return classifier.predict_batch(landmarks)
+
+def predict_batch_fewer_trees(landmarks):
+    return classifier.predict_batch(landmarks, tree_fraction=degradation.tree_fraction)
+
+batcher = MicroBatcher.from_env(predict_batch)
+fewer_trees_batcher = MicroBatcher.from_env(predict_batch_fewer_trees)
+
+# Reuse predictions while a session's hand is not moving (configured from ASL_MOTION_* environment variables)
+motion_gate = MotionGate.from_env()
+
+# Opt-in sampling of requests into a traffic log for replay (configured from ASL_RECORD_* environment variables)
+recorder = TrafficRecorder.from_env()
+
+# Largest number of images accepted by /predict/batch
+MAX_BATCH_IMAGES = int(os.environ.get('ASL_MAX_BATCH_IMAGES', 64))
+
+# Map 0->A, 1->B, 2->C, 3->D, 4->E, 5->F for models saved without a label mapping
+LETTER_MAP = {0: 'A', 1: 'B', 2: 'C', 3: 'D', 4: 'E', 5: 'F'}
+A_TO_F_LETTERS = {"A", "B", "C", "D", "E", "F"}
+
+def load_model():
+    """
+    Load the classifier unless it is already loaded.
+    
+    run_api calls this before forking its workers so they share one copy.
+    """
+    if classifier.model is None:
+        classifier.load(MODEL_PATH, inference_only=True)
+        logger.info("Model loaded successfully from %s", MODEL_PATH)
+
 # Load the model on startup
 @app.on_event("startup")
 async def startup_event():
     try:
-        classifier.load(MODEL_PATH)
-        print(f"Model loaded successfully from {MODEL_PATH}")
+        load_model()
     except Exception as e:
-        print(f"Error loading model: {e}")
+        logger.error("Error loading model: %s", e)
         # Continue without model, endpoints will handle errors
 
 # Response models
+# Landmarks are dicts, a flat list of 63 floats or a base64 packed float32 buffer
+# depending on the requested landmark format
 class PredictionResponse(BaseModel):
     sign: str
     confidence: float
-    landmarks: List[Dict[str, float]]
+    landmarks: Union[List[Dict[str, float]], List[float], str]
     has_hand: bool
+    degradation_level: int = 0
     is_a_to_f: bool
+    error: Optional[str] = None
+
+# Landmark payload format, chosen per request with ?landmarks=...
+LandmarkFormat = Literal["dicts", "flat", "packed", "none"]
 
 class HealthResponse(BaseModel):
     status: str
@@ -84,204 +158,417 @@ async def health_check():
         "model_loaded": model_loaded
     }
 
+# Metrics endpoint
+@app.get("/metrics")
+async def metrics():
+    return {
+        "admission": admission.stats(),
+        "batching": batcher.stats(),
+        "batching_fewer_trees": fewer_trees_batcher.stats(),
+        "motion_gate": motion_gate.stats(),
+        "degradation": degradation.stats(),
+        "recording": recorder.stats(),
+        "model": {
+            "model_type": classifier.model_type,
+            "feature_reduction": classifier.reducer.describe() if classifier.reducer else None,
+            "cascade": classifier.model.stats() if classifier.model_type == 'cascade' else None
+        }
+    }
+
+@app.get("/metrics/sessions/{session_id}")
+async def session_metrics(session_id: str):
+    stats = motion_gate.session_stats(session_id)
+    if stats is None:
+        raise HTTPException(status_code=404, detail="Unknown session")
+    return stats
+
+def batcher_for_level(level):
+    """
+    Returns:
+        The micro-batcher serving requests at the given degradation level
+    """
+    return fewer_trees_batcher if degradation.classifier_tree_fraction(level) < 1.0 else batcher
+
+def classify(normalized_landmarks, session_id, request_log, level=0):
+    """
+    Classify normalized landmarks, reusing the session's last prediction
+    when the hand has not moved.
+
+    Args:
+        normalized_landmarks: Normalized landmark vector
+        session_id: Value of the X-Session-ID header, or None
+        request_log: RequestLog for the request
+        level: Degradation level the request is served at
+
+    Returns:
+        label, confidence
+    """
+    level_batcher = batcher_for_level(level)
+
+    if session_id is None or not motion_gate.enabled:
+        return level_batcher.predict(normalized_landmarks)
+
+    prediction = motion_gate.lookup(session_id, normalized_landmarks)
+    if prediction is not None:
+        request_log.fields['reused'] = True
+        return prediction
+
+    prediction = level_batcher.predict(normalized_landmarks)
+    motion_gate.store(session_id, normalized_landmarks, prediction)
+    return prediction
+
+def detect_landmarks(image_data, request_log, level):
+    """
+    Decode an image and detect the landmarks of its hand.
+
+    Args:
+        image_data: Encoded image bytes (JPEG, PNG, ...)
+        request_log: RequestLog collecting stage timings
+        level: Degradation level the request is served at
+
+    Returns:
+        (21, 3) numpy array of landmarks, or None if no hand was found
+
+    Raises:
+        HTTPException: 400 if the image cannot be decoded
+    """
+    with request_log.stage('decode'):
+        # Large JPEGs are decoded at reduced resolution when degraded
+        image = decode_image(image_data, degradation.image_max_side(level))
+
+    if image is None:
+        raise HTTPException(status_code=400, detail="Invalid image format")
+
+    with request_log.stage('detect'):
+        # Convert to RGB (MediaPipe requires RGB input)
+        image_rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+
+        # Process the image with MediaPipe
+        pool = lite_hands_pool if degradation.model_complexity(level) == 0 else hands_pool
+        with pool.acquire() as hands:
+            results = hands.process(image_rgb)
+
+    # Check if hand is detected
+    if not results.multi_hand_landmarks:
+        return None
+
+    # Extract landmarks
+    landmarks_array = np.zeros((21, 3))
+    for i, landmark in enumerate(results.multi_hand_landmarks[0].landmark):
+        landmarks_array[i] = [landmark.x, landmark.y, landmark.z]
+    return landmarks_array
+
+def no_hand_result(level):
+    return {
+        "sign": "no_hand",
+        "confidence": 0.0,
+        "landmarks": None,
+        "has_hand": False,
+        "is_a_to_f": False,
+        "degradation_level": level
+    }
+
+def prediction_error_result(level):
+    # A hand was found but could not be classified
+    return {
+        "sign": "error",
+        "confidence": 0.0,
+        "landmarks": None,
+        "has_hand": True,
+        "is_a_to_f": False,
+        "degradation_level": level
+    }
+
+def letter_result(label, confidence, landmarks_array, level):
+    """
+    Build the prediction dictionary for a classified hand.
+
+    Args:
+        label: Label returned by the classifier
+        confidence: Confidence of the label
+        landmarks_array: Raw (21, 3) landmarks of the hand
+        level: Degradation level the request was served at
+
+    Returns:
+        Prediction dictionary
+    """
+    # Handle numeric labels by converting to letters (0-5 -> A-F)
+    if label.isdigit() and int(label) in LETTER_MAP:
+        label = LETTER_MAP[int(label)]
+
+    # Check if the predicted sign is in A-F range
+    is_a_to_f = label.upper() in A_TO_F_LETTERS
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Prediction %s (%.3f), is A-F: %s", label, confidence, is_a_to_f)
+
+    return {
+        "sign": label,
+        "confidence": float(confidence),
+        "landmarks": landmarks_array,
+        "has_hand": True,
+        "is_a_to_f": is_a_to_f,
+        "degradation_level": level
+    }
+
+def predict_from_image_data(image_data, request_log, session_id=None):
+    """
+    Run the full prediction pipeline on encoded image bytes.
+
+    Args:
+        image_data: Encoded image bytes (JPEG, PNG, ...)
+        request_log: RequestLog collecting stage timings and the outcome
+        session_id: Optional session identifier enabling motion-gated reuse
+
+    Returns:
+        Prediction dictionary; 'landmarks' holds the raw (21, 3) array, or
+        None when there is nothing to return, and is encoded by encode_response
+    """
+    # Quality level for this request, chosen by the degradation controller
+    level = degradation.level
+    request_log.fields['degradation_level'] = level
+
+    try:
+        landmarks_array = detect_landmarks(image_data, request_log, level)
+    except HTTPException:
+        request_log.outcome = 'invalid_image'
+        raise
+
+    if landmarks_array is None:
+        request_log.outcome = 'no_hand'
+        return no_hand_result(level)
+
+    with request_log.stage('normalize'):
+        normalized_landmarks = normalize_landmarks(landmarks_array)
+
+    # Make prediction
+    if not hasattr(classifier, 'model') or classifier.model is None:
+        logger.error("Model is not loaded properly")
+        request_log.outcome = 'model_not_loaded'
+        return prediction_error_result(level)
+
+    try:
+        with request_log.stage('classify'):
+            label, confidence = classify(normalized_landmarks, session_id, request_log, level)
+        result = letter_result(label, confidence, landmarks_array, level)
+    except Exception as e:
+        logger.error("Prediction error: %s", e, exc_info=logger.isEnabledFor(logging.DEBUG))
+        request_log.outcome = 'prediction_error'
+        return prediction_error_result(level)
+
+    request_log.outcome = 'ok'
+    request_log.fields['sign'] = result["sign"]
+    return result
+
+def response_headers(request_log):
+    headers = {"X-Request-ID": request_log.request_id,
+               "Server-Timing": request_log.server_timing()}
+    if request_log.fields.get('reused'):
+        headers["X-Prediction-Reused"] = "1"
+    if 'degradation_level' in request_log.fields:
+        headers["X-Degradation-Level"] = str(request_log.fields['degradation_level'])
+    return headers
+
+def observe_load(request_log, batch=False):
+    """
+    Report a finished request to the degradation controller.
+
+    Only single-image requests that were processed contribute a latency;
+    rejections and batches still report the queue depth.
+
+    Args:
+        request_log: RequestLog of the finished request
+        batch: Whether the request was a batch request
+    """
+    processed = request_log.outcome in ('ok', 'no_hand')
+    latency_ms = request_log.elapsed_ms() if processed and not batch else None
+    degradation.observe(latency_ms, admission.queue_depth)
+
+def record_traffic(request, request_log, image_data, result, content_type=None, batch_index=None):
+    """
+    Record a finished request in the traffic log if it is sampled.
+
+    Args:
+        request: Incoming request
+        request_log: RequestLog of the finished request
+        image_data: Encoded image bytes, or None if they were never read
+        result: Prediction dictionary, or None if the request failed
+        content_type: Media type of the upload
+        batch_index: Position of the image in a batch request, or None
+    """
+    if image_data is None or not recorder.sample():
+        return
+    recorder.record(request_log, image_data, result,
+                    session_id=request.headers.get("X-Session-ID"),
+                    client_id=client_id_from_request(request),
+                    content_type=content_type, batch_index=batch_index)
+
 # Prediction endpoint for uploaded images
 @app.post("/predict", response_model=PredictionResponse)
-async def predict_sign(file: UploadFile = File(...)):
+async def predict_sign(request: Request, file: UploadFile = File(...),
+                       landmarks: LandmarkFormat = "dicts"):
     # Validate file
     if not file.content_type.startswith("image/"):
         raise HTTPException(status_code=400, detail="File must be an image")
     
+    request_log = RequestLog(logger, "/predict", request.headers.get("X-Request-ID"))
+    contents = result = None
     try:
         # Read image
         contents = await file.read()
-        nparr = np.frombuffer(contents, np.uint8)
-        image = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-        
-        if image is None:
-            raise HTTPException(status_code=400, detail="Invalid image format")
-        
-        # Convert to RGB (MediaPipe requires RGB input)
-        image_rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-        
-        # Process the image with MediaPipe
-        results = hands.process(image_rgb)
-        
-        # Check if hand is detected
-        if not results.multi_hand_landmarks:
-            return {
-                "sign": "no_hand",
-                "confidence": 0.0,
-                "landmarks": [],
-                "has_hand": False,
-                "is_a_to_f": False
-            }
-        
-        # Extract landmarks
-        landmarks_array = np.zeros((21, 3))
-        for i, landmark in enumerate(results.multi_hand_landmarks[0].landmark):
-            landmarks_array[i] = [landmark.x, landmark.y, landmark.z]
-        
-        # Normalize landmarks
-        normalized_landmarks = normalize_landmarks(landmarks_array)
-        
-        # Make prediction
-        try:
-            if not hasattr(classifier, 'model') or classifier.model is None:
-                print("ERROR: Model is not loaded properly")
-                return {
-                    "sign": "error",
-                    "confidence": 0.0,
-                    "landmarks": [],
-                    "has_hand": True,
-                    "is_a_to_f": False
-                }
-            
-            print(f"Making prediction with normalized landmarks shape: {normalized_landmarks.shape}")
-            label, confidence = classifier.predict(normalized_landmarks)
-            
-            # Handle numeric labels by converting to letters (0-5 -> A-F)
-            if label.isdigit():
-                num_label = int(label)
-                if 0 <= num_label <= 5:
-                    # Map 0->A, 1->B, 2->C, 3->D, 4->E, 5->F
-                    letter_map = {0: 'A', 1: 'B', 2: 'C', 3: 'D', 4: 'E', 5: 'F'}
-                    label = letter_map[num_label]
-                    print(f"Mapped numeric label {num_label} to letter {label}")
-            
-            # Check if the predicted sign is in A-F range
-            is_a_to_f = label.upper() in ["A", "B", "C", "D", "E", "F"]
-            print(f"Is A-F sign: {is_a_to_f}")
-        except Exception as e:
-            print(f"Prediction error: {str(e)}")
-            import traceback
-            traceback.print_exc()
-            return {
-                "sign": "error",
-                "confidence": 0.0,
-                "landmarks": [],
-                "has_hand": True,
-                "is_a_to_f": False
-            }
-        
-        # Format landmarks for response
-        landmarks_list = []
-        for i, landmark in enumerate(landmarks_array):
-            landmarks_list.append({
-                "x": float(landmark[0]),
-                "y": float(landmark[1]),
-                "z": float(landmark[2]),
-                "index": i
-            })
-        
-        return {
-            "sign": label,
-            "confidence": float(confidence),
-            "landmarks": landmarks_list,
-            "has_hand": True,
-            "is_a_to_f": is_a_to_f
-        }
-    
+        async with admission.admit(client_id_from_request(request)):
+            result = await run_in_threadpool(predict_from_image_data, contents, request_log,
+                                             request.headers.get("X-Session-ID"))
+        return encode_response(result, landmarks, request.headers.get("accept"),
+                               response_headers(request_log))
+    except HTTPException:
+        if request_log.outcome is None:
+            request_log.outcome = 'rejected'
+        raise
     except Exception as e:
+        request_log.outcome = 'server_error'
+        logger.error("Error processing image: %s", e, exc_info=logger.isEnabledFor(logging.DEBUG))
         raise HTTPException(status_code=500, detail=f"Error processing image: {str(e)}")
+    finally:
+        request_log.finish()
+        observe_load(request_log)
+        record_traffic(request, request_log, contents, result, file.content_type)
 
 # Prediction from base64 encoded image
 class Base64ImageRequest(BaseModel):
     image: str
 
 @app.post("/predict/base64", response_model=PredictionResponse)
-async def predict_sign_base64(request: Base64ImageRequest):
+async def predict_sign_base64(request: Base64ImageRequest, http_request: Request,
+                              landmarks: LandmarkFormat = "dicts"):
+    request_log = RequestLog(logger, "/predict/base64", http_request.headers.get("X-Request-ID"))
+    image_data = result = None
     try:
         # Decode base64 image - identical to api.py
         image_data = base64.b64decode(request.image)
-        nparr = np.frombuffer(image_data, np.uint8)
-        image = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-        
-        if image is None:
-            raise HTTPException(status_code=400, detail="Invalid image format")
-        
-        # Convert to RGB (MediaPipe requires RGB input)
-        image_rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-        
-        # Process the image with MediaPipe
-        results = hands.process(image_rgb)
-        
-        # Check if hand is detected
-        if not results.multi_hand_landmarks:
-            return {
-                "sign": "no_hand",
-                "confidence": 0.0,
-                "landmarks": [],
-                "has_hand": False,
-                "is_a_to_f": False
-            }
-        
-        # Extract landmarks
-        landmarks_array = np.zeros((21, 3))
-        for i, landmark in enumerate(results.multi_hand_landmarks[0].landmark):
-            landmarks_array[i] = [landmark.x, landmark.y, landmark.z]
-        
-        # Normalize landmarks
-        normalized_landmarks = normalize_landmarks(landmarks_array)
-        
-        # Make prediction
+        async with admission.admit(client_id_from_request(http_request)):
+            result = await run_in_threadpool(predict_from_image_data, image_data, request_log,
+                                             http_request.headers.get("X-Session-ID"))
+        return encode_response(result, landmarks, http_request.headers.get("accept"),
+                               response_headers(request_log))
+    except HTTPException:
+        if request_log.outcome is None:
+            request_log.outcome = 'rejected'
+        raise
+    except Exception as e:
+        request_log.outcome = 'server_error'
+        logger.error("Error processing image: %s", e, exc_info=logger.isEnabledFor(logging.DEBUG))
+        raise HTTPException(status_code=500, detail=f"Error processing image: {str(e)}")
+    finally:
+        request_log.finish()
+        observe_load(request_log)
+        record_traffic(http_request, request_log, image_data, result)
+
+def predict_batch_from_image_data(images, request_log):
+    """
+    Run the prediction pipeline on several encoded images.
+
+    Every image is decoded and its landmarks detected and normalized first;
+    the hands found are then classified together, in one micro-batcher
+    round rather than one per image. An image that cannot be decoded gives
+    an error entry instead of failing the whole batch. Batched images are
+    not motion gated.
+
+    Args:
+        images: List of encoded image bytes
+        request_log: RequestLog of the batch request; stage timings add up
+                     over the images
+
+    Returns:
+        List of prediction dictionaries, one per image
+    """
+    # One quality level for the whole batch
+    level = degradation.level
+    request_log.fields['degradation_level'] = level
+
+    results = [None] * len(images)
+    hands = []
+    for index, image_data in enumerate(images):
         try:
-            if not hasattr(classifier, 'model') or classifier.model is None:
-                print("ERROR: Model is not loaded properly")
-                return {
-                    "sign": "error",
-                    "confidence": 0.0,
-                    "landmarks": [],
-                    "has_hand": True,
-                    "is_a_to_f": False
-                }
-            
-            print(f"Making prediction with normalized landmarks shape: {normalized_landmarks.shape}")
-            label, confidence = classifier.predict(normalized_landmarks)
-            
-            # Handle numeric labels by converting to letters (0-5 -> A-F)
-            if label.isdigit():
-                num_label = int(label)
-                if 0 <= num_label <= 5:
-                    # Map 0->A, 1->B, 2->C, 3->D, 4->E, 5->F
-                    letter_map = {0: 'A', 1: 'B', 2: 'C', 3: 'D', 4: 'E', 5: 'F'}
-                    label = letter_map[num_label]
-                    print(f"Mapped numeric label {num_label} to letter {label}")
-            
-            # Check if the predicted sign is in A-F range
-            is_a_to_f = label.upper() in ["A", "B", "C", "D", "E", "F"]
-            print(f"Is A-F sign: {is_a_to_f}")
-        except Exception as e:
-            print(f"Prediction error: {str(e)}")
-            import traceback
-            traceback.print_exc()
-            return {
+            landmarks_array = detect_landmarks(image_data, request_log, level)
+        except HTTPException as e:
+            results[index] = {
                 "sign": "error",
                 "confidence": 0.0,
-                "landmarks": [],
-                "has_hand": True,
-                "is_a_to_f": False
+                "landmarks": None,
+                "has_hand": False,
+                "is_a_to_f": False,
+                "degradation_level": level,
+                "error": e.detail
             }
-        
-        # Format landmarks for response
-        landmarks_list = []
-        for i, landmark in enumerate(landmarks_array):
-            landmarks_list.append({
-                "x": float(landmark[0]),
-                "y": float(landmark[1]),
-                "z": float(landmark[2]),
-                "index": i
-            })
-        
-        return {
-            "sign": label,
-            "confidence": float(confidence),
-            "landmarks": landmarks_list,
-            "has_hand": True,
-            "is_a_to_f": is_a_to_f
-        }
-    
+            continue
+        if landmarks_array is None:
+            results[index] = no_hand_result(level)
+            continue
+        with request_log.stage('normalize'):
+            hands.append((index, landmarks_array, normalize_landmarks(landmarks_array)))
+
+    if hands and (not hasattr(classifier, 'model') or classifier.model is None):
+        logger.error("Model is not loaded properly")
+        for index, _, _ in hands:
+            results[index] = prediction_error_result(level)
+        hands = []
+
+    try:
+        # Queue every hand before waiting, so they share batcher rounds
+        with request_log.stage('classify'):
+            level_batcher = batcher_for_level(level)
+            futures = [level_batcher.submit(normalized) for _, _, normalized in hands]
+            predictions = [future.result() for future in futures]
+        for (index, landmarks_array, _), (label, confidence) in zip(hands, predictions):
+            results[index] = letter_result(label, confidence, landmarks_array, level)
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error processing image: {str(e)}")
+        logger.error("Prediction error: %s", e, exc_info=logger.isEnabledFor(logging.DEBUG))
+        for index, _, _ in hands:
+            results[index] = prediction_error_result(level)
+
+    request_log.outcome = 'ok'
+    request_log.fields.pop('sign', None)
+    request_log.fields['batch_size'] = len(images)
+    request_log.fields['hands'] = sum(result["has_hand"] for result in results)
+    return results
+
+class BatchPredictionResponse(BaseModel):
+    results: List[PredictionResponse]
+
+# Prediction endpoint for several uploaded images in one request
+@app.post("/predict/batch", response_model=BatchPredictionResponse)
+async def predict_sign_batch(request: Request, files: List[UploadFile] = File(...),
+                             landmarks: LandmarkFormat = "dicts"):
+    # Validate files
+    if len(files) > MAX_BATCH_IMAGES:
+        raise HTTPException(status_code=413,
+                            detail=f"At most {MAX_BATCH_IMAGES} images per batch")
+    if not all(file.content_type.startswith("image/") for file in files):
+        raise HTTPException(status_code=400, detail="Files must be images")
+
+    request_log = RequestLog(logger, "/predict/batch", request.headers.get("X-Request-ID"))
+    contents = results = None
+    try:
+        # Read images
+        contents = [await file.read() for file in files]
+        async with admission.admit(client_id_from_request(request)):
+            results = await run_in_threadpool(predict_batch_from_image_data, contents, request_log)
+        return encode_batch_response(results, landmarks, request.headers.get("accept"),
+                                     response_headers(request_log))
+    except HTTPException:
+        if request_log.outcome is None:
+            request_log.outcome = 'rejected'
+        raise
+    except Exception as e:
+        request_log.outcome = 'server_error'
+        logger.error("Error processing images: %s", e, exc_info=logger.isEnabledFor(logging.DEBUG))
+        raise HTTPException(status_code=500, detail=f"Error processing images: {str(e)}")
+    finally:
+        request_log.finish()
+        observe_load(request_log, batch=True)
+        for index, image_data in enumerate(contents or []):
+            record_traffic(request, request_log, image_data, results[index] if results else None,
+                           files[index].content_type, batch_index=index)
 
 # Run the server
 if __name__ == "__main__":
@@ -292,7 +579,7 @@ if __name__ == "__main__":
     parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
     if parent_dir not in sys.path:
         sys.path.append(parent_dir)
-        print(f"Added {parent_dir} to Python path")
+        logger.info("Added %s to Python path", parent_dir)
     
-    print(f"Starting A-to-F API server on http://0.0.0.0:8001")
-    uvicorn.run(app, host="0.0.0.0", port=8001)
\ No newline at end of file
+    logger.info("Starting A-to-F API server on http://0.0.0.0:8001")
+    uvicorn.run(app, host="0.0.0.0", port=8001)
@@ -0,0 +1,71 @@
+import os
+import csv
+import time
+import numpy as np
+import argparse
+from sklearn.model_selection import train_test_split
+from asl_recognition.models.backends import available_backends, create_model
+from asl_recognition.models.compression import measure_model
+from asl_recognition.models.reduction import FeatureReducer
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare accuracy and per-frame latency of classifier backends')
+    parser.add_argument('--data_path', type=str, default='asl_recognition/data/train_landmarks.npz',
+                        help='Landmark dataset to train and evaluate on')
+    parser.add_argument('--backends', type=str, nargs='+', default=available_backends(),
+                        choices=available_backends(),
+                        help='Backends to benchmark')
+    parser.add_argument('--reduction', type=str, default=None, choices=['importance', 'pca'],
+                        help='Also benchmark each backend on reduced features')
+    parser.add_argument('--n_features', type=int, nargs='+', default=[20],
+                        help='Feature counts to try with --reduction')
+    parser.add_argument('--latency_samples', type=int, default=500,
+                        help='Number of single-frame predictions to time per backend')
+    parser.add_argument('--report_path', type=str, default=None,
+                        help='Optional CSV file for the results')
+    args = parser.parse_args()
+
+    # Same split as ASLClassifier.train
+    data = np.load(args.data_path, allow_pickle=True)
+    X_train, X_val, y_train, y_val = train_test_split(
+        data['X'], data['y'], test_size=0.2, random_state=42, stratify=data['y'])
+    print(f"Training on {len(X_train)} samples, evaluating on {len(X_val)}.")
+
+    # Feature sets to compare: all coordinates, plus each reduction
+    feature_sets = [('all', X_train, X_val)]
+    if args.reduction:
+        for k in args.n_features:
+            reducer = FeatureReducer(args.reduction, k).fit(X_train, y_train)
+            feature_sets.append((f'{args.reduction}_{k}', reducer.transform(X_train), reducer.transform(X_val)))
+
+    results = []
+    for name in args.backends:
+        baseline = None
+        for features, X_fit, X_eval in feature_sets:
+            model = create_model(name)
+
+            start = time.perf_counter()
+            model.fit(X_fit, y_train)
+            train_time = time.perf_counter() - start
+
+            metrics = measure_model(model, X_eval, y_val, args.latency_samples)
+            if baseline is None:
+                baseline = metrics['accuracy']
+            results.append({'backend': name, 'features': features, 'n_features': X_fit.shape[1],
+                            'train_s': train_time, 'accuracy_loss': baseline - metrics['accuracy'],
+                            **metrics})
+
+            print(f"{name:20s} {features:15s} acc={metrics['accuracy']:.4f} "
+                  f"(loss {baseline - metrics['accuracy']:+.4f}) p50={metrics['p50_ms']:.3f}ms "
+                  f"p99={metrics['p99_ms']:.3f}ms size={metrics['size_kb']:.0f}KB train={train_time:.1f}s")
+
+    if args.report_path:
+        os.makedirs(os.path.dirname(args.report_path) or '.', exist_ok=True)
+        with open(args.report_path, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=list(results[0].keys()))
+            writer.writeheader()
+            writer.writerows(results)
+        print(f"Report written to {args.report_path}")
+
+if __name__ == "__main__":
+    main()
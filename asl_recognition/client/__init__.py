@@ -0,0 +1,2 @@
+# Client package for the recognition APIs
+from .async_client import AsyncASLClient, ASLClientError, parse_server_timing
@@ -0,0 +1,346 @@
+import asyncio
+import base64
+import json
+import os
+import time
+
+import httpx
+import numpy as np
+
+# Optional MessagePack support; responses fall back to JSON when missing
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+MSGPACK_MEDIA_TYPE = 'application/msgpack'
+
+
+class ASLClientError(Exception):
+    """
+    Error response from a recognition API.
+    """
+
+    def __init__(self, status_code, detail, retry_after_ms=None):
+        """
+        Initialize the error.
+
+        Args:
+            status_code: HTTP status code
+            detail: Error detail returned by the server
+            retry_after_ms: Suggested wait before retrying, for 429/503 responses
+        """
+        super().__init__(f"HTTP {status_code}: {detail}")
+        self.status_code = status_code
+        self.detail = detail
+        self.retry_after_ms = retry_after_ms
+
+
+def parse_server_timing(value):
+    """
+    Parse a Server-Timing header into stage timings.
+
+    Args:
+        value: Header value such as 'decode;dur=1.2, detect;dur=30.5', or None
+
+    Returns:
+        Dictionary mapping stage names to milliseconds
+    """
+    stages = {}
+    for entry in (value or '').split(','):
+        name, _, params = entry.strip().partition(';')
+        if not name:
+            continue
+        for param in params.split(';'):
+            key, _, ms = param.strip().partition('=')
+            if key == 'dur':
+                stages[name] = float(ms)
+    return stages
+
+
+class AsyncASLClient:
+    """
+    Asynchronous client for the recognition APIs (api.py and a_to_f_api.py).
+
+    Connections are pooled and kept alive between calls, frames are uploaded
+    as binary multipart bodies, and responses are requested as MessagePack
+    when msgpack is installed. With batch_window_ms > 0, frames passed to
+    predict() within the window are combined (up to max_batch_size) into one
+    /predict/batch request; up to max_connections requests run at once.
+
+    Every prediction carries a 'timing' dictionary:
+        queue_ms   - time waiting for the batch window and a free connection
+        request_ms - HTTP round trip of the request that carried the frame
+        total_ms   - queue_ms + request_ms
+        batch_size - frames in that request
+        server_ms  - server stage timings of that request (summed over the
+                     batch), from the Server-Timing header
+
+    Use it as an async context manager, or call aclose() when done:
+
+        async with AsyncASLClient('http://localhost:8000') as client:
+            results = await client.predict_many(frames)
+    """
+
+    def __init__(self, base_url='http://localhost:8000', max_connections=4,
+                 batch_window_ms=5.0, max_batch_size=16, landmarks='none',
+                 timeout=30.0, keepalive_expiry=60.0, max_retries=3,
+                 client_id=None, use_msgpack=True):
+        """
+        Initialize the client.
+
+        Args:
+            base_url: Base URL of the API
+            max_connections: Pooled connections, and requests in flight at once
+            batch_window_ms: How long to collect frames for a batch request after
+                             the first one; 0 sends every frame on its own
+            max_batch_size: Most frames per batch request (the server's limit
+                            is ASL_MAX_BATCH_IMAGES)
+            landmarks: Landmark format requested from the server ('dicts',
+                       'flat', 'packed' or 'none'); 'flat' and 'packed'
+                       landmarks are returned as (21, 3) arrays
+            timeout: Request timeout in seconds
+            keepalive_expiry: Seconds an idle connection is kept open
+            max_retries: Retries of requests rejected by admission control
+                         (429/503), after the wait the server suggests
+            client_id: Optional X-Client-ID sent for fair admission
+            use_msgpack: Request MessagePack bodies if msgpack is installed
+        """
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1")
+
+        self.base_url = base_url.rstrip('/')
+        self.max_connections = max_connections
+        self.batch_window = batch_window_ms / 1000
+        self.max_batch_size = max_batch_size
+        self.landmarks = landmarks
+        self.max_retries = max_retries
+
+        headers = {'Accept': MSGPACK_MEDIA_TYPE if use_msgpack and msgpack is not None
+                   else 'application/json'}
+        if client_id is not None:
+            headers['X-Client-ID'] = client_id
+
+        self._http = httpx.AsyncClient(
+            base_url=self.base_url,
+            headers=headers,
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=max_connections,
+                                max_keepalive_connections=max_connections,
+                                keepalive_expiry=keepalive_expiry))
+
+        # Created on first use, inside the running event loop
+        self._queue = None
+        self._collector = None
+        self._slots = None
+        self._in_flight = set()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+    async def aclose(self):
+        """
+        Send the frames still queued, then close the connections.
+        """
+        if self._collector is not None:
+            await self._queue.put(None)
+            await self._collector
+            self._collector = None
+        if self._in_flight:
+            await asyncio.gather(*self._in_flight, return_exceptions=True)
+        await self._http.aclose()
+
+    async def health(self):
+        """
+        Returns:
+            Body of GET /health
+        """
+        response = await self._http.get('/health')
+        return self._decode(response)
+
+    async def metrics(self):
+        """
+        Returns:
+            Body of GET /metrics
+        """
+        response = await self._http.get('/metrics')
+        return self._decode(response)
+
+    async def predict(self, image, session_id=None, content_type='image/jpeg'):
+        """
+        Predict the sign in one encoded frame.
+
+        Frames with a session_id are sent on their own so the server can
+        motion gate them; the others are batched when batching is enabled.
+
+        Args:
+            image: Encoded image bytes (JPEG, PNG, ...) or a path to an image file
+            session_id: Optional X-Session-ID for motion-gated reuse
+            content_type: Media type of the image
+
+        Returns:
+            Prediction dictionary (sign, confidence, landmarks, has_hand, ...)
+            with 'request_id' and 'timing' added
+        """
+        image = self._read_image(image)
+        enqueued = time.perf_counter()
+
+        if self.batch_window <= 0 or self.max_batch_size == 1 or session_id is not None:
+            async with self._connection_slot():
+                return await self._send_single(image, content_type, session_id, enqueued)
+
+        self._ensure_collector()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((image, content_type, enqueued, future))
+        return await future
+
+    async def predict_many(self, images, content_type='image/jpeg'):
+        """
+        Predict the signs in several frames, using the whole connection pool.
+
+        Args:
+            images: Iterable of encoded image bytes or image paths
+            content_type: Media type of the images
+
+        Returns:
+            List of prediction dictionaries, in the order of images
+        """
+        return await asyncio.gather(*(self.predict(image, content_type=content_type)
+                                      for image in images))
+
+    def _read_image(self, image):
+        if isinstance(image, (str, os.PathLike)):
+            with open(image, 'rb') as f:
+                return f.read()
+        return bytes(image)
+
+    def _connection_slot(self):
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_connections)
+        return self._slots
+
+    def _ensure_collector(self):
+        if self._collector is None:
+            self._queue = asyncio.Queue()
+            self._collector = asyncio.get_running_loop().create_task(self._collect())
+
+    async def _collect(self):
+        loop = asyncio.get_running_loop()
+        closing = False
+        while not closing:
+            item = await self._queue.get()
+            if item is None:
+                break
+            batch = [item]
+
+            # Keep collecting until the window closes or the batch is full
+            deadline = loop.time() + self.batch_window
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), remaining)
+                except asyncio.TimeoutError:
+                    break
+                if item is None:
+                    closing = True
+                    break
+                batch.append(item)
+
+            # Wait for a free connection, then send without blocking collection
+            await self._connection_slot().acquire()
+            task = loop.create_task(self._send_batch(batch))
+            self._in_flight.add(task)
+            task.add_done_callback(self._in_flight.discard)
+
+    async def _send_batch(self, batch):
+        try:
+            if len(batch) == 1:
+                image, content_type, enqueued, future = batch[0]
+                results = [await self._send_single(image, content_type, None, enqueued)]
+            else:
+                results = await self._send_many(batch)
+        except Exception as e:
+            for *_, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        finally:
+            self._connection_slot().release()
+
+        for (*_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    async def _send_single(self, image, content_type, session_id, enqueued):
+        headers = {'X-Session-ID': session_id} if session_id is not None else None
+        sent = time.perf_counter()
+        response = await self._post('/predict', files={'file': ('frame', image, content_type)},
+                                    headers=headers)
+        received = time.perf_counter()
+        result = self._decode(response)
+        return self._finish(result, response, enqueued, sent, received, 1)
+
+    async def _send_many(self, batch):
+        files = [('files', (f'frame{i}', image, content_type))
+                 for i, (image, content_type, _, _) in enumerate(batch)]
+        sent = time.perf_counter()
+        response = await self._post('/predict/batch', files=files)
+        received = time.perf_counter()
+        results = self._decode(response)['results']
+        return [self._finish(result, response, enqueued, sent, received, len(batch))
+                for result, (_, _, enqueued, _) in zip(results, batch)]
+
+    async def _post(self, path, files, headers=None):
+        for attempt in range(self.max_retries + 1):
+            response = await self._http.post(path, params={'landmarks': self.landmarks},
+                                             files=files, headers=headers)
+            if response.status_code not in (429, 503) or attempt == self.max_retries:
+                return response
+            # Admission control rejected the request; wait as long as it suggests
+            poll_ms = response.headers.get('X-Suggested-Poll-Interval-Ms')
+            await asyncio.sleep(int(poll_ms) / 1000 if poll_ms else 2 ** attempt * 0.1)
+        return response
+
+    def _decode(self, response):
+        if response.headers.get('content-type', '').startswith(MSGPACK_MEDIA_TYPE):
+            body = msgpack.unpackb(response.content, raw=False)
+        else:
+            try:
+                body = json.loads(response.content)
+            except ValueError:
+                # Error pages from proxies in front of the API
+                body = response.text
+        if response.status_code >= 400:
+            poll_ms = response.headers.get('X-Suggested-Poll-Interval-Ms')
+            raise ASLClientError(response.status_code,
+                                 body.get('detail', body) if isinstance(body, dict) else body,
+                                 int(poll_ms) if poll_ms else None)
+        return body
+
+    def _finish(self, result, response, enqueued, sent, received, batch_size):
+        result['landmarks'] = self._decode_landmarks(result.get('landmarks'))
+        result['request_id'] = response.headers.get('X-Request-ID')
+        result['timing'] = {
+            'queue_ms': (sent - enqueued) * 1000,
+            'request_ms': (received - sent) * 1000,
+            'total_ms': (received - enqueued) * 1000,
+            'batch_size': batch_size,
+            'server_ms': parse_server_timing(response.headers.get('Server-Timing'))
+        }
+        return result
+
+    def _decode_landmarks(self, landmarks):
+        if not landmarks:
+            return None
+        if self.landmarks == 'packed':
+            if isinstance(landmarks, str):
+                landmarks = base64.b64decode(landmarks)
+            return np.frombuffer(landmarks, dtype='<f4').reshape(21, 3)
+        if self.landmarks == 'flat':
+            return np.asarray(landmarks, dtype=np.float32).reshape(21, 3)
+        return landmarks
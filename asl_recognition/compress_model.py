@@ -0,0 +1,80 @@
+import os
+import csv
+import argparse
+from sklearn.model_selection import train_test_split
+from asl_recognition.models.classifier import ASLClassifier
+from asl_recognition.models.a_to_f_classifier import ASLAtoFClassifier
+from asl_recognition.models.compression import compress_model
+from asl_recognition.utils.landmark_store import load_landmark_dataset, select_classes
+
+def main():
+    parser = argparse.ArgumentParser(description='Compress a trained ASL model to fit a latency and size budget')
+    parser.add_argument('--model_path', type=str, default='asl_recognition/data/asl_model.pkl',
+                        help='Path to the trained model')
+    parser.add_argument('--classifier', type=str, default='full', choices=['full', 'a_to_f'],
+                        help='Which classifier the model belongs to')
+    parser.add_argument('--data_path', type=str, default='asl_recognition/data/train_landmarks.npz',
+                        help='Landmark dataset of the full alphabet; A-to-F models use its A-F samples')
+    parser.add_argument('--latency_budget_ms', type=float, default=None,
+                        help='p99 single-frame inference budget in milliseconds')
+    parser.add_argument('--size_budget_kb', type=float, default=None,
+                        help='Model artifact size budget in kilobytes')
+    parser.add_argument('--output_path', type=str, default=None,
+                        help='Where to save the best model (default: <model>_compressed.pkl)')
+    parser.add_argument('--report_path', type=str, default=None,
+                        help='Where to write the CSV report (default: <model>_compression.csv)')
+    args = parser.parse_args()
+
+    base, ext = os.path.splitext(args.model_path)
+    output_path = args.output_path or f"{base}_compressed{ext}"
+    report_path = args.report_path or f"{base}_compression.csv"
+
+    # Load the model
+    classifier = ASLClassifier() if args.classifier == 'full' else ASLAtoFClassifier()
+    classifier.load(args.model_path)
+    if classifier.model_type != 'random_forest':
+        print(f"Compression works on random forests; {args.model_path} is a {classifier.model_type} model.")
+        return
+
+    # Recreate the training split so candidates are scored on held-out data
+    if args.classifier == 'a_to_f':
+        # Select the A-F samples, labelled 0-5 in letter order as in train_a_to_f_single.py
+        X, y, _ = select_classes(args.data_path, classifier.letters)
+    else:
+        data = load_landmark_dataset(args.data_path)
+        X, y = data['X'], data['y']
+    X_train, X_val, y_train, y_val = train_test_split(
+        X, y, test_size=0.2, random_state=42, stratify=y)
+    X_train = classifier.reduce_features(X_train)
+    X_val = classifier.reduce_features(X_val)
+
+    results, best = compress_model(classifier.model, X_train, y_train, X_val, y_val,
+                                   latency_budget_ms=args.latency_budget_ms,
+                                   size_budget_kb=args.size_budget_kb)
+
+    # Write the accuracy / latency / size report
+    os.makedirs(os.path.dirname(report_path) or '.', exist_ok=True)
+    with open(report_path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=list(results[0].keys()))
+        writer.writeheader()
+        writer.writerows(results)
+    print(f"Report written to {report_path}")
+
+    if best is None:
+        print("No candidate fits the budget; nothing saved.")
+        return
+
+    name, model, kept = best
+    print(f"Best candidate within budget: {name}")
+    classifier.model = model
+    if hasattr(classifier, 'tree_versions'):
+        if kept is None:
+            # Refit and distilled forests are new, so every tree belongs to the current version
+            classifier.tree_versions = [classifier.version] * len(model.estimators_)
+        elif classifier.tree_versions is not None:
+            # Kept trees keep the version that added them
+            classifier.tree_versions = [classifier.tree_versions[i] for i in kept]
+    classifier.save(output_path)
+
+if __name__ == "__main__":
+    main()
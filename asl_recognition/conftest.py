@@ -0,0 +1,2 @@
+# test_api.py is a command-line check of a running server, not a test module
+collect_ignore = ['test_api.py']
@@ -0,0 +1,72 @@
+import os
+import time
+import numpy as np
+import argparse
+from sklearn.model_selection import train_test_split
+from asl_recognition.utils.dedup import deduplicate_landmarks, print_dedup_report
+from asl_recognition.utils.landmark_store import build_class_index
+from asl_recognition.models.backends import create_model
+
+def compare_training(X, y, tolerance, method):
+    """
+    Train on the full and on the deduplicated training split and score both
+    on the same (not deduplicated) validation split.
+
+    Args:
+        X: numpy array of landmarks
+        y: numpy array of labels
+        tolerance: Dedup tolerance
+        method: Dedup method
+    """
+    X_train, X_val, y_train, y_val = train_test_split(
+        X, y, test_size=0.2, random_state=42, stratify=y)
+    X_dedup, y_dedup, _ = deduplicate_landmarks(X_train, y_train, tolerance, method)
+
+    for name, X_fit, y_fit in [('full', X_train, y_train), ('deduplicated', X_dedup, y_dedup)]:
+        model = create_model('random_forest')
+        start = time.perf_counter()
+        model.fit(X_fit, y_fit)
+        train_time = time.perf_counter() - start
+        nodes = sum(tree.tree_.node_count for tree in model.estimators_)
+        print(f"{name:13s} samples={len(X_fit):6d} train={train_time:.1f}s "
+              f"nodes={nodes} val_acc={model.score(X_val, y_val):.4f}")
+
+def main():
+    parser = argparse.ArgumentParser(description='Remove near-duplicate samples from a landmark dataset')
+    parser.add_argument('--input', type=str, default='asl_recognition/data/train_landmarks.npz',
+                        help='Landmark dataset (.npz) to deduplicate')
+    parser.add_argument('--output', type=str, default=None,
+                        help='Where to save the result (default: <input>_dedup.npz)')
+    parser.add_argument('--tolerance', type=float, default=0.05,
+                        help='Largest per-coordinate difference treated as a duplicate')
+    parser.add_argument('--method', type=str, default='radius', choices=['radius', 'grid'],
+                        help='Grouping: greedy radius cover (KD-tree) or quantized grid cells')
+    parser.add_argument('--compare', action='store_true',
+                        help='Also compare training time and validation accuracy with the full data')
+    args = parser.parse_args()
+
+    base, ext = os.path.splitext(args.input)
+    output_path = args.output or f"{base}_dedup{ext}"
+
+    # Load the dataset
+    data = np.load(args.input, allow_pickle=True)
+    X, y = data['X'], data['y']
+    label_mapping = data['label_mapping'].item() if 'label_mapping' in data else None
+
+    start = time.perf_counter()
+    X_dedup, y_dedup, report = deduplicate_landmarks(X, y, args.tolerance, args.method)
+    print(f"Deduplicated in {time.perf_counter() - start:.1f}s")
+    print_dedup_report(report, label_mapping)
+
+    # Save with the same keys as the input and a per-class index matching the kept samples
+    arrays = {key: data[key] for key in data.files}
+    arrays['X'], arrays['y'] = X_dedup, y_dedup
+    arrays.update(build_class_index(y_dedup))
+    np.savez(output_path, **arrays)
+    print(f"Deduplicated dataset saved to {output_path}")
+
+    if args.compare:
+        compare_training(X, y, args.tolerance, args.method)
+
+if __name__ == "__main__":
+    main()
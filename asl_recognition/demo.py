@@ -2,53 +2,113 @@ import cv2
 import numpy as np
 import mediapipe as mp
 import argparse
+import csv
 import os
+import time
 from asl_recognition.utils.landmark_extraction import extract_landmarks, normalize_landmarks
+from asl_recognition.utils.video_pipeline import (RecognitionPipeline, infer_frame,
+                                                  open_replay_source, summarize_results)
 from asl_recognition.models.classifier import ASLClassifier
 
-def main():
-    parser = argparse.ArgumentParser(description='ASL Recognition Demo')
-    parser.add_argument('--model_path', type=str, default='asl_recognition/data/asl_model.pkl',
-                        help='Path to the trained model')
-    parser.add_argument('--camera', type=int, default=0,
-                        help='Camera index (usually 0 for built-in webcam)')
-    args = parser.parse_args()
-    
-    # Check if model exists
-    if not os.path.exists(args.model_path):
-        print(f"Model not found at {args.model_path}. Please train the model first.")
-        return
+mp_hands = mp.solutions.hands
+mp_drawing = mp.solutions.drawing_utils
+mp_drawing_styles = mp.solutions.drawing_styles
+
+def draw_hand(image, hand_landmarks):
+    """
+    Draw hand landmarks on an image.
     
-    # Load the model
-    classifier = ASLClassifier()
-    classifier.load(args.model_path)
+    Args:
+        image: BGR image to draw on
+        hand_landmarks: MediaPipe hand landmark list
+    """
+    mp_drawing.draw_landmarks(
+        image,
+        hand_landmarks,
+        mp_hands.HAND_CONNECTIONS,
+        mp_drawing_styles.get_default_hand_landmarks_style(),
+        mp_drawing_styles.get_default_hand_connections_style())
+
+def draw_pipeline_overlay(image, result, stats):
+    """
+    Draw the latest prediction and the per-stage rates and latencies.
     
-    # Initialize MediaPipe Hands
-    mp_hands = mp.solutions.hands
-    mp_drawing = mp.solutions.drawing_utils
-    mp_drawing_styles = mp.solutions.drawing_styles
+    Args:
+        image: BGR image to draw on
+        result: Latest result from RecognitionPipeline.latest_result() (or None)
+        stats: RecognitionPipeline.stats.snapshot()
+    """
+    fps = stats['fps']
+    latency = stats['latency_ms']
+    lines = [
+        f"Capture {fps.get('capture', 0):.1f} FPS | Inference {fps.get('inference', 0):.1f} FPS | "
+        f"Render {fps.get('render', 0):.1f} FPS",
+        f"Wait {latency.get('queue', 0):.1f}ms  Detect {latency.get('detect', 0):.1f}ms  "
+        f"Classify {latency.get('classify', 0):.1f}ms",
+        f"Capture->result {latency.get('inference_total', 0):.1f}ms  "
+        f"Frame age at display {latency.get('display_age', 0):.1f}ms"
+    ]
+    for i, line in enumerate(lines):
+        cv2.putText(image, line, (10, 25 + 25 * i), cv2.FONT_HERSHEY_SIMPLEX,
+                    0.6, (0, 255, 0), 2, cv2.LINE_AA)
     
-    hands = mp_hands.Hands(
-        static_image_mode=False,  # Video mode
-        max_num_hands=1,
-        min_detection_confidence=0.5,
-        min_tracking_confidence=0.5)
+    if result is not None and result['label'] is not None:
+        # Landmarks come from the last inferred frame, drawn on the newest one
+        draw_hand(image, result['hand_landmarks'])
+        text = f"{result['label']}: {result['confidence']:.2f}"
+        cv2.putText(image, text, (10, 120), cv2.FONT_HERSHEY_SIMPLEX,
+                    1, (0, 255, 0), 2, cv2.LINE_AA)
+
+def run_pipelined(cap, hands, classifier, window_name):
+    """
+    Run the demo with capture and inference on background threads.
     
-    # Initialize webcam
-    cap = cv2.VideoCapture(args.camera)
+    The main thread renders: it shows every new camera frame with the most
+    recent prediction, so display rate is not limited by inference.
     
-    # Check if camera opened successfully
-    if not cap.isOpened():
-        print("Error: Could not open camera.")
-        return
+    Args:
+        cap: Opened cv2.VideoCapture
+        hands: MediaPipe Hands object in video mode
+        classifier: Loaded ASLClassifier
+        window_name: Name of the display window
+    """
+    pipeline = RecognitionPipeline(cap, hands, classifier)
+    pipeline.start()
     
-    # Set window name
-    window_name = 'ASL Recognition Demo'
-    cv2.namedWindow(window_name, cv2.WINDOW_NORMAL)
-    
-    print("Starting ASL recognition demo...")
-    print("Press 'q' to quit")
+    seq = 0
+    try:
+        while pipeline.running:
+            item = pipeline.frames.get_newer(seq, timeout=0.5)
+            if item is None:
+                continue
+            seq, image, captured_at = item
+            
+            # The inference thread may still be reading this frame
+            image = image.copy()
+            
+            pipeline.stats.tick('render')
+            pipeline.stats.record('display_age', (time.perf_counter() - captured_at) * 1000)
+            draw_pipeline_overlay(image, pipeline.latest_result(), pipeline.stats.snapshot())
+            
+            # Display the result
+            cv2.imshow(window_name, image)
+            
+            # Check for quit command
+            if cv2.waitKey(1) & 0xFF == ord('q'):
+                break
+    finally:
+        pipeline.stop()
+
+def run_sequential(cap, hands, classifier, window_name):
+    """
+    Run the demo with capture, inference and display in one loop.
     
+    Args:
+        cap: Opened cv2.VideoCapture
+        hands: MediaPipe Hands object in video mode
+        classifier: Loaded ASLClassifier
+        window_name: Name of the display window
+    """
     # For FPS calculation
     prev_frame_time = 0
     
@@ -71,12 +131,7 @@ def main():
         if results.multi_hand_landmarks:
             # Draw hand landmarks
             for hand_landmarks in results.multi_hand_landmarks:
-                mp_drawing.draw_landmarks(
-                    image,
-                    hand_landmarks,
-                    mp_hands.HAND_CONNECTIONS,
-                    mp_drawing_styles.get_default_hand_landmarks_style(),
-                    mp_drawing_styles.get_default_hand_connections_style())
+                draw_hand(image, hand_landmarks)
             
             # Extract landmarks
             landmarks_array = np.zeros((21, 3))
@@ -108,6 +163,137 @@ def main():
         # Check for quit command
         if cv2.waitKey(5) & 0xFF == ord('q'):
             break
+
+def run_headless(cap, hands, classifier, pipelined, output_path=None):
+    """
+    Run the demo without a window and report per-frame predictions and timings.
+    
+    Args:
+        cap: Opened cv2.VideoCapture or replay source
+        hands: MediaPipe Hands object in video mode
+        classifier: Loaded ASLClassifier
+        pipelined: Use the threaded pipeline (frames may be skipped when
+                   inference is slower than the source) instead of one loop
+        output_path: Optional CSV file for per-frame results
+    
+    Returns:
+        summary: Dictionary returned by summarize_results
+    """
+    results = []
+    start = time.perf_counter()
+    
+    if pipelined:
+        pipeline = RecognitionPipeline(cap, hands, classifier, on_result=results.append)
+        pipeline.start()
+        while pipeline.running:
+            time.sleep(0.05)
+        pipeline.stop()
+        frames_read = pipeline.stats.snapshot()['frames'].get('capture', 0)
+    else:
+        frames_read = 0
+        while cap.isOpened():
+            success, image = cap.read()
+            captured_at = time.perf_counter()
+            if not success:
+                break
+            frames_read += 1
+            
+            # Same processing as the live demo
+            image = cv2.flip(image, 1)
+            results.append(infer_frame(hands, classifier, image, frames_read, captured_at))
+    
+    wall_time = time.perf_counter() - start
+    
+    if output_path:
+        os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+        fields = ['seq', 'time_s', 'label', 'confidence', 'wait_ms', 'detect_ms',
+                  'classify_ms', 'latency_ms']
+        with open(output_path, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=fields, extrasaction='ignore')
+            writer.writeheader()
+            for result in results:
+                writer.writerow(dict(result, time_s=result['captured_at'] - start))
+        print(f"Per-frame results written to {output_path}")
+    
+    summary = summarize_results(results, frames_read, wall_time)
+    print(f"\nFrames read: {summary['frames_read']}, inferred: {summary['frames_inferred']} "
+          f"in {summary['wall_time_s']:.1f}s (hand detected in {summary['hand_detected']:.1%})")
+    print(f"Capture FPS: {summary['capture_fps']:.1f}, inference FPS: {summary['inference_fps']:.1f}")
+    for name in ('wait_ms', 'detect_ms', 'classify_ms', 'latency_ms'):
+        if name in summary:
+            print(f"{name[:-3]:>9s}: p50 {summary[name]['p50']:.1f}ms  "
+                  f"p95 {summary[name]['p95']:.1f}ms  p99 {summary[name]['p99']:.1f}ms")
+    
+    return summary
+
+def main():
+    parser = argparse.ArgumentParser(description='ASL Recognition Demo')
+    parser.add_argument('--model_path', type=str, default='asl_recognition/data/asl_model.pkl',
+                        help='Path to the trained model')
+    parser.add_argument('--camera', type=int, default=0,
+                        help='Camera index (usually 0 for built-in webcam)')
+    parser.add_argument('--pipelined', action='store_true',
+                        help='Run capture and inference on separate threads')
+    parser.add_argument('--video', type=str, default=None,
+                        help='Replay a video file or a directory of frames instead of the camera')
+    parser.add_argument('--realtime', action='store_true',
+                        help='Replay --video at its recorded frame rate, like a live camera')
+    parser.add_argument('--fps', type=float, default=None,
+                        help='Frame rate of --video (directories default to 30)')
+    parser.add_argument('--headless', action='store_true',
+                        help='Run without a window and print an FPS and latency summary')
+    parser.add_argument('--output', type=str, default=None,
+                        help='CSV file for per-frame predictions and timings (with --headless)')
+    args = parser.parse_args()
+    
+    # Check if model exists
+    if not os.path.exists(args.model_path):
+        print(f"Model not found at {args.model_path}. Please train the model first.")
+        return
+    
+    # Load the model
+    classifier = ASLClassifier()
+    classifier.load(args.model_path, inference_only=True)
+    if classifier.reducer is not None:
+        # predict() applies the model's feature reduction to each frame
+        reduction = classifier.reducer.describe()
+        print(f"Using {reduction['method']} feature reduction: "
+              f"{reduction['n_features_in']} -> {reduction['n_features_out']} features")
+    
+    # Initialize MediaPipe Hands
+    hands = mp_hands.Hands(
+        static_image_mode=False,  # Video mode
+        max_num_hands=1,
+        min_detection_confidence=0.5,
+        min_tracking_confidence=0.5)
+    
+    # Initialize webcam or replay source
+    if args.video:
+        cap = open_replay_source(args.video, realtime=args.realtime, fps=args.fps)
+    else:
+        cap = cv2.VideoCapture(args.camera)
+    
+    # Check if camera opened successfully
+    if not cap.isOpened():
+        print("Error: Could not open camera." if not args.video else f"Error: Could not open {args.video}.")
+        return
+    
+    if args.headless:
+        run_headless(cap, hands, classifier, args.pipelined, args.output)
+        cap.release()
+        return
+    
+    # Set window name
+    window_name = 'ASL Recognition Demo'
+    cv2.namedWindow(window_name, cv2.WINDOW_NORMAL)
+    
+    print("Starting ASL recognition demo...")
+    print("Press 'q' to quit")
+    
+    if args.pipelined:
+        run_pipelined(cap, hands, classifier, window_name)
+    else:
+        run_sequential(cap, hands, classifier, window_name)
     
     # Release resources
     cap.release()
@@ -0,0 +1,32 @@
+import argparse
+from asl_recognition.utils.landmark_extraction import create_landmark_dataset
+
+def main():
+    parser = argparse.ArgumentParser(description='Extract a landmark dataset, or one shard of it, from a directory of images')
+    parser.add_argument('--data_dir', type=str, required=True,
+                        help='Directory with one subdirectory of images per class')
+    parser.add_argument('--output', type=str, required=True,
+                        help='Output .npz path')
+    parser.add_argument('--shard_index', type=int, default=0,
+                        help='Which slice of the sorted image list to process')
+    parser.add_argument('--shard_count', type=int, default=1,
+                        help='Number of slices the image list is split into')
+    parser.add_argument('--n_readers', type=int, default=2,
+                        help='File reader threads')
+    parser.add_argument('--n_decoders', type=int, default=2,
+                        help='Image decoder threads')
+    parser.add_argument('--reduce_factor', type=int, default=1, choices=[1, 2, 4, 8],
+                        help='Decode images at 1/N resolution')
+    args = parser.parse_args()
+
+    create_landmark_dataset(args.data_dir, args.output,
+                            n_readers=args.n_readers,
+                            n_decoders=args.n_decoders,
+                            reduce_factor=args.reduce_factor,
+                            shard_index=args.shard_index,
+                            shard_count=args.shard_count)
+    if args.shard_count > 1:
+        print(f"Shard written to {args.output}; combine the shards with merge_landmark_shards")
+
+if __name__ == "__main__":
+    main()
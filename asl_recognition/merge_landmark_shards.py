@@ -0,0 +1,23 @@
+import argparse
+from asl_recognition.utils.landmark_extraction import merge_landmark_shards
+
+def main():
+    parser = argparse.ArgumentParser(description='Validate and merge the shards of a sharded landmark extraction')
+    parser.add_argument('shards', type=str, nargs='+',
+                        help='Shard .npz files written by extract_landmarks --shard_count N')
+    parser.add_argument('--output', type=str, required=True,
+                        help='Merged dataset .npz path')
+    parser.add_argument('--failed_report', type=str, default=None,
+                        help='Write the images without a detected hand to this text file')
+    args = parser.parse_args()
+
+    _, _, failed_images = merge_landmark_shards(args.shards, args.output)
+    print(f"Merged dataset written to {args.output}")
+
+    if args.failed_report:
+        with open(args.failed_report, 'w') as f:
+            f.writelines(f"{path}\n" for path in failed_images)
+        print(f"Failed images written to {args.failed_report}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,234 @@
+from contextlib import nullcontext
+
+import numpy as np
+from sklearn.base import BaseEstimator, ClassifierMixin
+
+# Registry of model types: name -> factory returning an unfitted estimator
+BACKENDS = {}
+
+
+def register_backend(name):
+    """
+    Register a factory under a model type name.
+
+    Every factory returns an unfitted estimator with the scikit-learn
+    classifier interface (fit, predict, predict_proba, score, classes_), which
+    is all ASLClassifier and ASLAtoFClassifier rely on.
+
+    Args:
+        name: Model type name passed as model_type
+
+    Returns:
+        Decorator registering the factory
+    """
+    def decorator(factory):
+        BACKENDS[name] = factory
+        return factory
+    return decorator
+
+
+def available_backends():
+    """
+    Get the registered model type names.
+
+    Returns:
+        List of model type names
+    """
+    return list(BACKENDS)
+
+
+def create_model(model_type, **params):
+    """
+    Create an unfitted model for a registered model type.
+
+    Args:
+        model_type: Registered model type name
+        **params: Overrides for the backend's default parameters
+
+    Returns:
+        Unfitted estimator
+    """
+    if model_type not in BACKENDS:
+        raise ValueError(f"Unsupported model type: {model_type}. "
+                         f"Available: {', '.join(available_backends())}")
+    return BACKENDS[model_type](**params)
+
+
+def set_n_jobs(model, n_jobs):
+    """
+    Set n_jobs on a fitted or unfitted model, including cascade stages.
+
+    Saved models carry n_jobs=None: a single process-wide setting would either
+    leave training on one core or make every single-frame prediction pay for
+    joblib dispatch. Parallelism is applied per call with parallelism() instead.
+
+    Args:
+        model: Estimator from create_model
+        n_jobs: Value to set (None for the serving configuration)
+
+    Returns:
+        The model
+    """
+    if hasattr(model, 'n_jobs'):
+        model.n_jobs = n_jobs
+    for stage in ('first_model_', 'second_model_'):
+        if hasattr(model, stage):
+            set_n_jobs(getattr(model, stage), n_jobs)
+    return model
+
+
+def parallelism(n_jobs):
+    """
+    Run the scikit-learn calls inside the returned context on n_jobs threads.
+
+    Applies to estimators whose own n_jobs is None and only to the calling
+    thread, so concurrent single-frame predictions are not affected.
+
+    Args:
+        n_jobs: Number of threads (-1 for all CPUs, None or 1 for no parallelism)
+
+    Returns:
+        Context manager
+    """
+    if n_jobs in (None, 1):
+        return nullcontext()
+    try:
+        from joblib import parallel_config
+    except ImportError:
+        # joblib < 1.3 (allowed by scikit-learn 1.2) only has parallel_backend
+        from joblib import parallel_backend as parallel_config
+    return parallel_config(backend='threading', n_jobs=n_jobs)
+
+
+@register_backend('random_forest')
+def random_forest(**params):
+    from sklearn.ensemble import RandomForestClassifier
+    return RandomForestClassifier(**{'n_estimators': 100, 'random_state': 42, **params})
+
+
+@register_backend('shallow_forest')
+def shallow_forest(**params):
+    from sklearn.ensemble import RandomForestClassifier
+    return RandomForestClassifier(**{'n_estimators': 5, 'max_depth': 8, 'random_state': 42, **params})
+
+
+@register_backend('knn_kd_tree')
+def knn_kd_tree(**params):
+    from sklearn.neighbors import KNeighborsClassifier
+    return KNeighborsClassifier(**{'n_neighbors': 5, 'weights': 'distance',
+                                   'algorithm': 'kd_tree', **params})
+
+
+@register_backend('knn_ball_tree')
+def knn_ball_tree(**params):
+    from sklearn.neighbors import KNeighborsClassifier
+    return KNeighborsClassifier(**{'n_neighbors': 5, 'weights': 'distance',
+                                   'algorithm': 'ball_tree', **params})
+
+
+@register_backend('logistic_regression')
+def logistic_regression(**params):
+    from sklearn.linear_model import LogisticRegression
+    return LogisticRegression(**{'C': 10.0, 'max_iter': 2000, **params})
+
+
+@register_backend('mlp')
+def mlp(**params):
+    return NumpyMLP(**params)
+
+
+@register_backend('cascade')
+def cascade(**params):
+    from .cascade import CascadeModel
+    return CascadeModel(**params)
+
+
+class NumpyMLP(ClassifierMixin, BaseEstimator):
+    """
+    A small multilayer perceptron that predicts with plain NumPy.
+
+    Training uses scikit-learn's MLPClassifier; afterwards only the weight
+    matrices are kept, so inference is a few matrix multiplies and the pickled
+    model holds nothing but the weights.
+    """
+
+    def __init__(self, hidden_layer_sizes=(128, 64), alpha=1e-4, max_iter=500,
+                 early_stopping=True, random_state=42):
+        """
+        Initialize the model.
+
+        Args:
+            hidden_layer_sizes: Units per hidden layer
+            alpha: L2 regularization strength
+            max_iter: Maximum training epochs
+            early_stopping: Stop when the internal validation score stops improving
+            random_state: Random seed
+        """
+        self.hidden_layer_sizes = hidden_layer_sizes
+        self.alpha = alpha
+        self.max_iter = max_iter
+        self.early_stopping = early_stopping
+        self.random_state = random_state
+
+    def fit(self, X, y):
+        """
+        Train the network and keep its weights.
+
+        Args:
+            X: numpy array of landmarks
+            y: numpy array of labels
+
+        Returns:
+            self
+        """
+        from sklearn.neural_network import MLPClassifier
+
+        trainer = MLPClassifier(hidden_layer_sizes=self.hidden_layer_sizes,
+                                activation='relu',
+                                alpha=self.alpha,
+                                max_iter=self.max_iter,
+                                early_stopping=self.early_stopping,
+                                random_state=self.random_state)
+        trainer.fit(X, y)
+
+        self.classes_ = trainer.classes_
+        self.coefs_ = [w.astype(np.float32) for w in trainer.coefs_]
+        self.intercepts_ = [b.astype(np.float32) for b in trainer.intercepts_]
+        return self
+
+    def predict_proba(self, X):
+        """
+        Compute class probabilities.
+
+        Args:
+            X: numpy array of shape (n_samples, n_features)
+
+        Returns:
+            numpy array of shape (n_samples, n_classes)
+        """
+        activations = np.asarray(X, dtype=np.float32)
+        for w, b in zip(self.coefs_[:-1], self.intercepts_[:-1]):
+            activations = np.maximum(activations @ w + b, 0)
+        logits = activations @ self.coefs_[-1] + self.intercepts_[-1]
+
+        if logits.shape[1] == 1:
+            # Binary problems have a single logistic output unit
+            positive = 1 / (1 + np.exp(-logits))
+            return np.hstack([1 - positive, positive])
+
+        logits -= logits.max(axis=1, keepdims=True)
+        proba = np.exp(logits)
+        proba /= proba.sum(axis=1, keepdims=True)
+        return proba
+
+    def predict(self, X):
+        """
+        Predict class labels.
+
+        Args:
+            X: numpy array of shape (n_samples, n_features)
+
+        Returns:
+            numpy array of labels
+        """
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
@@ -0,0 +1,197 @@
+import threading
+
+import numpy as np
+from sklearn.base import BaseEstimator, ClassifierMixin
+from sklearn.model_selection import train_test_split
+
+
+def calibrate_threshold(confidences, correct, target_accuracy):
+    """
+    Find the lowest confidence threshold at which the accepted predictions
+    still reach the target accuracy.
+
+    Args:
+        confidences: numpy array of first-stage confidences
+        correct: boolean numpy array, whether each first-stage prediction was right
+        target_accuracy: Required accuracy on the frames the first stage answers
+
+    Returns:
+        Threshold (np.inf if no threshold reaches the target)
+    """
+    order = np.argsort(-confidences, kind='stable')
+    accepted_accuracy = np.cumsum(correct[order]) / np.arange(1, len(order) + 1)
+    reachable = np.flatnonzero(accepted_accuracy >= target_accuracy)
+    if not len(reachable):
+        return np.inf
+    return float(confidences[order[reachable[-1]]])
+
+
+class CascadeModel(ClassifierMixin, BaseEstimator):
+    """
+    A cheap first-stage model backed by a full model for uncertain frames.
+
+    Frames where the first stage is at least as confident as the calibrated
+    threshold are answered by it; the rest fall through to the second stage.
+    Both stages are any backends registered in models.backends.
+    """
+
+    def __init__(self, first_stage='logistic_regression', second_stage='random_forest',
+                 first_stage_params=None, second_stage_params=None, threshold=None,
+                 target_accuracy=0.999, calibration_fraction=0.2, random_state=42):
+        """
+        Initialize the cascade.
+
+        Args:
+            first_stage: Backend name of the cheap model
+            second_stage: Backend name of the full model
+            first_stage_params: Optional parameter overrides for the first stage
+            second_stage_params: Optional parameter overrides for the second stage
+            threshold: Fixed first-stage confidence threshold; calibrated in fit() if None
+            target_accuracy: Accuracy the first stage must reach on the frames it
+                             answers, on held-out calibration data
+            calibration_fraction: Fraction of the training data held out for calibration
+            random_state: Random seed for the calibration split
+        """
+        self.first_stage = first_stage
+        self.second_stage = second_stage
+        self.first_stage_params = first_stage_params
+        self.second_stage_params = second_stage_params
+        self.threshold = threshold
+        self.target_accuracy = target_accuracy
+        self.calibration_fraction = calibration_fraction
+        self.random_state = random_state
+
+    def fit(self, X, y):
+        """
+        Train both stages and calibrate the first-stage threshold.
+
+        Args:
+            X: numpy array of landmarks
+            y: numpy array of labels
+
+        Returns:
+            self
+        """
+        from .backends import create_model
+
+        # The full model does not depend on the threshold, so it sees all the data
+        self.second_model_ = create_model(self.second_stage, **(self.second_stage_params or {}))
+        self.second_model_.fit(X, y)
+        self.classes_ = self.second_model_.classes_
+
+        self.first_model_ = create_model(self.first_stage, **(self.first_stage_params or {}))
+        if self.threshold is None:
+            # Calibrate on data the first stage has not seen, then refit it on everything
+            X_fit, X_cal, y_fit, y_cal = train_test_split(
+                X, y, test_size=self.calibration_fraction,
+                random_state=self.random_state, stratify=y)
+            self.first_model_.fit(X_fit, y_fit)
+            proba = self.first_model_.predict_proba(X_cal)
+            correct = self.first_model_.classes_[np.argmax(proba, axis=1)] == y_cal
+            self.threshold_ = calibrate_threshold(proba.max(axis=1), correct, self.target_accuracy)
+        else:
+            self.threshold_ = self.threshold
+        self.first_model_.fit(X, y)
+
+        self.reset_stats()
+        return self
+
+    def predict_proba(self, X, return_early=False):
+        """
+        Compute class probabilities through the cascade.
+
+        Args:
+            X: numpy array of shape (n_samples, n_features)
+            return_early: Also return which rows the first stage answered
+
+        Returns:
+            numpy array of shape (n_samples, n_classes), and with return_early a
+            boolean numpy array of shape (n_samples,)
+        """
+        proba, early = self._cascade(X)
+
+        # Counted here only: ASLClassifier.predict also calls predict()
+        with self._stats_lock:
+            self.n_frames_ += len(early)
+            self.n_early_ += int(early.sum())
+
+        if return_early:
+            return proba, early
+        return proba
+
+    def predict(self, X):
+        """
+        Predict class labels through the cascade.
+
+        Args:
+            X: numpy array of shape (n_samples, n_features)
+
+        Returns:
+            numpy array of labels
+        """
+        proba, _ = self._cascade(X)
+        return self.classes_[np.argmax(proba, axis=1)]
+
+    def _cascade(self, X):
+        proba = np.asarray(self.first_model_.predict_proba(X), dtype=np.float64)
+        early = proba.max(axis=1) >= self.threshold_
+
+        # Only the uncertain rows pay for the full model
+        if not early.all():
+            proba[~early] = self.second_model_.predict_proba(X[~early])
+
+        return proba, early
+
+    def cascade_report(self, X, y):
+        """
+        Compare the cascade with the full model alone on labelled data.
+
+        Args:
+            X: numpy array of landmarks
+            y: numpy array of labels
+
+        Returns:
+            Dictionary with the threshold, the fraction of frames resolved by the
+            first stage, and the cascade, full-model and first-stage accuracies
+        """
+        proba, early = self._cascade(X)
+        cascade_pred = self.classes_[np.argmax(proba, axis=1)]
+
+        return {
+            'threshold': self.threshold_,
+            'early_fraction': float(early.mean()),
+            'cascade_accuracy': float((cascade_pred == y).mean()),
+            'full_accuracy': float((self.second_model_.predict(X) == y).mean()),
+            'first_stage_accuracy': float((self.first_model_.predict(X) == y).mean())
+        }
+
+    def reset_stats(self):
+        """Reset the resolved-early counters."""
+        self._stats_lock = threading.Lock()
+        self.n_frames_ = 0
+        self.n_early_ = 0
+
+    def stats(self):
+        """
+        Get counters for the frames seen since fitting or loading.
+
+        Returns:
+            Dictionary with the threshold, frame count and fraction resolved early
+        """
+        return {
+            'threshold': self.threshold_,
+            'frames': self.n_frames_,
+            'early_fraction': self.n_early_ / self.n_frames_ if self.n_frames_ else None
+        }
+
+    def __getstate__(self):
+        # Locks cannot be pickled, and serving counters should start from zero
+        state = super().__getstate__().copy()
+        state.pop('_stats_lock', None)
+        state['n_frames_'] = 0
+        state['n_early_'] = 0
+        return state
+
+    def __setstate__(self, state):
+        super().__setstate__(state)
+        self._stats_lock = threading.Lock()
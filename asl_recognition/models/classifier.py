@@ -1,34 +1,58 @@
 import numpy as np
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.model_selection import train_test_split, GridSearchCV
-from sklearn.metrics import classification_report, confusion_matrix
-import matplotlib.pyplot as plt
+import logging
 import pickle
 import os
+from contextlib import nullcontext
+
+# scikit-learn, matplotlib and the training helpers are imported where they
+# are used, so loading a model for serving (load(..., inference_only=True))
+# only needs NumPy
+
+logger = logging.getLogger('asl_recognition.models.classifier')
 
 class ASLClassifier:
     """
     A classifier for American Sign Language based on hand landmarks.
     """
     
-    def __init__(self, model_type='random_forest'):
+    def __init__(self, model_type='random_forest', model_params=None, reducer=None,
+                 train_n_jobs=-1, inference_n_jobs=-1, parallel_batch_size=1000):
         """
         Initialize the classifier.
         
         Args:
-            model_type: Type of model to use. Currently only 'random_forest' is supported.
+            model_type: Type of model to use, any name registered in models.backends
+                        ('random_forest', 'shallow_forest', 'knn_kd_tree', 'knn_ball_tree',
+                        'logistic_regression', 'mlp', 'cascade')
+            model_params: Optional overrides for the backend's default parameters
+            reducer: Optional unfitted models.reduction.FeatureReducer, fitted during
+                     train() and applied to every input before the model
+            train_n_jobs: Threads used to fit the model (-1 for all CPUs), and
+                          the n_jobs of hyperparameter tuning
+            inference_n_jobs: Threads used for predictions on batches of at
+                              least parallel_batch_size rows; smaller batches
+                              and single frames always run on the calling thread
+            parallel_batch_size: Batch size from which inference_n_jobs applies
         """
         self.model_type = model_type
+        self.model_params = model_params or {}
+        self.reducer = reducer
+        self.train_n_jobs = train_n_jobs
+        self.inference_n_jobs = inference_n_jobs
+        self.parallel_batch_size = parallel_batch_size
         
-        if model_type == 'random_forest':
-            self.model = RandomForestClassifier(n_estimators=100, random_state=42)
-        else:
-            raise ValueError(f"Unsupported model type: {model_type}")
+        # Created by train() or load()
+        self.model = None
         
         self.label_mapping = None
         self.reverse_mapping = None
+        
+        # Model version and the version that added each tree (see update())
+        self.version = 1
+        self.tree_versions = None
     
-    def train(self, X, y, label_mapping=None, tune_hyperparams=False):
+    def train(self, X, y, label_mapping=None, tune_hyperparams=False, tuning='grid',
+              tuning_options=None):
         """
         Train the classifier.
         
@@ -37,10 +61,17 @@ class ASLClassifier:
             y: numpy array of labels
             label_mapping: Dictionary mapping label indices to label names
             tune_hyperparams: Whether to tune hyperparameters
+            tuning: Tuning method, 'grid' (exhaustive) or 'halving' (successive halving)
+            tuning_options: Extra keyword arguments for models.tuning.tune_random_forest
+                            (e.g. resource, subsample, cv_cache_path)
         
         Returns:
             Trained model
         """
+        from sklearn.model_selection import train_test_split
+        from sklearn.metrics import classification_report
+        from .backends import create_model, set_n_jobs, parallelism
+        
         # Split data
         X_train, X_val, y_train, y_val = train_test_split(
             X, y, test_size=0.2, random_state=42, stratify=y)
@@ -50,35 +81,99 @@ class ASLClassifier:
         if label_mapping:
             self.reverse_mapping = {v: k for k, v in label_mapping.items()}
         
+        # Fit the feature reduction on the training split only
+        if self.reducer is not None:
+            X_train = self.reducer.fit_transform(X_train, y_train)
+            X_val = self.reducer.transform(X_val)
+            print(f"Feature reduction ({self.reducer.method}): "
+                  f"{self.reducer.n_features_in} -> {self.reducer.n_components} features")
+        
         # Hyperparameter tuning
         if tune_hyperparams and self.model_type == 'random_forest':
-            param_grid = {
-                'n_estimators': [50, 100, 200],
-                'max_depth': [None, 10, 20, 30],
-                'min_samples_split': [2, 5, 10]
-            }
+            from .tuning import tune_random_forest
             
-            grid_search = GridSearchCV(
-                self.model, param_grid, cv=5, scoring='accuracy', n_jobs=-1)
-            grid_search.fit(X_train, y_train)
+            self.model, report = tune_random_forest(
+                X_train, y_train, method=tuning,
+                **{'n_jobs': self.train_n_jobs, **(tuning_options or {})})
             
-            print(f"Best parameters: {grid_search.best_params_}")
-            self.model = grid_search.best_estimator_
+            print(f"Best parameters: {report['best_params']}")
+            print(f"Tuning ({report['method']}) took {report['wall_time']:.1f}s "
+                  f"for {report['n_fits']} fits, CV accuracy {report['best_score']:.4f}")
         else:
             # Train model
-            self.model.fit(X_train, y_train)
+            self.model = create_model(self.model_type, **self.model_params)
+            with parallelism(self.train_n_jobs):
+                self.model.fit(X_train, y_train)
+        
+        # Keep the model configured for serving (see models.backends.set_n_jobs)
+        set_n_jobs(self.model, None)
         
         # Evaluate on validation set
-        val_accuracy = self.model.score(X_val, y_val)
+        with self._inference_parallelism(len(X_val)):
+            val_accuracy = self.model.score(X_val, y_val)
         print(f"Validation accuracy: {val_accuracy:.4f}")
         
         # Detailed evaluation
-        y_pred = self.model.predict(X_val)
+        with self._inference_parallelism(len(X_val)):
+            y_pred = self.model.predict(X_val)
         print("\nClassification Report:")
         print(classification_report(y_val, y_pred))
         
+        # Report how often the cheap first stage answered on its own
+        if self.model_type == 'cascade':
+            report = self.model.cascade_report(X_val, y_val)
+            print(f"Cascade: {report['early_fraction']:.1%} of frames resolved by the first stage "
+                  f"(threshold {report['threshold']:.3f})")
+            print(f"Cascade accuracy {report['cascade_accuracy']:.4f} vs full model alone "
+                  f"{report['full_accuracy']:.4f} (first stage alone {report['first_stage_accuracy']:.4f})")
+        
         return self.model
     
+    def update(self, X_new, y_new, n_new_trees=20, max_trees=None, replace='oldest',
+               X_replay=None, y_replay=None):
+        """
+        Incrementally update the forest with new data instead of retraining.
+        
+        Keeps the existing trees and adds n_new_trees trained on the new data.
+        Beyond max_trees, the oldest or weakest trees are dropped. Increments
+        the model version.
+        
+        Args:
+            X_new: numpy array of new landmarks
+            y_new: numpy array of new labels (same label indices as the model)
+            n_new_trees: Number of trees to add
+            max_trees: Optional tree budget after the update
+            replace: 'oldest' or 'weakest', which trees to drop beyond the budget
+            X_replay: Optional older landmarks covering classes missing from the new data
+            y_replay: Labels for X_replay
+        
+        Returns:
+            report: Dictionary describing the update (see models.incremental.update_forest)
+        """
+        if self.model_type != 'random_forest':
+            raise ValueError("Incremental updates are only available for random forests.")
+        
+        from .incremental import update_forest
+        from .backends import set_n_jobs, parallelism
+        
+        # The forest was trained on reduced features
+        X_new = self.reduce_features(X_new)
+        if X_replay is not None:
+            X_replay = self.reduce_features(X_replay)
+        
+        with parallelism(self.train_n_jobs):
+            report = update_forest(self, X_new, y_new, n_new_trees=n_new_trees,
+                                   max_trees=max_trees, replace=replace,
+                                   X_replay=X_replay, y_replay=y_replay)
+        set_n_jobs(self.model, None)
+        
+        print(f"Model v{report['version']}: {report['trees_before']} -> {report['trees_after']} trees "
+              f"(+{report['trees_added']}, -{report['trees_dropped']}) in {report['wall_time']:.1f}s")
+        print(f"Validation accuracy on update data: {report['val_accuracy_before']:.4f} -> "
+              f"{report['val_accuracy_after']:.4f}")
+        
+        return report
+    
     def evaluate(self, X, y):
         """
         Evaluate the classifier on a test set.
@@ -93,8 +188,11 @@ class ASLClassifier:
         if self.model is None:
             raise ValueError("Model has not been trained yet.")
         
+        from sklearn.metrics import classification_report
+        
         # Predict
-        y_pred = self.model.predict(X)
+        with self._inference_parallelism(len(X)):
+            y_pred = self.model.predict(self.reduce_features(X))
         
         # Calculate accuracy
         accuracy = (y_pred == y).mean()
@@ -126,6 +224,7 @@ class ASLClassifier:
         # Ensure landmarks is 2D
         if landmarks.ndim == 1:
             landmarks = landmarks.reshape(1, -1)
+        landmarks = self.reduce_features(landmarks)
         
         # Predict
         label_idx = self.model.predict(landmarks)[0]
@@ -142,6 +241,65 @@ class ASLClassifier:
         
         return label, confidence
     
+    def predict_batch(self, landmarks, tree_fraction=1.0):
+        """
+        Predict labels for a batch of landmark vectors with a single model call.
+        
+        Args:
+            landmarks: numpy array of shape (n_samples, n_features)
+            tree_fraction: Below 1, trade accuracy for speed: forests use only
+                           this fraction of their trees and cascades only their
+                           first stage (see models.inference.reduced_predict_proba)
+        
+        Returns:
+            List of (label, confidence) tuples, one per row
+        """
+        if self.model is None:
+            raise ValueError("Model has not been trained yet.")
+        
+        # predict() would run predict_proba() again internally, so derive both from one call
+        proba = None
+        with self._inference_parallelism(len(landmarks)):
+            if tree_fraction < 1.0:
+                from .inference import reduced_predict_proba
+                proba = reduced_predict_proba(self.model, self.reduce_features(landmarks),
+                                              tree_fraction)
+            if proba is None:
+                proba = self.model.predict_proba(self.reduce_features(landmarks))
+        best = np.argmax(proba, axis=1)
+        label_indices = self.model.classes_[best]
+        confidences = proba[np.arange(len(best)), best]
+        
+        results = []
+        for label_idx, confidence in zip(label_indices, confidences):
+            label = self.reverse_mapping[label_idx] if self.reverse_mapping else label_idx
+            results.append((label, confidence))
+        
+        return results
+    
+    def _inference_parallelism(self, n_rows):
+        # Thread dispatch only pays off on large batches, and compiled models
+        # (models.inference) are plain NumPy
+        if (self.inference_n_jobs in (None, 1) or n_rows < self.parallel_batch_size
+                or not hasattr(self.model, 'get_params')):
+            return nullcontext()
+        from .backends import parallelism
+        return parallelism(self.inference_n_jobs)
+    
+    def reduce_features(self, landmarks):
+        """
+        Apply the fitted feature reduction, if any.
+        
+        Args:
+            landmarks: numpy array of shape (n_samples, 63)
+        
+        Returns:
+            numpy array of model inputs
+        """
+        if self.reducer is None:
+            return landmarks
+        return self.reducer.transform(landmarks)
+    
     def save(self, model_path):
         """
         Save the model to a file.
@@ -155,32 +313,63 @@ class ASLClassifier:
         # Create directory if it doesn't exist
         os.makedirs(os.path.dirname(model_path), exist_ok=True)
         
-        # Save model and label mapping
+        from .inference import compile_model
+        from .backends import set_n_jobs
+        
+        # Never persist a training-time n_jobs
+        set_n_jobs(self.model, None)
+        
+        # Save model and label mapping. The full model is stored pickled on its
+        # own so that inference-only loads never unpickle (and import) it.
         with open(model_path, 'wb') as f:
             pickle.dump({
-                'model': self.model,
-                'label_mapping': self.label_mapping
+                'model_bytes': pickle.dumps(self.model),
+                'inference_model': compile_model(self.model),
+                'model_type': self.model_type,
+                'reducer': self.reducer,
+                'inference_n_jobs': self.inference_n_jobs,
+                'parallel_batch_size': self.parallel_batch_size,
+                'label_mapping': self.label_mapping,
+                'version': self.version,
+                'tree_versions': self.tree_versions
             }, f)
         
         print(f"Model saved to {model_path}")
     
-    def load(self, model_path):
+    def load(self, model_path, inference_only=False):
         """
         Load a model from a file.
         
         Args:
             model_path: Path to the model file
+            inference_only: Load the NumPy-only compiled model (models.inference)
+                            when the file has one. It predicts the same labels
+                            without importing scikit-learn, but cannot be
+                            trained, evaluated, updated or compressed.
         """
+        from .inference import load_pickle
+        
         with open(model_path, 'rb') as f:
-            data = pickle.load(f)
+            data = load_pickle(f)
         
-        self.model = data['model']
+        if inference_only and data.get('inference_model') is not None:
+            self.model = data['inference_model']
+        elif 'model_bytes' in data:
+            self.model = load_pickle(data['model_bytes'])
+        else:
+            self.model = data['model']
         self.label_mapping = data['label_mapping']
+        self.model_type = data.get('model_type', 'random_forest')
+        self.reducer = data.get('reducer')
+        self.inference_n_jobs = data.get('inference_n_jobs', self.inference_n_jobs)
+        self.parallel_batch_size = data.get('parallel_batch_size', self.parallel_batch_size)
+        self.version = data.get('version', 1)
+        self.tree_versions = data.get('tree_versions')
         
         if self.label_mapping:
             self.reverse_mapping = {v: k for k, v in self.label_mapping.items()}
         
-        print(f"Model loaded from {model_path}")
+        logger.info("Model loaded from %s", model_path)
     
     def plot_confusion_matrix(self, y_true, y_pred):
         """
@@ -190,32 +379,13 @@ class ASLClassifier:
             y_true: True labels
             y_pred: Predicted labels
         """
-        cm = confusion_matrix(y_true, y_pred)
+        from .evaluation import plot_confusion_matrix
         
-        plt.figure(figsize=(10, 8))
-        plt.imshow(cm, interpolation='nearest', cmap=plt.cm.Blues)
-        plt.title("Confusion Matrix")
-        plt.colorbar()
-        
-        # Add labels
+        classes = None
         if self.reverse_mapping:
             classes = [self.reverse_mapping[i] for i in sorted(self.reverse_mapping.keys())]
-            tick_marks = np.arange(len(classes))
-            plt.xticks(tick_marks, classes, rotation=90)
-            plt.yticks(tick_marks, classes)
-        
-        # Add values to the plot
-        thresh = cm.max() / 2.
-        for i in range(cm.shape[0]):
-            for j in range(cm.shape[1]):
-                plt.text(j, i, format(cm[i, j], 'd'),
-                         horizontalalignment="center",
-                         color="white" if cm[i, j] > thresh else "black")
-        
-        plt.tight_layout()
-        plt.ylabel('True label')
-        plt.xlabel('Predicted label')
-        plt.show()
+        
+        plot_confusion_matrix(y_true, y_pred, classes)
     
     def feature_importance(self):
         """
@@ -0,0 +1,197 @@
+import copy
+import pickle
+import time
+
+import numpy as np
+from sklearn.base import clone
+from sklearn.model_selection import train_test_split
+
+from .incremental import tree_accuracies
+from .inference import compile_model
+
+
+def measure_model(model, X_val, y_val, n_latency_samples=200):
+    """
+    Measure accuracy, single-frame latency and artifact size of a model.
+
+    Accuracy and latency are measured on the compiled form the APIs load
+    (models.inference), when the model has one, and the size counts both
+    forms, as saved by the classifiers.
+
+    Args:
+        model: Fitted classifier with predict and predict_proba
+        X_val: numpy array of validation landmarks
+        y_val: numpy array of validation labels
+        n_latency_samples: Number of single-row predictions to time
+
+    Returns:
+        Dictionary with accuracy, p50_ms, p99_ms and size_kb
+    """
+    compiled = compile_model(model)
+    served = compiled if compiled is not None else model
+    accuracy = float((served.predict(X_val) == y_val).mean())
+
+    rows = X_val[np.arange(n_latency_samples) % len(X_val)]
+    for row in rows[:10]:
+        served.predict_proba(row.reshape(1, -1))
+
+    timings = np.empty(len(rows))
+    for i, row in enumerate(rows):
+        start = time.perf_counter()
+        served.predict_proba(row.reshape(1, -1))
+        timings[i] = (time.perf_counter() - start) * 1000
+
+    return {
+        'accuracy': accuracy,
+        'p50_ms': float(np.percentile(timings, 50)),
+        'p99_ms': float(np.percentile(timings, 99)),
+        'size_kb': (len(pickle.dumps(model)) + len(pickle.dumps(compiled))) / 1024
+    }
+
+
+def select_top_trees(model, k, X_rank, y_rank):
+    """
+    Keep the k individually most accurate trees of a fitted forest.
+
+    Args:
+        model: Fitted RandomForestClassifier
+        k: Number of trees to keep
+        X_rank: numpy array of landmarks to rank the trees on
+        y_rank: numpy array of labels to rank the trees on
+
+    Returns:
+        compressed: A copy of the forest with k trees
+        kept: Sorted indices of the kept trees in the original forest
+    """
+    order = np.argsort(-tree_accuracies(model, X_rank, y_rank), kind='stable')
+    kept = sorted(order[:k].tolist())
+    compressed = copy.deepcopy(model)
+    compressed.estimators_ = [compressed.estimators_[i] for i in kept]
+    compressed.n_estimators = len(compressed.estimators_)
+    return compressed, kept
+
+
+def distill_forest(teacher, X_train, n_estimators=20, max_depth=12, n_augment=2,
+                   noise_scale=0.02, random_state=42):
+    """
+    Train a small forest to reproduce the predictions of a large one.
+
+    The student is fitted on the teacher's labels for the training data plus
+    jittered copies of it, which gives it more decision-boundary samples than
+    the original labels alone.
+
+    Args:
+        teacher: Fitted classifier
+        X_train: numpy array of training landmarks
+        n_estimators: Number of trees in the student
+        max_depth: Maximum depth of the student's trees
+        n_augment: Number of jittered copies of the training data
+        noise_scale: Standard deviation of the jitter in normalized units
+        random_state: Random seed
+
+    Returns:
+        Fitted student RandomForestClassifier
+    """
+    rng = np.random.RandomState(random_state)
+    X_student = [X_train]
+    for _ in range(n_augment):
+        X_student.append(X_train + rng.normal(0, noise_scale, X_train.shape))
+    X_student = np.vstack(X_student)
+
+    student = clone(teacher).set_params(
+        n_estimators=n_estimators, max_depth=max_depth, random_state=random_state)
+    student.fit(X_student, teacher.predict(X_student))
+    return student
+
+
+def candidate_models(model, X_train, y_train, rank_fraction=0.2, random_state=42):
+    """
+    Generate compressed variants of a fitted random forest.
+
+    Trees are ranked on a slice of the training split, so the held-out data
+    the candidates are scored on plays no part in choosing them.
+
+    Args:
+        model: Fitted RandomForestClassifier
+        X_train: numpy array of training landmarks
+        y_train: numpy array of training labels
+        rank_fraction: Fraction of the training split used to rank trees
+        random_state: Random seed of the ranking slice
+
+    Yields:
+        (name, model, kept) tuples; kept lists the indices of the original
+        trees the candidate is made of, or is None for a newly fitted forest
+    """
+    yield 'original', model, list(range(len(model.estimators_)))
+
+    # Drop the least useful trees, ranked on a slice of the training split
+    _, X_rank, _, y_rank = train_test_split(
+        X_train, y_train, test_size=rank_fraction, random_state=random_state, stratify=y_train)
+    for k in (50, 25, 10):
+        if k < len(model.estimators_):
+            yield (f'top_{k}_trees',) + select_top_trees(model, k, X_rank, y_rank)
+
+    # Refit with capped depth, capped leaves or cost-complexity pruning
+    n_estimators = len(model.estimators_)
+    for max_depth in (16, 12, 8):
+        yield (f'max_depth_{max_depth}',
+               clone(model).set_params(max_depth=max_depth).fit(X_train, y_train), None)
+    for max_leaf_nodes in (256, 64):
+        yield (f'max_leaf_nodes_{max_leaf_nodes}',
+               clone(model).set_params(max_leaf_nodes=max_leaf_nodes).fit(X_train, y_train), None)
+    for ccp_alpha in (0.0005, 0.002):
+        yield (f'ccp_alpha_{ccp_alpha}',
+               clone(model).set_params(ccp_alpha=ccp_alpha).fit(X_train, y_train), None)
+    for small in (50, 25):
+        if small < n_estimators:
+            yield (f'{small}_trees_depth_12',
+                   clone(model).set_params(n_estimators=small, max_depth=12).fit(X_train, y_train), None)
+
+    # Distill into a small forest
+    yield 'distilled_20_trees_depth_12', distill_forest(model, X_train, 20, 12), None
+    yield 'distilled_10_trees_depth_10', distill_forest(model, X_train, 10, 10), None
+
+
+def compress_model(model, X_train, y_train, X_val, y_val, latency_budget_ms=None,
+                   size_budget_kb=None, n_latency_samples=200):
+    """
+    Evaluate compressed variants of a model against a latency and size budget.
+
+    Args:
+        model: Fitted RandomForestClassifier
+        X_train: numpy array of training landmarks (for ranking trees and
+                 refitting candidates)
+        y_train: numpy array of training labels
+        X_val: numpy array of held-out landmarks (for scoring candidates only)
+        y_val: numpy array of held-out labels
+        latency_budget_ms: Optional p99 single-frame latency budget
+        size_budget_kb: Optional pickled size budget
+
+    Returns:
+        results: List of dictionaries, one per candidate, with its metrics and
+                 whether it fits the budget
+        best: (name, model, kept) of the most accurate candidate that fits the
+              budget (ties go to the faster one), or None if none fits; kept
+              is as yielded by candidate_models
+    """
+    results = []
+    best = None
+    best_key = None
+
+    for name, candidate, kept in candidate_models(model, X_train, y_train):
+        metrics = measure_model(candidate, X_val, y_val, n_latency_samples)
+        fits = ((latency_budget_ms is None or metrics['p99_ms'] <= latency_budget_ms)
+                and (size_budget_kb is None or metrics['size_kb'] <= size_budget_kb))
+
+        result = {'name': name, 'n_trees': len(candidate.estimators_), 'fits_budget': fits}
+        result.update(metrics)
+        results.append(result)
+
+        print(f"{name:32s} acc={metrics['accuracy']:.4f} p99={metrics['p99_ms']:.2f}ms "
+              f"size={metrics['size_kb']:.0f}KB{'' if fits else '  (over budget)'}")
+
+        key = (metrics['accuracy'], -metrics['p99_ms'])
+        if fits and (best_key is None or key > best_key):
+            best, best_key = (name, candidate, kept), key
+
+    return results, best
@@ -0,0 +1,142 @@
+import time
+
+import numpy as np
+from sklearn.model_selection import train_test_split
+
+
+def remap_labels(y, source_mapping, target_mapping):
+    """
+    Map label indices from one dataset's label mapping onto another's.
+
+    Datasets built by create_landmark_dataset number their classes from the
+    directories they contain, so a batch with fewer classes uses different
+    indices than the full model.
+
+    Args:
+        y: numpy array of label indices under source_mapping
+        source_mapping: Dictionary mapping label names to indices for y
+        target_mapping: Dictionary mapping label names to indices for the model
+
+    Returns:
+        numpy array of label indices under target_mapping
+    """
+    lookup = {}
+    for name, index in source_mapping.items():
+        if name not in target_mapping:
+            raise ValueError(f"Label {name} is not known to the model")
+        lookup[index] = target_mapping[name]
+
+    return np.array([lookup[label] for label in y])
+
+
+def tree_accuracies(model, X, y):
+    """
+    Score every tree of a fitted forest on its own.
+
+    Args:
+        model: Fitted RandomForestClassifier
+        X: numpy array of landmarks
+        y: numpy array of labels
+
+    Returns:
+        numpy array with the accuracy of each tree
+    """
+    # Individual trees predict encoded class positions, not the labels themselves
+    encoded = np.searchsorted(model.classes_, y)
+    return np.array([(tree.predict(X) == encoded).mean() for tree in model.estimators_])
+
+
+def update_forest(classifier, X_new, y_new, n_new_trees=20, max_trees=None, replace='oldest',
+                  X_replay=None, y_replay=None, validation_fraction=0.2, random_state=42):
+    """
+    Grow a fitted random forest with trees trained on new data only.
+
+    The existing trees are kept and n_new_trees are added with warm_start, so
+    the cost is that of fitting the new trees on the new batch. If max_trees is
+    set and exceeded, the oldest trees (lowest version) or the weakest trees
+    (lowest accuracy on the held-out part of the new data) are dropped.
+
+    Every tree in a forest must know every class, so the new data has to cover
+    all classes of the model; pass a replay sample of older data (X_replay,
+    y_replay) to fill in classes missing from the new batch.
+
+    Args:
+        classifier: ASLClassifier with a fitted random forest
+        X_new: numpy array of new landmarks
+        y_new: numpy array of new labels (same indices as the model)
+        n_new_trees: Number of trees to add
+        max_trees: Optional tree budget after the update
+        replace: 'oldest' or 'weakest', which trees to drop beyond the budget
+        X_replay: Optional older landmarks mixed into the update
+        y_replay: Labels for X_replay
+        validation_fraction: Fraction of the update data held out for scoring
+        random_state: Random seed
+
+    Returns:
+        report: Dictionary with tree counts, accuracies and wall time
+    """
+    model = classifier.model
+    if not hasattr(model, 'estimators_'):
+        raise ValueError("Incremental updates need a fitted random forest.")
+    if replace not in ('oldest', 'weakest'):
+        raise ValueError(f"Unsupported replacement policy: {replace}")
+
+    start = time.perf_counter()
+
+    X_fit, y_fit = X_new, y_new
+    if X_replay is not None:
+        X_fit = np.vstack([X_new, X_replay])
+        y_fit = np.concatenate([y_new, y_replay])
+
+    unknown = np.setdiff1d(np.unique(y_fit), model.classes_)
+    if len(unknown):
+        raise ValueError(f"Update data contains labels the model was not trained on: {unknown}")
+    missing = np.setdiff1d(model.classes_, np.unique(y_fit))
+    if len(missing):
+        raise ValueError(f"Update data is missing classes {missing}; "
+                         "pass a replay sample of older data to cover them.")
+
+    # Hold out part of the update data to score the trees and the result
+    X_train, X_val, y_train, y_val = train_test_split(
+        X_fit, y_fit, test_size=validation_fraction, random_state=random_state, stratify=y_fit)
+
+    n_before = len(model.estimators_)
+    tree_versions = list(classifier.tree_versions or [classifier.version] * n_before)
+    new_version = classifier.version + 1
+    accuracy_before = model.score(X_val, y_val)
+
+    # Fresh seed per version so new trees never repeat the seeds of kept ones
+    model.set_params(warm_start=True, n_estimators=n_before + n_new_trees,
+                     random_state=random_state + new_version)
+    model.fit(X_train, y_train)
+    model.set_params(warm_start=False)
+    tree_versions += [new_version] * n_new_trees
+
+    dropped = 0
+    if max_trees is not None and len(model.estimators_) > max_trees:
+        dropped = len(model.estimators_) - max_trees
+        if replace == 'oldest':
+            order = np.argsort(tree_versions, kind='stable')
+        else:
+            order = np.argsort(tree_accuracies(model, X_val, y_val), kind='stable')
+
+        drop = set(order[:dropped].tolist())
+        keep = [i for i in range(len(model.estimators_)) if i not in drop]
+        model.estimators_ = [model.estimators_[i] for i in keep]
+        model.n_estimators = len(model.estimators_)
+        tree_versions = [tree_versions[i] for i in keep]
+
+    classifier.tree_versions = tree_versions
+    classifier.version = new_version
+
+    return {
+        'version': new_version,
+        'trees_before': n_before,
+        'trees_added': n_new_trees,
+        'trees_dropped': dropped,
+        'trees_after': len(model.estimators_),
+        'update_samples': len(X_train),
+        'val_accuracy_before': float(accuracy_before),
+        'val_accuracy_after': float(model.score(X_val, y_val)),
+        'wall_time': time.perf_counter() - start
+    }
@@ -0,0 +1,275 @@
+# NumPy-only predictors for serving. Unpickling a scikit-learn model imports
+# scikit-learn itself (over a second and ~100MB per process), so the
+# classifiers also save the compiled forms below and load them with
+# load(..., inference_only=True). Do not import scikit-learn or matplotlib here.
+import io
+import pickle
+import threading
+
+import numpy as np
+
+
+class CompiledForest:
+    """
+    A random forest flattened into arrays and evaluated level by level.
+    """
+
+    def __init__(self, forest):
+        """
+        Flatten a fitted RandomForestClassifier.
+
+        Args:
+            forest: Fitted RandomForestClassifier
+        """
+        features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+        offset = 0
+        for estimator in forest.estimators_:
+            tree = estimator.tree_
+            is_leaf = tree.children_left == -1
+            roots.append(offset)
+            features.append(np.where(is_leaf, 0, tree.feature))
+            thresholds.append(tree.threshold)
+            # Leaves point at themselves so every row can take the same number of steps
+            node_ids = np.arange(tree.node_count) + offset
+            lefts.append(np.where(is_leaf, node_ids, tree.children_left + offset))
+            rights.append(np.where(is_leaf, node_ids, tree.children_right + offset))
+            value = tree.value[:, 0, :]
+            values.append(value / value.sum(axis=1, keepdims=True))
+            offset += tree.node_count
+
+        self.classes_ = forest.classes_
+        self.n_estimators = len(forest.estimators_)
+        self.feature = np.concatenate(features).astype(np.intp)
+        self.threshold = np.concatenate(thresholds)
+        self.left = np.concatenate(lefts).astype(np.intp)
+        self.right = np.concatenate(rights).astype(np.intp)
+        self.value = np.concatenate(values)
+        self.roots = np.array(roots, dtype=np.intp)
+        self.max_depth = max(estimator.tree_.max_depth for estimator in forest.estimators_)
+
+    def predict_proba(self, X, n_estimators=None):
+        # scikit-learn compares float32 inputs against the thresholds
+        X = np.asarray(X, dtype=np.float32)
+        rows = np.arange(len(X))[None, :]
+        # Optionally only the first n_estimators trees, for cheaper predictions
+        nodes = np.repeat(self.roots[:n_estimators, None], len(X), axis=1)
+        for _ in range(self.max_depth):
+            go_left = X[rows, self.feature[nodes]] <= self.threshold[nodes]
+            nodes = np.where(go_left, self.left[nodes], self.right[nodes])
+        return self.value[nodes].mean(axis=0)
+
+    def predict(self, X):
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+
+class CompiledLinear:
+    """
+    Logistic regression as a matrix multiply and a softmax.
+    """
+
+    def __init__(self, model):
+        """
+        Copy the coefficients of a fitted LogisticRegression.
+
+        Args:
+            model: Fitted LogisticRegression
+        """
+        self.classes_ = model.classes_
+        self.coef = model.coef_.T.copy()
+        self.intercept = model.intercept_.copy()
+
+    def predict_proba(self, X):
+        scores = np.asarray(X, dtype=np.float64) @ self.coef + self.intercept
+        if scores.shape[1] == 1:
+            positive = 1 / (1 + np.exp(-scores))
+            return np.hstack([1 - positive, positive])
+        scores -= scores.max(axis=1, keepdims=True)
+        proba = np.exp(scores)
+        return proba / proba.sum(axis=1, keepdims=True)
+
+    def predict(self, X):
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+
+class CompiledMLP:
+    """
+    The weights of a NumpyMLP without its scikit-learn base classes.
+    """
+
+    def __init__(self, model):
+        """
+        Copy the weights of a fitted NumpyMLP.
+
+        Args:
+            model: Fitted NumpyMLP
+        """
+        self.classes_ = model.classes_
+        self.coefs_ = model.coefs_
+        self.intercepts_ = model.intercepts_
+
+    def predict_proba(self, X):
+        activations = np.asarray(X, dtype=np.float32)
+        for w, b in zip(self.coefs_[:-1], self.intercepts_[:-1]):
+            activations = np.maximum(activations @ w + b, 0)
+        logits = activations @ self.coefs_[-1] + self.intercepts_[-1]
+        if logits.shape[1] == 1:
+            positive = 1 / (1 + np.exp(-logits))
+            return np.hstack([1 - positive, positive])
+        logits -= logits.max(axis=1, keepdims=True)
+        proba = np.exp(logits)
+        return proba / proba.sum(axis=1, keepdims=True)
+
+    def predict(self, X):
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+
+class CompiledCascade:
+    """
+    A CascadeModel whose two stages are compiled.
+    """
+
+    def __init__(self, first, second, threshold):
+        """
+        Initialize the cascade.
+
+        Args:
+            first: Compiled first-stage model
+            second: Compiled second-stage model
+            threshold: First-stage confidence threshold
+        """
+        self.first = first
+        self.second = second
+        self.threshold_ = threshold
+        self.classes_ = second.classes_
+        self._init_stats()
+
+    def _init_stats(self):
+        self._stats_lock = threading.Lock()
+        self.n_frames_ = 0
+        self.n_early_ = 0
+
+    def _cascade(self, X):
+        proba = np.asarray(self.first.predict_proba(X), dtype=np.float64)
+        early = proba.max(axis=1) >= self.threshold_
+        if not early.all():
+            proba[~early] = self.second.predict_proba(X[~early])
+        return proba, early
+
+    def predict_proba(self, X):
+        proba, early = self._cascade(X)
+        with self._stats_lock:
+            self.n_frames_ += len(early)
+            self.n_early_ += int(early.sum())
+        return proba
+
+    def predict(self, X):
+        proba, _ = self._cascade(X)
+        return self.classes_[np.argmax(proba, axis=1)]
+
+    def stats(self):
+        """Same counters as CascadeModel.stats()."""
+        return {
+            'threshold': self.threshold_,
+            'frames': self.n_frames_,
+            'early_fraction': self.n_early_ / self.n_frames_ if self.n_frames_ else None
+        }
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state.pop('_stats_lock', None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._init_stats()
+
+
+def reduced_predict_proba(model, X, tree_fraction):
+    """
+    Cheaper, less accurate class probabilities for use under overload.
+
+    Forests use only the first tree_fraction of their trees, and cascades
+    use only their first stage. Other models have no cheaper form.
+
+    Args:
+        model: Fitted or compiled model
+        X: numpy array of shape (n_samples, n_features)
+        tree_fraction: Fraction of a forest's trees to use
+
+    Returns:
+        numpy array of class probabilities, or None when the model has no
+        reduced form
+    """
+    kind = type(model).__name__
+    if kind == 'CompiledForest':
+        return model.predict_proba(X, max(1, int(model.n_estimators * tree_fraction)))
+    if kind == 'RandomForestClassifier':
+        estimators = model.estimators_[:max(1, int(len(model.estimators_) * tree_fraction))]
+        X = np.asarray(X, dtype=np.float32)
+        return sum(estimator.predict_proba(X, check_input=False)
+                   for estimator in estimators) / len(estimators)
+    if kind == 'CompiledCascade':
+        return np.asarray(model.first.predict_proba(X), dtype=np.float64)
+    if kind == 'CascadeModel':
+        return np.asarray(model.first_model_.predict_proba(X), dtype=np.float64)
+    return None
+
+
+def compile_model(model):
+    """
+    Convert a fitted model into a NumPy-only predictor.
+
+    Args:
+        model: Fitted model from models.backends
+
+    Returns:
+        Compiled predictor with predict, predict_proba and classes_, or None
+        for models that have no compiled form (k-NN needs its search tree)
+    """
+    kind = type(model).__name__
+    if kind == 'RandomForestClassifier':
+        return CompiledForest(model)
+    if kind == 'LogisticRegression':
+        return CompiledLinear(model)
+    if kind == 'NumpyMLP':
+        return CompiledMLP(model)
+    if kind == 'CascadeModel':
+        first = compile_model(model.first_model_)
+        second = compile_model(model.second_model_)
+        if first is None or second is None:
+            return None
+        return CompiledCascade(first, second, model.threshold_)
+    return None
+
+
+class ModelUnpickler(pickle.Unpickler):
+    """
+    Unpickler that resolves this package's classes under whichever name it was
+    imported as.
+
+    Models saved through the asl_recognition package reference e.g.
+    asl_recognition.models.inference, while the APIs import the same modules
+    as models.inference when run from their own directory.
+    """
+
+    def find_class(self, module, name):
+        for prefix in ('asl_recognition.models.', 'models.'):
+            if module.startswith(prefix):
+                module = __package__ + '.' + module[len(prefix):]
+                break
+        return super().find_class(module, name)
+
+
+def load_pickle(file_or_bytes):
+    """
+    Unpickle a model file (or bytes) with ModelUnpickler.
+
+    Args:
+        file_or_bytes: Binary file object or bytes
+
+    Returns:
+        The unpickled object
+    """
+    if isinstance(file_or_bytes, bytes):
+        file_or_bytes = io.BytesIO(file_or_bytes)
+    return ModelUnpickler(file_or_bytes).load()
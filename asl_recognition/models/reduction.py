@@ -0,0 +1,107 @@
+import numpy as np
+
+
+class FeatureReducer:
+    """
+    Reduces the 63 normalized landmark coordinates before classification.
+
+    'importance' keeps the k coordinates a random forest ranks as most
+    important; 'pca' projects onto the first k principal components. The
+    fitted reducer is stored with the classifier and applied in train,
+    evaluate, predict and predict_batch, so every caller sees the same inputs.
+    """
+
+    def __init__(self, method='importance', n_components=20, random_state=42):
+        """
+        Initialize the reducer.
+
+        Args:
+            method: 'importance' (top-k features) or 'pca' (k principal components)
+            n_components: Number of features to keep
+            random_state: Random seed for the importance forest
+        """
+        if method not in ('importance', 'pca'):
+            raise ValueError(f"Unsupported reduction method: {method}")
+
+        self.method = method
+        self.n_components = n_components
+        self.random_state = random_state
+
+        self.n_features_in = None
+        self.selected_features = None
+        self.mean = None
+        self.components = None
+
+    def fit(self, X, y):
+        """
+        Fit the reducer on training data.
+
+        Args:
+            X: numpy array of landmarks
+            y: numpy array of labels
+
+        Returns:
+            self
+        """
+        self.n_features_in = X.shape[1]
+        if not 0 < self.n_components <= self.n_features_in:
+            raise ValueError(f"n_components must be between 1 and {self.n_features_in}")
+
+        if self.method == 'importance':
+            from sklearn.ensemble import RandomForestClassifier
+
+            forest = RandomForestClassifier(n_estimators=50, random_state=self.random_state, n_jobs=-1)
+            forest.fit(X, y)
+            ranked = np.argsort(-forest.feature_importances_, kind='stable')
+            # Keep the original coordinate order
+            self.selected_features = np.sort(ranked[:self.n_components])
+        else:
+            from sklearn.decomposition import PCA
+
+            pca = PCA(n_components=self.n_components, random_state=self.random_state)
+            pca.fit(X)
+            # Plain arrays so transform is a subtraction and a matrix multiply
+            self.mean = pca.mean_.astype(np.float32)
+            self.components = pca.components_.T.astype(np.float32)
+
+        return self
+
+    def transform(self, X):
+        """
+        Reduce landmark vectors.
+
+        Args:
+            X: numpy array of shape (n_samples, 63)
+
+        Returns:
+            numpy array of shape (n_samples, n_components)
+        """
+        if self.method == 'importance':
+            return X[:, self.selected_features]
+        return (X - self.mean) @ self.components
+
+    def fit_transform(self, X, y):
+        """
+        Fit the reducer and reduce the training data.
+
+        Args:
+            X: numpy array of landmarks
+            y: numpy array of labels
+
+        Returns:
+            Reduced numpy array
+        """
+        return self.fit(X, y).transform(X)
+
+    def describe(self):
+        """
+        Summarize the reduction.
+
+        Returns:
+            Dictionary with the method and feature counts
+        """
+        return {
+            'method': self.method,
+            'n_features_in': self.n_features_in,
+            'n_features_out': self.n_components
+        }
@@ -0,0 +1,201 @@
+import hashlib
+import os
+import time
+
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.model_selection import GridSearchCV, StratifiedKFold, train_test_split
+# Successive halving is still experimental in scikit-learn
+from sklearn.experimental import enable_halving_search_cv  # noqa: F401
+from sklearn.model_selection import HalvingGridSearchCV
+
+# Search space shared by all tuning methods
+RF_PARAM_GRID = {
+    'n_estimators': [50, 100, 200],
+    'max_depth': [None, 10, 20, 30],
+    'min_samples_split': [2, 5, 10]
+}
+
+
+def make_cv_splits(X, y, n_splits=5, random_state=42, cache_path=None):
+    """
+    Compute stratified CV fold indices once so every candidate and every
+    halving round is scored on the same folds.
+
+    Args:
+        X: numpy array of landmarks (only its shape is used)
+        y: numpy array of labels
+        n_splits: Number of folds
+        random_state: Random seed for the fold assignment
+        cache_path: Optional .npz path; folds are loaded from it when they match
+                    a hash of y, the shape of X and the fold settings, and
+                    written to it otherwise
+
+    Returns:
+        List of (train_indices, test_indices) tuples
+    """
+    y = np.ascontiguousarray(y)
+    digest = hashlib.sha256(y.tobytes())
+    digest.update(repr((y.dtype.str, X.shape, n_splits, random_state)).encode('utf-8'))
+    fingerprint = digest.hexdigest()
+
+    if cache_path and os.path.exists(cache_path):
+        data = np.load(cache_path)
+        if str(data['fingerprint']) == fingerprint:
+            fold_ids = data['fold_ids']
+            all_indices = np.arange(len(y))
+            return [(all_indices[fold_ids != k], all_indices[fold_ids == k])
+                    for k in range(n_splits)]
+
+    skf = StratifiedKFold(n_splits=n_splits, shuffle=True, random_state=random_state)
+    splits = list(skf.split(np.zeros(len(y)), y))
+
+    if cache_path:
+        fold_ids = np.empty(len(y), dtype=np.int32)
+        for k, (_, test_indices) in enumerate(splits):
+            fold_ids[test_indices] = k
+        os.makedirs(os.path.dirname(cache_path) or '.', exist_ok=True)
+        np.savez(cache_path, fingerprint=fingerprint, fold_ids=fold_ids)
+
+    return splits
+
+
+def stratified_subsample(X, y, fraction, random_state=42):
+    """
+    Take a stratified random subsample of the data.
+
+    Args:
+        X: numpy array of landmarks
+        y: numpy array of labels
+        fraction: Fraction of samples to keep (0-1)
+        random_state: Random seed
+
+    Returns:
+        X_sub, y_sub
+    """
+    if fraction >= 1.0:
+        return X, y
+    X_sub, _, y_sub, _ = train_test_split(
+        X, y, train_size=fraction, random_state=random_state, stratify=y)
+    return X_sub, y_sub
+
+
+def tune_random_forest(X, y, method='halving', resource='n_samples', cv=5, factor=3,
+                       subsample=None, n_finalists=3, cv_cache_path=None,
+                       n_jobs=-1, random_state=42):
+    """
+    Tune random forest hyperparameters.
+
+    'grid' fits every combination of RF_PARAM_GRID on every fold. 'halving'
+    runs successive halving: all candidates are scored with a small budget and
+    only the best 1/factor move on to the next round with factor times more
+    budget. The budget is either the number of training samples
+    (resource='n_samples') or the number of trees (resource='n_estimators').
+
+    With subsample set, the search first runs on a stratified subsample and
+    only the n_finalists best candidates are re-scored on the full data.
+
+    Halving is not a drop-in replacement for the grid: a candidate that only
+    wins with the full budget can be dropped in an early round, so the chosen
+    model may score below the grid's. On a 2.3k-sample A-F slice it was
+    2.2x (n_samples) and 6x (n_estimators) faster than the grid, not 10x, and
+    its model matched the grid's on the test split; compare both on your data
+    before switching.
+
+    Args:
+        X: numpy array of landmarks (training split)
+        y: numpy array of labels
+        method: 'halving' or 'grid'
+        resource: Halving budget, 'n_samples' or 'n_estimators'
+        cv: Number of CV folds
+        factor: Halving factor
+        subsample: Optional fraction of the data for the first search
+        n_finalists: Candidates re-scored on the full data after a subsample search
+        cv_cache_path: Optional .npz path for caching the full-data CV folds
+        n_jobs: Parallel jobs for fitting
+        random_state: Random seed
+
+    Returns:
+        best_estimator: Fitted RandomForestClassifier
+        report: Dictionary with best_params, best_score, wall_time and fit counts
+    """
+    if method not in ('halving', 'grid'):
+        raise ValueError(f"Unsupported tuning method: {method}")
+    if resource not in ('n_samples', 'n_estimators'):
+        raise ValueError(f"Unsupported halving resource: {resource}")
+
+    start = time.perf_counter()
+    estimator = RandomForestClassifier(random_state=random_state)
+
+    param_grid = dict(RF_PARAM_GRID)
+    if method == 'halving' and resource == 'n_estimators':
+        # The number of trees is the budget, so it is not searched over
+        param_grid.pop('n_estimators')
+
+    X_search, y_search = X, y
+    if subsample:
+        X_search, y_search = stratified_subsample(X, y, subsample, random_state)
+        search_splits = make_cv_splits(X_search, y_search, cv, random_state)
+    else:
+        search_splits = make_cv_splits(X, y, cv, random_state, cv_cache_path)
+
+    if method == 'grid':
+        search = GridSearchCV(
+            estimator, param_grid, cv=search_splits, scoring='accuracy', n_jobs=n_jobs)
+        n_fits = len(search_splits) * int(np.prod([len(v) for v in param_grid.values()]))
+    else:
+        halving_options = {}
+        if resource == 'n_estimators':
+            halving_options = {'max_resources': max(RF_PARAM_GRID['n_estimators']),
+                               'min_resources': min(RF_PARAM_GRID['n_estimators']) // 2}
+        search = HalvingGridSearchCV(
+            estimator, param_grid, cv=search_splits, factor=factor, resource=resource,
+            scoring='accuracy', n_jobs=n_jobs, random_state=random_state,
+            refit=not subsample, **halving_options)
+    search.fit(X_search, y_search)
+
+    if method == 'halving':
+        n_fits = len(search_splits) * int(np.sum(search.n_candidates_))
+
+    if subsample:
+        # Re-score the best candidates from the subsample search on the full data
+        results = search.cv_results_
+        if method == 'halving':
+            # Only candidates from the last round were scored with the full budget
+            last_round = results['iter'] == np.max(results['iter'])
+            order = np.flatnonzero(last_round)[np.argsort(-results['mean_test_score'][last_round])]
+        else:
+            order = np.argsort(-results['mean_test_score'])
+
+        finalists = []
+        for index in order:
+            params = results['params'][index]
+            if params not in finalists:
+                finalists.append(params)
+            if len(finalists) >= n_finalists:
+                break
+
+        if method == 'halving' and resource == 'n_estimators':
+            # Halving fixed n_estimators as the budget; score finalists at full size
+            finalists = [dict(params, n_estimators=max(RF_PARAM_GRID['n_estimators']))
+                         for params in finalists]
+
+        full_splits = make_cv_splits(X, y, cv, random_state, cv_cache_path)
+        search = GridSearchCV(
+            estimator, [{k: [v] for k, v in params.items()} for params in finalists],
+            cv=full_splits, scoring='accuracy', n_jobs=n_jobs)
+        search.fit(X, y)
+        n_fits += len(full_splits) * len(finalists)
+
+    wall_time = time.perf_counter() - start
+    report = {
+        'method': method,
+        'resource': resource if method == 'halving' else None,
+        'subsample': subsample,
+        'best_params': search.best_params_,
+        'best_score': float(search.best_score_),
+        'n_fits': n_fits,
+        'wall_time': wall_time
+    }
+
+    return search.best_estimator_, report
@@ -0,0 +1,169 @@
+#!/usr/bin/env python
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import importlib
+from concurrent.futures import ThreadPoolExecutor
+
+# The APIs import their helpers as utils.* and models.*, relative to this directory
+current_dir = os.path.dirname(os.path.abspath(__file__))
+if current_dir not in sys.path:
+    sys.path.insert(0, current_dir)
+# and the client is imported from the asl_recognition package
+parent_dir = os.path.dirname(current_dir)
+if parent_dir not in sys.path:
+    sys.path.append(parent_dir)
+
+from utils.traffic import load_traffic, replay_traffic, summarize_replay
+
+def inprocess_sender(app_module, model_path, concurrency):
+    """
+    Build a sender that runs records through an API's pipeline in this process.
+
+    Image records go through predict_from_image_data; landmark-only records
+    skip detection and go straight to the API's classify step.
+
+    Args:
+        app_module: 'api' or 'a_to_f_api'
+        model_path: Model to load instead of the API's default, or None
+        concurrency: Pipeline threads
+
+    Returns:
+        Coroutine function for replay_traffic
+    """
+    app = importlib.import_module(app_module)
+    if model_path:
+        app.MODEL_PATH = model_path
+    app.load_model()
+    executor = ThreadPoolExecutor(max_workers=concurrency)
+    letter_map = getattr(app, 'LETTER_MAP', None)
+
+    def run(header, payload):
+        request_log = app.RequestLog(app.logger, header['endpoint'])
+        sign = None
+        try:
+            if header['payload'] == 'image':
+                result = app.predict_from_image_data(payload, request_log, header['session'])
+                sign = result['sign']
+            elif header['payload'] == 'landmarks':
+                with request_log.stage('normalize'):
+                    normalized = app.normalize_landmarks(payload)
+                with request_log.stage('classify'):
+                    sign, _ = app.classify(normalized, header['session'], request_log)
+                # The A-F classifier returns label indices, mapped to letters by its API
+                if letter_map and sign.isdigit() and int(sign) in letter_map:
+                    sign = letter_map[int(sign)]
+                request_log.outcome = 'ok'
+            else:
+                return None
+        except Exception:
+            if request_log.outcome is None:
+                request_log.outcome = 'server_error'
+        return {'outcome': request_log.outcome, 'sign': sign, 'stages_ms': dict(request_log.stages)}
+
+    async def send(header, payload):
+        return await asyncio.get_running_loop().run_in_executor(executor, run, header, payload)
+
+    return send
+
+def http_sender(client):
+    """
+    Build a sender that posts image records to a running server.
+
+    Landmark-only records cannot be sent over HTTP and are skipped.
+
+    Args:
+        client: AsyncASLClient connected to the server
+
+    Returns:
+        Coroutine function for replay_traffic
+    """
+    from asl_recognition.client import ASLClientError
+
+    async def send(header, payload):
+        if header['payload'] != 'image':
+            return None
+        try:
+            result = await client.predict(payload, session_id=header['session'],
+                                          content_type=header['content_type'] or 'image/jpeg')
+        except ASLClientError as e:
+            outcome = {400: 'invalid_image', 429: 'rejected', 503: 'rejected'}.get(e.status_code, 'server_error')
+            return {'outcome': outcome, 'sign': None, 'stages_ms': {}}
+        return {
+            'outcome': 'ok' if result['has_hand'] else 'no_hand',
+            'sign': result['sign'],
+            'stages_ms': result['timing']['server_ms']
+        }
+
+    return send
+
+def format_percentiles(values):
+    if values is None:
+        return '-'
+    return ' / '.join(f"{value:.1f}" for value in values.values())
+
+def main():
+    parser = argparse.ArgumentParser(description='Replay recorded API traffic and compare its performance with the recording')
+    parser.add_argument('logs', nargs='+',
+                        help='Traffic logs written by the APIs (ASL_RECORD_PATH)')
+    parser.add_argument('--target', type=str, default='inprocess',
+                        help="'inprocess' to run the pipeline here, or the base URL of a running API")
+    parser.add_argument('--api', type=str, default='full', choices=['full', 'a_to_f'],
+                        help='Which API pipeline to run in process')
+    parser.add_argument('--model_path', type=str, default=None,
+                        help="Model for the in-process pipeline (default: the API's own)")
+    parser.add_argument('--speed', type=float, default=1.0,
+                        help='Replay speed relative to the recording (0: as fast as possible)')
+    parser.add_argument('--concurrency', type=int, default=4,
+                        help='Pipeline threads, or HTTP connections')
+    parser.add_argument('--limit', type=int, default=None,
+                        help='Replay only the first N records')
+    parser.add_argument('--output', type=str, default=None,
+                        help='Optional JSON file for the comparison report')
+    args = parser.parse_args()
+
+    records = load_traffic(args.logs)[:args.limit]
+    print(f"Loaded {len(records)} records from {len(args.logs)} log(s)")
+
+    async def run():
+        if args.target == 'inprocess':
+            send = inprocess_sender('api' if args.api == 'full' else 'a_to_f_api',
+                                    args.model_path, args.concurrency)
+            start = time.perf_counter()
+            replayed = await replay_traffic(records, send, args.speed, args.concurrency)
+            return replayed, time.perf_counter() - start
+
+        from asl_recognition.client import AsyncASLClient
+        async with AsyncASLClient(args.target, max_connections=args.concurrency,
+                                  batch_window_ms=0, max_retries=0) as client:
+            start = time.perf_counter()
+            replayed = await replay_traffic(records, http_sender(client), args.speed, args.concurrency)
+            return replayed, time.perf_counter() - start
+
+    replayed, wall_time = asyncio.run(run())
+    report = summarize_replay(replayed, wall_time)
+
+    print(f"Replayed {report['requests']} requests ({len(records) - report['requests']} skipped), "
+          f"recorded over {report['recorded_seconds']:.1f}s, in {report['replay_seconds']:.1f}s "
+          f"({report['throughput'] or 0:.1f} requests/s)")
+    print("Latency p50 / p95 / p99 (ms):")
+    print(f"  {'total':<12} recorded {format_percentiles(report['latency_ms']['recorded']):<24} "
+          f"replayed {format_percentiles(report['latency_ms']['replayed'])}")
+    for name, stage in report['stages_ms'].items():
+        print(f"  {name:<12} recorded {format_percentiles(stage['recorded']):<24} "
+              f"replayed {format_percentiles(stage['replayed'])}")
+    print(f"Send lag p50 / p95 / p99 (ms): {format_percentiles(report['lag_ms'])}")
+    print(f"Outcomes: {report['outcomes']}")
+    if report['sign_agreement'] is not None:
+        print(f"Predictions matching the recording: {report['sign_agreement']:.1%}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Report written to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -1,23 +1,13 @@
-import uvicorn
+#!/usr/bin/env python
 import os
 import sys
-import subprocess
 
-# Get the absolute path to the current directory
+# Make run_api importable when started from another directory
 current_dir = os.path.dirname(os.path.abspath(__file__))
+if current_dir not in sys.path:
+    sys.path.insert(0, current_dir)
+
+from run_api import main
 
 if __name__ == "__main__":
-    try:
-        # Change to the asl_recognition directory
-        os.chdir(current_dir)
-        
-        # Print current working directory for debugging
-        print(f"Running from directory: {os.getcwd()}")
-        
-        # Run using direct path to the file
-        result = subprocess.run(["python", "a_to_f_api.py"], 
-                             check=True, 
-                             text=True,
-                             capture_output=False)
-    except Exception as e:
-        print(f"Error running API: {e}") 
\ No newline at end of file
+    main('a_to_f_api', default_port=8001)
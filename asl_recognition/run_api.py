@@ -1,6 +1,43 @@
 #!/usr/bin/env python
-import uvicorn
-from api import app  # Direct import from the local api.py file
+import os
+import sys
+import argparse
+
+# The APIs import their helpers as utils.* and models.*, relative to this directory
+current_dir = os.path.dirname(os.path.abspath(__file__))
+if current_dir not in sys.path:
+    sys.path.insert(0, current_dir)
+
+from utils.workers import PreforkServer
+
+def main(app_module='api', default_port=8000):
+    parser = argparse.ArgumentParser(description=f'Serve {app_module}.py with preloaded, forked workers')
+    parser.add_argument('--host', type=str, default='0.0.0.0',
+                        help='Interface to listen on')
+    parser.add_argument('--port', type=int, default=default_port,
+                        help='Port to listen on')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Worker processes (default: one per available CPU)')
+    parser.add_argument('--threads_per_worker', type=int, default=None,
+                        help='Native threads per worker for BLAS/OpenMP and OpenCV '
+                             '(default: available CPUs / workers)')
+    parser.add_argument('--pin_cpus', action='store_true',
+                        help='Pin each worker to its own share of the CPUs')
+    parser.add_argument('--log_level', type=str, default='info',
+                        help='uvicorn log level')
+    parser.add_argument('--reload', action='store_true',
+                        help='Development mode: a single auto-reloading process')
+    args = parser.parse_args()
+
+    if args.reload:
+        import uvicorn
+        uvicorn.run(f"{app_module}:app", host=args.host, port=args.port, reload=True,
+                    app_dir=current_dir, log_level=args.log_level)
+        return
+
+    PreforkServer(app_module, host=args.host, port=args.port, workers=args.workers,
+                  threads_per_worker=args.threads_per_worker, pin_cpus=args.pin_cpus,
+                  log_level=args.log_level).run()
 
 if __name__ == "__main__":
-    uvicorn.run(app, host="0.0.0.0", port=8000, reload=True) 
\ No newline at end of file
+    main()
@@ -1,37 +1,94 @@
 #!/usr/bin/env python
-import requests
-import time
+import argparse
+import asyncio
+import glob
+import os
 import sys
+import time
+
+import httpx
+
+# Add the parent directory to the path for direct execution
+parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if parent_dir not in sys.path:
+    sys.path.append(parent_dir)
 
-def test_api_health():
+from asl_recognition.client import AsyncASLClient
+
+async def test_api_health(client):
     """Test if the ASL API is running by checking the health endpoint."""
-    url = "http://localhost:8000/health"
     try:
-        print(f"Testing API at {url}...")
-        response = requests.get(url)
-    if response.status_code == 200:
-            data = response.json()
-            print("API is online!")
-            print(f"Status: {data['status']}")
-            print(f"Model loaded: {data['model_loaded']}")
-            return True
-    else:
-            print(f"Error: API returned status code {response.status_code}")
-            return False
-    except requests.ConnectionError:
+        print(f"Testing API at {client.base_url}/health...")
+        data = await client.health()
+        print("API is online!")
+        print(f"Status: {data['status']}")
+        print(f"Model loaded: {data['model_loaded']}")
+        return True
+    except httpx.TransportError:
         print("Error: Could not connect to the API.")
-        print("Make sure the API server is running on http://localhost:8000")
+        print(f"Make sure the API server is running on {client.base_url}")
+        return False
+    except Exception as e:
+        print(f"Error: {e}")
         return False
 
+async def test_api_throughput(client, image_paths):
+    """Send every image through the client and report throughput and timings."""
+    images = [open(path, 'rb').read() for path in image_paths]
+    print(f"Sending {len(images)} images...")
+
+    start = time.perf_counter()
+    results = await client.predict_many(images)
+    elapsed = time.perf_counter() - start
+
+    hands = sum(result['has_hand'] for result in results)
+    total_ms = sorted(result['timing']['total_ms'] for result in results)
+    batch_sizes = [result['timing']['batch_size'] for result in results]
+    print(f"{len(images) / elapsed:.1f} images/s ({hands}/{len(images)} with a hand)")
+    print(f"Latency: median {total_ms[len(total_ms) // 2]:.1f} ms, "
+          f"p95 {total_ms[int(len(total_ms) * 0.95)]:.1f} ms, "
+          f"mean batch size {sum(batch_sizes) / len(batch_sizes):.1f}")
+
+async def main():
+    parser = argparse.ArgumentParser(description='Check a recognition API and optionally measure its throughput')
+    parser.add_argument('--url', type=str, default='http://localhost:8000',
+                        help='Base URL of the API')
+    parser.add_argument('--images', type=str, default=None,
+                        help='Optional directory of images (searched recursively) to send')
+    parser.add_argument('--connections', type=int, default=4,
+                        help='Pooled connections')
+    parser.add_argument('--batch_window_ms', type=float, default=5.0,
+                        help='Window for combining frames into batch requests (0 to disable)')
+    parser.add_argument('--max_batch_size', type=int, default=16,
+                        help='Most frames per batch request')
+    args = parser.parse_args()
+
+    image_paths = []
+    if args.images:
+        image_paths = sorted(path for path in glob.glob(os.path.join(args.images, '**', '*'), recursive=True)
+                             if path.lower().endswith(('.jpg', '.jpeg', '.png')))
+        if not image_paths:
+            print(f"Error: No .jpg, .jpeg or .png images found in {args.images}")
+            return 1
+
+    async with AsyncASLClient(args.url, max_connections=args.connections,
+                              batch_window_ms=args.batch_window_ms,
+                              max_batch_size=args.max_batch_size) as client:
+        # If API is not ready, wait and retry a few times
+        max_retries = 5
+        for i in range(max_retries):
+            if await test_api_health(client):
+                break
+            if i < max_retries - 1:
+                print(f"Retrying in 2 seconds... (Attempt {i+1}/{max_retries})")
+                await asyncio.sleep(2)
+        else:
+            print(f"Failed to connect to the API after {max_retries} attempts.")
+            return 1
+
+        if image_paths:
+            await test_api_throughput(client, image_paths)
+    return 0
+
 if __name__ == "__main__":
-    # If API is not ready, wait and retry a few times
-    max_retries = 5
-    for i in range(max_retries):
-        if test_api_health():
-            sys.exit(0)
-        if i < max_retries - 1:
-            print(f"Retrying in 2 seconds... (Attempt {i+1}/{max_retries})")
-            time.sleep(2)
-    
-    print(f"Failed to connect to the API after {max_retries} attempts.")
-    sys.exit(1) 
\ No newline at end of file
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,127 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from asl_recognition.utils.admission import AdmissionController
+
+
+async def hold(controller, client_id, release, admitted):
+    async with controller.admit(client_id):
+        admitted.append(client_id)
+        await release.wait()
+
+
+async def settle():
+    # Let the started tasks reach their slot or their place in the queue
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+def test_client_over_fair_share_is_rejected():
+    async def scenario():
+        controller = AdmissionController(max_concurrency=1, max_queue=1, queue_timeout=5)
+        release, admitted = asyncio.Event(), []
+        tasks = [asyncio.create_task(hold(controller, 'a', release, admitted)) for _ in range(2)]
+        await settle()
+
+        with pytest.raises(HTTPException) as rejected:
+            async with controller.admit('a'):
+                pass
+
+        release.set()
+        await asyncio.gather(*tasks)
+        return controller, rejected.value, admitted
+
+    controller, rejected, admitted = asyncio.run(scenario())
+    assert rejected.status_code == 429
+    assert 'Retry-After' in rejected.headers
+    assert admitted == ['a', 'a']
+    assert controller.rejected_fair_share == 1
+    assert controller.stats()['active_clients'] == 0
+
+
+def test_full_queue_evicts_the_most_loaded_client():
+    async def scenario():
+        controller = AdmissionController(max_concurrency=1, max_queue=2, queue_timeout=5)
+        release, admitted = asyncio.Event(), []
+        heavy = [asyncio.create_task(hold(controller, 'a', release, admitted)) for _ in range(3)]
+        await settle()
+        light = asyncio.create_task(hold(controller, 'b', release, admitted))
+        await settle()
+
+        release.set()
+        results = await asyncio.gather(*heavy, light, return_exceptions=True)
+        return controller, results, admitted
+
+    controller, results, admitted = asyncio.run(scenario())
+    # The newest waiter of client a made room for client b
+    assert isinstance(results[2], HTTPException) and results[2].status_code == 429
+    assert all(result is None for result in results[:2] + results[3:])
+    assert sorted(admitted) == ['a', 'a', 'b']
+    assert controller.queue_depth == 0 and controller.in_flight == 0
+
+
+def test_full_queue_rejects_when_nobody_can_be_evicted():
+    async def scenario():
+        controller = AdmissionController(max_concurrency=1, max_queue=1, queue_timeout=5)
+        release, admitted = asyncio.Event(), []
+        tasks = [asyncio.create_task(hold(controller, client_id, release, admitted))
+                 for client_id in ('a', 'b')]
+        await settle()
+
+        with pytest.raises(HTTPException) as rejected:
+            async with controller.admit('c'):
+                pass
+
+        release.set()
+        await asyncio.gather(*tasks)
+        return controller, rejected.value
+
+    controller, rejected = asyncio.run(scenario())
+    assert rejected.status_code == 503
+    assert controller.rejected_busy == 1
+
+
+def test_freed_slot_goes_to_the_client_with_fewest_running():
+    async def scenario():
+        controller = AdmissionController(max_concurrency=2, max_queue=4, queue_timeout=5)
+        first, rest, admitted = asyncio.Event(), asyncio.Event(), []
+        tasks = [asyncio.create_task(hold(controller, 'a', first, admitted)),
+                 asyncio.create_task(hold(controller, 'a', rest, admitted))]
+        await settle()
+        # a queues before b, but already runs a request when the slot frees
+        tasks.append(asyncio.create_task(hold(controller, 'a', rest, admitted)))
+        await settle()
+        tasks.append(asyncio.create_task(hold(controller, 'b', rest, admitted)))
+        await settle()
+
+        first.set()
+        await settle()
+        order = list(admitted)
+        rest.set()
+        await asyncio.gather(*tasks)
+        return order
+
+    assert asyncio.run(scenario()) == ['a', 'a', 'b']
+
+
+def test_queue_timeout_rejects_with_503():
+    async def scenario():
+        controller = AdmissionController(max_concurrency=1, max_queue=4, queue_timeout=0.05)
+        release, admitted = asyncio.Event(), []
+        task = asyncio.create_task(hold(controller, 'a', release, admitted))
+        await settle()
+
+        with pytest.raises(HTTPException) as rejected:
+            async with controller.admit('b'):
+                pass
+
+        release.set()
+        await task
+        return controller, rejected.value
+
+    controller, rejected = asyncio.run(scenario())
+    assert rejected.status_code == 503
+    assert controller.timed_out == 1
+    assert controller.queue_depth == 0
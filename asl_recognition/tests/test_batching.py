@@ -0,0 +1,78 @@
+import threading
+
+import numpy as np
+import pytest
+
+from asl_recognition.utils.batching import MicroBatcher
+
+
+def test_results_go_back_to_their_requests():
+    batch_sizes = []
+
+    def predict_batch(X):
+        batch_sizes.append(len(X))
+        return [(str(int(row[0])), float(row[0])) for row in X]
+
+    batcher = MicroBatcher(predict_batch, max_batch_size=8, max_wait_ms=200)
+    futures = [batcher.submit(np.full(63, i)) for i in range(5)]
+
+    assert [future.result(timeout=5) for future in futures] == [(str(i), float(i)) for i in range(5)]
+    # Everything queued within the wait window goes out together
+    assert batch_sizes == [5]
+    assert batcher.stats()['items'] == 5
+
+
+def test_batches_are_capped_at_max_batch_size():
+    batch_sizes = []
+    started = threading.Event()
+    release = threading.Event()
+
+    def predict_batch(X):
+        batch_sizes.append(len(X))
+        started.set()
+        # Hold the first batch so the rest queue up behind it
+        release.wait(5)
+        return list(X[:, 0])
+
+    batcher = MicroBatcher(predict_batch, max_batch_size=3, max_wait_ms=0)
+    futures = [batcher.submit(np.full(63, 0))]
+    started.wait(5)
+    futures += [batcher.submit(np.full(63, i)) for i in range(1, 8)]
+    release.set()
+
+    assert [future.result(timeout=5) for future in futures] == list(range(8))
+    assert batch_sizes == [1, 3, 3, 1]
+    assert batcher.stats()['largest_batch'] == 3
+
+
+def test_errors_reach_every_request_of_the_batch():
+    def predict_batch(X):
+        raise RuntimeError('model failed')
+
+    batcher = MicroBatcher(predict_batch, max_batch_size=4, max_wait_ms=200)
+    futures = [batcher.submit(np.zeros(63)) for _ in range(3)]
+
+    for future in futures:
+        with pytest.raises(RuntimeError, match='model failed'):
+            future.result(timeout=5)
+
+
+def test_predict_blocks_concurrent_callers_until_ready():
+    batcher = MicroBatcher(lambda X: list(X.sum(axis=1)), max_batch_size=16, max_wait_ms=20)
+    results = {}
+
+    def request(i):
+        results[i] = batcher.predict(np.full(63, i))
+
+    threads = [threading.Thread(target=request, args=(i,)) for i in range(10)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+
+    assert results == {i: 63.0 * i for i in range(10)}
+
+
+def test_max_batch_size_must_be_positive():
+    with pytest.raises(ValueError):
+        MicroBatcher(lambda X: X, max_batch_size=0)
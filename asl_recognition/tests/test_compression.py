@@ -0,0 +1,33 @@
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+
+from asl_recognition.models.compression import candidate_models, select_top_trees
+
+
+def _forest(n_estimators=12):
+    rng = np.random.RandomState(0)
+    X = rng.normal(size=(120, 4))
+    y = (X[:, 0] + 0.5 * rng.normal(size=120) > 0).astype(int)
+    model = RandomForestClassifier(n_estimators=n_estimators, max_depth=3, random_state=0).fit(X, y)
+    return model, X, y
+
+
+def test_select_top_trees_returns_kept_indices():
+    model, X, y = _forest()
+    compressed, kept = select_top_trees(model, 5, X, y)
+
+    assert len(kept) == 5 and kept == sorted(kept)
+    assert compressed.n_estimators == 5
+    for tree, i in zip(compressed.estimators_, kept):
+        assert np.array_equal(tree.tree_.threshold, model.estimators_[i].tree_.threshold)
+    assert len(model.estimators_) == 12
+
+
+def test_candidate_models_mark_original_and_new_trees():
+    model, X, y = _forest(60)
+    kept_by_name = {name: kept for name, _, kept in candidate_models(model, X, y)}
+
+    assert kept_by_name['original'] == list(range(60))
+    assert len(kept_by_name['top_50_trees']) == 50
+    assert kept_by_name['max_depth_8'] is None
+    assert kept_by_name['distilled_10_trees_depth_10'] is None
@@ -0,0 +1,85 @@
+import cv2
+import numpy as np
+import pytest
+
+from asl_recognition.utils import degradation as degradation_module
+from asl_recognition.utils.degradation import DegradationController, decode_image, encoded_image_size
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(degradation_module.time, 'monotonic', lambda: now[0])
+    return now
+
+
+def test_deep_queue_degrades_one_level_per_cooldown(clock):
+    controller = DegradationController(target_p95_ms=500, queue_high=4, cooldown_ms=2000)
+
+    controller.observe(10, 4)
+    assert controller.level == 1
+    controller.observe(10, 4)
+    assert controller.level == 1
+    clock[0] += 2
+    controller.observe(10, 4)
+    assert controller.level == 2
+
+
+def test_slow_requests_degrade_and_fast_ones_recover(clock):
+    controller = DegradationController(target_p95_ms=500, min_samples=20)
+
+    for _ in range(20):
+        clock[0] += 0.1
+        controller.observe(900, 0)
+    assert controller.level == 1
+
+    clock[0] += 2
+    for _ in range(20):
+        clock[0] += 0.01
+        controller.observe(50, 0)
+    assert controller.level == 0
+    assert controller.degradations == 1 and controller.recoveries == 1
+
+
+def test_light_traffic_recovers_after_a_window(clock):
+    controller = DegradationController(target_p95_ms=500, window_ms=5000, min_samples=20)
+    controller.observe(None, 10)
+    assert controller.level == 1
+
+    # One request a second is too few for a p95, but nothing is queued
+    for _ in range(4):
+        clock[0] += 1
+        controller.observe(50, 0)
+    assert controller.level == 1
+    clock[0] += 1
+    controller.observe(50, 0)
+    assert controller.level == 0
+
+
+def test_level_settings():
+    controller = DegradationController(max_side=320, tree_fraction=0.25)
+
+    assert [controller.image_max_side(level) for level in range(4)] == [None, 320, 320, 320]
+    assert [controller.model_complexity(level) for level in range(4)] == [1, 1, 0, 0]
+    assert [controller.classifier_tree_fraction(level) for level in range(4)] == [1.0, 1.0, 1.0, 0.25]
+
+
+def test_from_env_is_off_by_default(monkeypatch):
+    monkeypatch.delenv('ASL_DEGRADE_TARGET_P95_MS', raising=False)
+    assert not DegradationController.from_env().enabled
+
+    monkeypatch.setenv('ASL_DEGRADE_TARGET_P95_MS', '500')
+    assert DegradationController.from_env().enabled
+
+
+def test_reduced_decode_keeps_at_least_max_side():
+    image = np.random.RandomState(0).randint(0, 255, (720, 1280, 3), np.uint8)
+    jpeg = cv2.imencode('.jpg', image)[1].tobytes()
+    png = cv2.imencode('.png', image[:100, :200])[1].tobytes()
+
+    assert encoded_image_size(jpeg) == (1280, 720)
+    assert encoded_image_size(png) == (200, 100)
+    assert decode_image(jpeg).shape == (720, 1280, 3)
+    assert decode_image(jpeg, max_side=320).shape == (180, 320, 3)
+    assert decode_image(jpeg, max_side=400).shape == (360, 640, 3)
+    assert decode_image(png, max_side=50).shape == (100, 200, 3)
@@ -0,0 +1,62 @@
+import pickle
+
+import numpy as np
+import pytest
+
+from asl_recognition.models.backends import create_model
+from asl_recognition.models.inference import compile_model, load_pickle, reduced_predict_proba
+
+
+def make_landmarks(n_samples=300, n_classes=4, random_state=0):
+    # Separable but noisy classes in the 63-feature landmark layout
+    rng = np.random.RandomState(random_state)
+    y = np.arange(n_samples) % n_classes
+    centers = rng.normal(0, 1, (n_classes, 63))
+    X = centers[y] + rng.normal(0, 0.8, (n_samples, 63))
+    return X, y
+
+
+@pytest.mark.parametrize('model_type', ['random_forest', 'shallow_forest', 'logistic_regression',
+                                        'mlp', 'cascade'])
+def test_compiled_model_matches_original(model_type):
+    X, y = make_landmarks()
+    model = create_model(model_type).fit(X[:200], y[:200])
+    compiled = compile_model(model)
+
+    assert compiled is not None
+    np.testing.assert_array_equal(compiled.classes_, model.classes_)
+    np.testing.assert_allclose(compiled.predict_proba(X[200:]), model.predict_proba(X[200:]),
+                               rtol=1e-5, atol=1e-6)
+    np.testing.assert_array_equal(compiled.predict(X[200:]), model.predict(X[200:]))
+
+
+def test_compiled_forest_single_rows_match_batch():
+    X, y = make_landmarks()
+    model = create_model('random_forest', n_estimators=20).fit(X, y)
+    compiled = compile_model(model)
+
+    batch = compiled.predict_proba(X[:10])
+    rows = np.vstack([compiled.predict_proba(row.reshape(1, -1)) for row in X[:10]])
+    np.testing.assert_allclose(rows, batch)
+
+
+def test_reduced_forest_matches_first_trees():
+    X, y = make_landmarks()
+    model = create_model('random_forest', n_estimators=40).fit(X, y)
+    compiled = compile_model(model)
+
+    np.testing.assert_allclose(reduced_predict_proba(compiled, X, 0.25),
+                               reduced_predict_proba(model, X, 0.25), rtol=1e-5, atol=1e-6)
+
+
+def test_knn_has_no_compiled_form():
+    X, y = make_landmarks()
+    assert compile_model(create_model('knn_kd_tree').fit(X, y)) is None
+
+
+def test_compiled_forest_survives_pickling():
+    X, y = make_landmarks()
+    compiled = compile_model(create_model('random_forest', n_estimators=10).fit(X, y))
+
+    restored = load_pickle(pickle.dumps(compiled))
+    np.testing.assert_array_equal(restored.predict_proba(X), compiled.predict_proba(X))
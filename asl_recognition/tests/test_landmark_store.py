@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+
+from asl_recognition.utils.landmark_store import (class_sample_indices, load_landmark_dataset,
+                                                  save_landmark_dataset, select_classes)
+
+LABEL_MAPPING = {'A': 0, 'B': 1, 'C': 2, 'D': 3}
+
+
+@pytest.fixture
+def dataset_path(tmp_path):
+    # Interleaved labels; each row's first value is its position in the file
+    y = np.array([2, 0, 1, 2, 3, 0, 2, 1])
+    X = np.repeat(np.arange(len(y))[:, None], 63, axis=1).astype(float)
+    path = str(tmp_path / 'landmarks.npz')
+    save_landmark_dataset(path, X, y, LABEL_MAPPING)
+    return path
+
+
+def test_index_lists_samples_in_file_order(dataset_path):
+    dataset = load_landmark_dataset(dataset_path)
+    np.testing.assert_array_equal(class_sample_indices(dataset, 2), [0, 3, 6])
+    np.testing.assert_array_equal(class_sample_indices(dataset, 1), [2, 7])
+    assert len(class_sample_indices(dataset, 9)) == 0
+
+
+def test_select_classes_relabels_in_requested_order(dataset_path):
+    X, y, mapping = select_classes(dataset_path, ['C', 'A'])
+
+    np.testing.assert_array_equal(X[:, 0], [0, 3, 6, 1, 5])
+    np.testing.assert_array_equal(y, [0, 0, 0, 1, 1])
+    assert mapping == {'C': 0, 'A': 1}
+
+
+def test_select_classes_can_keep_labels(dataset_path):
+    X, y, mapping = select_classes(dataset_path, ['B', 'D'], relabel=False)
+
+    np.testing.assert_array_equal(X[:, 0], [2, 7, 4])
+    np.testing.assert_array_equal(y, [1, 1, 3])
+    assert mapping == {'B': 1, 'D': 3}
+
+
+def test_select_classes_rejects_unknown_classes(dataset_path):
+    with pytest.raises(ValueError, match='Classes not in the dataset: Z'):
+        select_classes(dataset_path, ['A', 'Z'])
+
+
+def test_datasets_without_index_get_one_on_load(tmp_path):
+    path = str(tmp_path / 'old.npz')
+    np.savez(path, X=np.zeros((3, 63)), y=np.array([1, 0, 1]), label_mapping={'A': 0, 'B': 1})
+
+    X, y, _ = select_classes(path, ['B'])
+    assert len(X) == 2
+    np.testing.assert_array_equal(y, [0, 0])
@@ -0,0 +1,78 @@
+import numpy as np
+import pytest
+
+from asl_recognition.utils import motion_gate as motion_gate_module
+from asl_recognition.utils.motion_gate import MotionGate
+
+
+def shifted(vector, displacement):
+    # Move every landmark by displacement along x
+    moved = vector.reshape(-1, 3).copy()
+    moved[:, 0] += displacement
+    return moved.ravel()
+
+
+def test_distance_is_mean_landmark_displacement():
+    vector = np.zeros(63)
+    assert MotionGate.distance(vector, shifted(vector, 0.03)) == pytest.approx(0.03)
+
+    # Moving 7 of the 21 landmarks by (0.03, 0.04) is a mean displacement of 0.05 / 3
+    moved = vector.reshape(-1, 3).copy()
+    moved[:7, :2] = [0.03, 0.04]
+    assert MotionGate.distance(vector, moved.ravel()) == pytest.approx(0.05 / 3)
+
+
+def test_reuses_prediction_below_threshold_only():
+    gate = MotionGate(threshold=0.05, refresh_frames=100, refresh_ms=60000)
+    vector = np.random.RandomState(0).rand(63)
+
+    assert gate.lookup('s', vector) is None
+    gate.store('s', vector, ('A', 0.9))
+
+    assert gate.lookup('s', shifted(vector, 0.04)) == ('A', 0.9)
+    assert gate.lookup('s', shifted(vector, 0.06)) is None
+    assert gate.session_stats('s') == {'frames': 3, 'classified': 1, 'reused': 1,
+                                       'skipped_fraction': round(1 / 3, 4)}
+
+
+def test_refresh_after_refresh_frames():
+    gate = MotionGate(threshold=0.05, refresh_frames=2, refresh_ms=60000)
+    vector = np.zeros(63)
+    gate.lookup('s', vector)
+    gate.store('s', vector, ('A', 0.9))
+
+    assert gate.lookup('s', vector) is not None
+    assert gate.lookup('s', vector) is not None
+    assert gate.lookup('s', vector) is None
+
+
+def test_refresh_after_refresh_ms(monkeypatch):
+    clock = [100.0]
+    monkeypatch.setattr(motion_gate_module.time, 'monotonic', lambda: clock[0])
+    gate = MotionGate(threshold=0.05, refresh_frames=100, refresh_ms=500)
+    vector = np.zeros(63)
+    gate.lookup('s', vector)
+    gate.store('s', vector, ('A', 0.9))
+
+    clock[0] += 0.4
+    assert gate.lookup('s', vector) is not None
+    clock[0] += 0.2
+    assert gate.lookup('s', vector) is None
+
+
+def test_sessions_are_independent_and_bounded():
+    gate = MotionGate(threshold=0.05, max_sessions=2)
+    vector = np.zeros(63)
+    for session_id in ('a', 'b'):
+        gate.lookup(session_id, vector)
+        gate.store(session_id, vector, (session_id, 1.0))
+
+    assert gate.lookup('a', vector) == ('a', 1.0)
+    # 'b' is now the least recently used session and is dropped for 'c'
+    gate.lookup('c', vector)
+    assert gate.session_stats('b') is None
+    assert gate.lookup('a', vector) == ('a', 1.0)
+
+
+def test_zero_threshold_disables_reuse():
+    assert not MotionGate(threshold=0).enabled
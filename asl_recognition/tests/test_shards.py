@@ -0,0 +1,96 @@
+import numpy as np
+import pytest
+
+from asl_recognition.utils.landmark_extraction import merge_landmark_shards, shard_bounds
+from asl_recognition.utils.landmark_store import load_landmark_dataset, save_landmark_dataset
+
+LABEL_MAPPING = {'A': 0, 'B': 1}
+N_IMAGES = 10
+
+
+def write_shard(path, index, count=3, digest='abc', label_mapping=LABEL_MAPPING, bounds=None):
+    # Every image of the shard gets landmarks except the first, which "failed"
+    start, end = bounds or shard_bounds(N_IMAGES, index, count)
+    image_ids = np.arange(start + 1, end)
+    X = np.repeat(image_ids[:, None], 63, axis=1).astype(float)
+    y = image_ids % 2
+    save_landmark_dataset(str(path), X, y, label_mapping,
+                          shard_index=index, shard_count=count, n_images=N_IMAGES,
+                          shard_start=start, shard_end=end, file_list_digest=digest,
+                          failed_images=np.array([f'img{start}.jpg']))
+    return str(path)
+
+
+def write_shards(tmp_path, count=3):
+    return [write_shard(tmp_path / f'shard{i}.npz', i, count) for i in range(count)]
+
+
+def test_merge_concatenates_in_shard_order(tmp_path):
+    paths = write_shards(tmp_path)
+    output_path = str(tmp_path / 'merged.npz')
+
+    X, y, failed = merge_landmark_shards(paths[::-1], output_path)
+
+    expected_ids = [i for i in range(N_IMAGES) if i not in (0, 3, 6)]
+    np.testing.assert_array_equal(X[:, 0], expected_ids)
+    np.testing.assert_array_equal(y, np.array(expected_ids) % 2)
+    assert failed == ['img0.jpg', 'img3.jpg', 'img6.jpg']
+
+    merged = load_landmark_dataset(output_path)
+    np.testing.assert_array_equal(merged['X'], X)
+    assert merged['label_mapping'] == LABEL_MAPPING
+
+
+def test_merge_rejects_missing_shard(tmp_path):
+    paths = write_shards(tmp_path)
+    with pytest.raises(ValueError, match='Missing shards: \\[1\\]'):
+        merge_landmark_shards([paths[0], paths[2]], str(tmp_path / 'merged.npz'))
+
+
+def test_merge_rejects_duplicate_shard(tmp_path):
+    paths = write_shards(tmp_path)
+    copy = write_shard(tmp_path / 'copy.npz', 1)
+    with pytest.raises(ValueError, match='given twice'):
+        merge_landmark_shards(paths + [copy], str(tmp_path / 'merged.npz'))
+
+
+def test_merge_rejects_other_image_list(tmp_path):
+    paths = write_shards(tmp_path)
+    paths[2] = write_shard(tmp_path / 'other.npz', 2, digest='def')
+    with pytest.raises(ValueError, match='different image list'):
+        merge_landmark_shards(paths, str(tmp_path / 'merged.npz'))
+
+
+def test_merge_rejects_other_label_mapping(tmp_path):
+    paths = write_shards(tmp_path)
+    paths[1] = write_shard(tmp_path / 'other.npz', 1, label_mapping={'A': 1, 'B': 0})
+    with pytest.raises(ValueError, match='different label mapping'):
+        merge_landmark_shards(paths, str(tmp_path / 'merged.npz'))
+
+
+def test_merge_rejects_other_shard_count(tmp_path):
+    paths = write_shards(tmp_path)
+    paths[1] = write_shard(tmp_path / 'other.npz', 1, count=4)
+    with pytest.raises(ValueError, match='expected 3'):
+        merge_landmark_shards(paths, str(tmp_path / 'merged.npz'))
+
+
+def test_merge_rejects_wrong_slice(tmp_path):
+    paths = write_shards(tmp_path)
+    paths[1] = write_shard(tmp_path / 'other.npz', 1, bounds=(4, 7))
+    with pytest.raises(ValueError, match='Shard 1 covers the wrong images'):
+        merge_landmark_shards(paths, str(tmp_path / 'merged.npz'))
+
+
+def test_merge_rejects_unsharded_dataset(tmp_path):
+    path = str(tmp_path / 'full.npz')
+    save_landmark_dataset(path, np.zeros((2, 63)), np.array([0, 1]), LABEL_MAPPING)
+    with pytest.raises(ValueError, match='not a dataset shard'):
+        merge_landmark_shards([path], str(tmp_path / 'merged.npz'))
+
+
+def test_merge_writes_bare_filename(tmp_path, monkeypatch):
+    paths = write_shards(tmp_path)
+    monkeypatch.chdir(tmp_path)
+    merge_landmark_shards(paths, 'merged.npz')
+    assert (tmp_path / 'merged.npz').exists()
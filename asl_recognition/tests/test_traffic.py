@@ -0,0 +1,146 @@
+import asyncio
+import logging
+import os
+import time
+
+import cv2
+import numpy as np
+
+from asl_recognition.utils.logging_utils import RequestLog
+from asl_recognition.utils.traffic import (FILE_MAGIC, TrafficRecorder, load_traffic, read_traffic,
+                                           replay_traffic, summarize_replay)
+
+logger = logging.getLogger('asl_recognition.tests')
+
+
+def encode_jpeg(height=48, width=64):
+    return cv2.imencode('.jpg', np.zeros((height, width, 3), np.uint8))[1].tobytes()
+
+
+def finished_log(outcome='ok'):
+    request_log = RequestLog(logger, '/predict')
+    with request_log.stage('detect'):
+        pass
+    request_log.outcome = outcome
+    request_log.fields['degradation_level'] = 1
+    return request_log
+
+
+def wait_for(recorder, n_records, timeout=5.0):
+    # Records are written by the recorder's background thread
+    deadline = time.monotonic() + timeout
+    while recorder.recorded + recorder.dropped < n_records and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+def test_landmarks_round_trip(tmp_path):
+    recorder = TrafficRecorder(str(tmp_path / 'traffic-{pid}.log'), sample_rate=1.0)
+    landmarks = np.random.RandomState(0).rand(21, 3)
+    image = encode_jpeg()
+    result = {'sign': 'B', 'confidence': 0.9, 'has_hand': True, 'landmarks': landmarks}
+
+    recorder.record(finished_log(), image, result, session_id='session-1', client_id='client-1',
+                    content_type='image/jpeg')
+    recorder.record(finished_log('server_error'), image, None)
+    wait_for(recorder, 2)
+
+    path = str(tmp_path / f'traffic-{os.getpid()}.log')
+    records = list(read_traffic(path))
+    assert len(records) == 2
+
+    header, payload = records[0]
+    assert header['payload'] == 'landmarks'
+    assert header['endpoint'] == '/predict'
+    assert header['outcome'] == 'ok'
+    assert header['sign'] == 'B'
+    assert header['degradation_level'] == 1
+    assert header['image_size'] == [64, 48]
+    assert header['image_bytes'] == len(image)
+    assert 'detect' in header['stages_ms']
+    # Identifiers are hashed but keep their grouping
+    assert header['session'] not in (None, 'session-1')
+    np.testing.assert_array_equal(payload, landmarks.astype(np.float32))
+
+    header, payload = records[1]
+    assert header['payload'] == 'none'
+    assert header['outcome'] == 'server_error'
+    assert payload is None
+
+
+def test_images_round_trip(tmp_path):
+    recorder = TrafficRecorder(str(tmp_path / 'traffic.log'), sample_rate=1.0, mode='images')
+    image = encode_jpeg()
+    recorder.record(finished_log(), image, {'sign': 'no_hand', 'has_hand': False},
+                    batch_index=0)
+    wait_for(recorder, 1)
+
+    [(header, payload)] = read_traffic(str(tmp_path / 'traffic.log'))
+    assert header['payload'] == 'image'
+    assert header['batch_index'] == 0
+    assert header['outcome'] == 'no_hand'
+    assert payload == image
+
+
+def test_truncated_record_ends_log(tmp_path):
+    path = str(tmp_path / 'traffic.log')
+    recorder = TrafficRecorder(path, sample_rate=1.0)
+    for _ in range(2):
+        recorder.record(finished_log(), encode_jpeg(), None)
+    wait_for(recorder, 2)
+
+    with open(path, 'rb') as f:
+        data = f.read()
+    with open(path, 'wb') as f:
+        f.write(data[:-3])
+    assert len(list(read_traffic(path))) == 1
+
+
+def test_recording_stops_at_max_bytes(tmp_path):
+    path = str(tmp_path / 'traffic.log')
+    recorder = TrafficRecorder(path, sample_rate=1.0, max_bytes=len(FILE_MAGIC) + 1000)
+    for _ in range(5):
+        recorder.record(finished_log(), encode_jpeg(), None)
+    wait_for(recorder, 5)
+
+    assert recorder.recorded >= 1
+    assert recorder.recorded + recorder.dropped == 5
+    assert os.path.getsize(path) <= len(FILE_MAGIC) + 1000
+
+
+def test_disabled_recorder_never_samples():
+    assert not TrafficRecorder(None, sample_rate=1.0).sample()
+    assert not TrafficRecorder('traffic.log', sample_rate=0.0).sample()
+
+
+def test_replay_and_summary(tmp_path):
+    first = TrafficRecorder(str(tmp_path / 'a.log'), sample_rate=1.0)
+    second = TrafficRecorder(str(tmp_path / 'b.log'), sample_rate=1.0)
+    result = {'sign': 'A', 'has_hand': True, 'landmarks': np.zeros((21, 3))}
+    for i in range(4):
+        (first if i % 2 else second).record(finished_log(), encode_jpeg(), result)
+        time.sleep(0.01)
+    wait_for(first, 2)
+    wait_for(second, 2)
+
+    records = load_traffic([str(tmp_path / 'a.log'), str(tmp_path / 'b.log')])
+    timestamps = [header['ts'] for header, _ in records]
+    assert timestamps == sorted(timestamps)
+
+    positions = {id(header): i for i, (header, _) in enumerate(records)}
+
+    async def send(header, payload):
+        # Finish the earlier records last, so completion order differs from recording order
+        await asyncio.sleep(0.01 * (len(records) - positions[id(header)]))
+        return {'outcome': 'ok', 'sign': 'A', 'stages_ms': {'classify': 1.0}}
+
+    replayed = asyncio.run(replay_traffic(records, send, speed=0, concurrency=4))
+    assert len(replayed) == 4
+    assert replayed[0]['recorded']['ts'] != timestamps[0]
+
+    report = summarize_replay(replayed, wall_time=1.0)
+    assert report['requests'] == 4
+    assert report['recorded_seconds'] == round(timestamps[-1] - timestamps[0], 3)
+    assert report['recorded_seconds'] > 0
+    assert report['outcomes'] == {'ok': 4}
+    assert report['sign_agreement'] == 1.0
+    assert set(report['stages_ms']) == {'classify', 'detect'}
@@ -0,0 +1,47 @@
+import pytest
+
+from asl_recognition.utils.transcription import build_timeline
+
+FPS = 30
+
+
+def held_letter(label, start, end, frame_step=1, confidence=0.9):
+    # Predictions for the classified frames while a letter is held
+    return [(frame, label, confidence) for frame in range(start, end, frame_step)]
+
+
+@pytest.mark.parametrize('frame_step', [1, 5, 10, 15])
+def test_held_letter_survives_frame_skipping(frame_step):
+    frames = held_letter('A', 0, 3 * FPS, frame_step)
+
+    timeline = build_timeline(frames, FPS, frame_step=frame_step)
+
+    assert [entry['letter'] for entry in timeline] == ['A']
+    assert timeline[0]['start'] == 0.0
+    assert timeline[0]['end'] == pytest.approx(3.0)
+
+
+@pytest.mark.parametrize('frame_step', [1, 5])
+def test_short_gap_is_joined_and_long_gap_splits(frame_step):
+    # 0.1 s of no hand inside the first letter, then 1 s before the second
+    frames = [(frame, None if 30 <= frame < 33 else label, confidence)
+              for frame, label, confidence in held_letter('A', 0, 60, frame_step)]
+    frames += held_letter('A', 90, 120, frame_step)
+
+    timeline = build_timeline(frames, FPS, frame_step=frame_step)
+
+    assert [(entry['start'], entry['end']) for entry in timeline] == [(0.0, 2.0), (3.0, 4.0)]
+
+
+def test_flicker_is_dropped_and_interrupted_letter_joined():
+    frames = (held_letter('B', 0, 30) + held_letter('C', 30, 33) + held_letter('B', 33, 60))
+
+    timeline = build_timeline(frames, FPS)
+
+    assert [entry['letter'] for entry in timeline] == ['B']
+    assert timeline[0]['frames'] == 57
+
+
+def test_low_confidence_letters_are_dropped():
+    frames = held_letter('A', 0, 30, confidence=0.5)
+    assert build_timeline(frames, FPS) == []
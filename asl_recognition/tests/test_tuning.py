@@ -0,0 +1,55 @@
+import numpy as np
+
+from asl_recognition.models.tuning import make_cv_splits
+
+
+def same_splits(a, b):
+    return all(np.array_equal(test_a, test_b) for (_, test_a), (_, test_b) in zip(a, b))
+
+
+def test_folds_are_stratified_and_cover_every_sample():
+    y = np.repeat(np.arange(3), 20)
+    splits = make_cv_splits(np.zeros((60, 63)), y, n_splits=5)
+
+    test_indices = np.concatenate([test for _, test in splits])
+    np.testing.assert_array_equal(np.sort(test_indices), np.arange(60))
+    for train, test in splits:
+        assert np.bincount(y[test]).tolist() == [4, 4, 4]
+        assert len(np.intersect1d(train, test)) == 0
+
+
+def test_cached_folds_are_reused_for_the_same_data(tmp_path):
+    cache_path = str(tmp_path / 'folds.npz')
+    X, y = np.zeros((60, 63)), np.repeat(np.arange(3), 20)
+
+    first = make_cv_splits(X, y, cache_path=cache_path)
+    # A different seed would give other folds, unless they came from the cache
+    np.savez(cache_path, **{**np.load(cache_path), 'fold_ids': np.arange(60) % 5})
+    cached = make_cv_splits(X, y, cache_path=cache_path)
+
+    assert not same_splits(first, cached)
+    np.testing.assert_array_equal(cached[0][1], np.arange(0, 60, 5))
+
+
+def test_cache_is_ignored_for_other_labels_with_the_same_sum(tmp_path):
+    cache_path = str(tmp_path / 'folds.npz')
+    X = np.zeros((60, 63))
+    y = np.repeat(np.arange(3), 20)
+    make_cv_splits(X, y, cache_path=cache_path)
+    np.savez(cache_path, **{**np.load(cache_path), 'fold_ids': np.arange(60) % 5})
+
+    # Same length and label sum, different labels
+    swapped = y.copy()
+    swapped[[0, 59]] = swapped[[59, 0]]
+    splits = make_cv_splits(X, swapped, cache_path=cache_path)
+    assert not np.array_equal(splits[0][1], np.arange(0, 60, 5))
+
+
+def test_cache_is_ignored_for_other_feature_counts(tmp_path):
+    cache_path = str(tmp_path / 'folds.npz')
+    y = np.repeat(np.arange(3), 20)
+    make_cv_splits(np.zeros((60, 63)), y, cache_path=cache_path)
+    np.savez(cache_path, **{**np.load(cache_path), 'fold_ids': np.arange(60) % 5})
+
+    splits = make_cv_splits(np.zeros((60, 20)), y, cache_path=cache_path)
+    assert not np.array_equal(splits[0][1], np.arange(0, 60, 5))
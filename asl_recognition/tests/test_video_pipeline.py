@@ -0,0 +1,23 @@
+import cv2
+import numpy as np
+
+from asl_recognition.utils.video_pipeline import FrameDirectorySource
+
+
+def test_frame_directory_skips_undecodable_files(tmp_path):
+    for i in (0, 2):
+        cv2.imwrite(str(tmp_path / f'frame{i}.png'), np.full((8, 8, 3), i, np.uint8))
+    (tmp_path / 'frame1.jpg').write_bytes(b'not an image')
+    (tmp_path / 'notes.txt').write_text('ignored')
+
+    source = FrameDirectorySource(str(tmp_path))
+    frames = []
+    while True:
+        ok, frame = source.read()
+        if not ok:
+            break
+        frames.append(int(frame[0, 0, 0]))
+
+    assert frames == [0, 2]
+    assert source.skipped == 1
+    assert not source.isOpened()
@@ -1,8 +1,13 @@
 import os
+import json
 import numpy as np
 import argparse
 from asl_recognition.utils.landmark_extraction import create_landmark_dataset
 from asl_recognition.models.classifier import ASLClassifier
+from asl_recognition.models.backends import available_backends
+from asl_recognition.models.reduction import FeatureReducer
+from asl_recognition.utils.dedup import deduplicate_landmarks, print_dedup_report
+from asl_recognition.utils.progressive import progressive_extraction
 
 def main():
     parser = argparse.ArgumentParser(description='Train ASL recognition model')
@@ -14,8 +19,38 @@ def main():
                         help='Directory to save model and dataset')
     parser.add_argument('--extract_landmarks', action='store_true',
                         help='Extract landmarks from images')
+    parser.add_argument('--n_readers', type=int, default=2,
+                        help='File reader threads used during landmark extraction')
+    parser.add_argument('--n_decoders', type=int, default=2,
+                        help='Image decoder threads used during landmark extraction')
+    parser.add_argument('--reduce_factor', type=int, default=1, choices=[1, 2, 4, 8],
+                        help='Decode images at 1/N resolution during landmark extraction')
+    parser.add_argument('--progressive', action='store_true',
+                        help='Extract a growing stratified sample until validation accuracy plateaus')
+    parser.add_argument('--initial_per_class', type=int, default=100,
+                        help='Images per class in the first progressive round')
+    parser.add_argument('--plateau_tolerance', type=float, default=0.001,
+                        help='Smallest validation accuracy gain that lets the progressive sample grow again')
+    parser.add_argument('--model_type', type=str, default='random_forest', choices=available_backends(),
+                        help='Classifier backend to train')
+    parser.add_argument('--reduction', type=str, default=None, choices=['importance', 'pca'],
+                        help='Reduce the 63 landmark coordinates before the classifier')
+    parser.add_argument('--n_features', type=int, default=20,
+                        help='Number of features kept by --reduction')
+    parser.add_argument('--dedup_tolerance', type=float, default=None,
+                        help='Drop near-duplicate samples within this per-coordinate tolerance before training')
+    parser.add_argument('--train_n_jobs', type=int, default=-1,
+                        help='Threads used for training and tuning (-1 for all CPUs)')
     parser.add_argument('--tune_hyperparams', action='store_true',
-                        help='Tune hyperparameters')
+                        help='Tune hyperparameters (random_forest only)')
+    parser.add_argument('--tuning', type=str, default='grid', choices=['grid', 'halving'],
+                        help='Tuning method: exhaustive grid search or successive halving')
+    parser.add_argument('--halving_resource', type=str, default='n_samples',
+                        choices=['n_samples', 'n_estimators'],
+                        help='Budget that successive halving grows between rounds')
+    parser.add_argument('--tune_subsample', type=float, default=None,
+                        help='Search on this stratified fraction of the data first, '
+                             'then re-score the best candidates on all of it')
     args = parser.parse_args()
     
     # Create output directory if it doesn't exist
@@ -26,8 +61,27 @@ def main():
     # Extract landmarks from training images if requested
     if args.extract_landmarks or not os.path.exists(train_data_path):
         print("Extracting landmarks from training images...")
-        X_train, y_train, failed_train = create_landmark_dataset(
-            args.train_dir, train_data_path)
+        if args.progressive:
+            X_train, y_train, curve = progressive_extraction(
+                args.train_dir, train_data_path,
+                model_type=args.model_type,
+                initial_per_class=args.initial_per_class,
+                tolerance=args.plateau_tolerance,
+                n_readers=args.n_readers,
+                n_decoders=args.n_decoders,
+                reduce_factor=args.reduce_factor)
+            
+            # Keep the learning curve next to the dataset
+            curve_path = os.path.join(args.output_dir, 'learning_curve.json')
+            with open(curve_path, 'w') as f:
+                json.dump(curve, f, indent=2)
+            print(f"Learning curve saved to {curve_path}")
+        else:
+            X_train, y_train, failed_train = create_landmark_dataset(
+                args.train_dir, train_data_path,
+                n_readers=args.n_readers,
+                n_decoders=args.n_decoders,
+                reduce_factor=args.reduce_factor)
     else:
         # Load pre-extracted landmarks
         print("Loading pre-extracted landmarks...")
@@ -39,15 +93,31 @@ def main():
     
     # Train the classifier
     print("Training the classifier...")
-    classifier = ASLClassifier()
+    reducer = FeatureReducer(args.reduction, args.n_features) if args.reduction else None
+    classifier = ASLClassifier(model_type=args.model_type, reducer=reducer,
+                               train_n_jobs=args.train_n_jobs)
     
     # Load label mapping from the training data
     data = np.load(train_data_path, allow_pickle=True)
     label_mapping = data['label_mapping'].item()
     
+    # Remove near-duplicate frames
+    if args.dedup_tolerance:
+        X_train, y_train, dedup_report = deduplicate_landmarks(X_train, y_train, args.dedup_tolerance)
+        print_dedup_report(dedup_report, label_mapping)
+    
+    tuning_options = {
+        'subsample': args.tune_subsample,
+        'cv_cache_path': os.path.join(args.output_dir, 'cv_folds.npz')
+    }
+    if args.tuning == 'halving':
+        tuning_options['resource'] = args.halving_resource
+    
     classifier.train(X_train, y_train, 
                     label_mapping=label_mapping, 
-                    tune_hyperparams=args.tune_hyperparams)
+                    tune_hyperparams=args.tune_hyperparams,
+                    tuning=args.tuning,
+                    tuning_options=tuning_options)
     
     # Save the model
     model_path = os.path.join(args.output_dir, 'asl_model.pkl')
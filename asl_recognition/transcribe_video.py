@@ -0,0 +1,85 @@
+import os
+import csv
+import json
+import argparse
+from asl_recognition.utils.transcription import transcribe_video, build_timeline
+
+def main():
+    parser = argparse.ArgumentParser(description='Transcribe a recorded video into a timestamped letter sequence')
+    parser.add_argument('--video', type=str, required=True,
+                        help='Path to the video file')
+    parser.add_argument('--model_path', type=str, default='asl_recognition/data/asl_model.pkl',
+                        help='Path to the trained model')
+    parser.add_argument('--classifier', type=str, default='full', choices=['full', 'a_to_f'],
+                        help='Which classifier the model belongs to')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Worker processes (default: number of CPUs)')
+    parser.add_argument('--segment_seconds', type=float, default=60.0,
+                        help='Length of the video segment given to each worker task')
+    parser.add_argument('--overlap_seconds', type=float, default=2.0,
+                        help='Frames processed before each segment to warm up hand tracking')
+    parser.add_argument('--frame_step', type=int, default=1,
+                        help='Classify every Nth frame')
+    parser.add_argument('--mirror', action='store_true',
+                        help='Flip frames horizontally, as the live demo does')
+    parser.add_argument('--min_duration', type=float, default=0.3,
+                        help='Shortest time in seconds a letter must be held to count')
+    parser.add_argument('--max_gap', type=float, default=0.2,
+                        help='Longest interruption in seconds within one held letter')
+    parser.add_argument('--min_confidence', type=float, default=0.6,
+                        help='Lowest mean confidence of a letter in the timeline')
+    parser.add_argument('--output', type=str, default=None,
+                        help='Timeline output, .json or .csv (default: <video>_transcript.json)')
+    parser.add_argument('--frames_output', type=str, default=None,
+                        help='Optional CSV of the raw per-frame predictions')
+    args = parser.parse_args()
+
+    output_path = args.output or f"{os.path.splitext(args.video)[0]}_transcript.json"
+
+    def progress(done, total):
+        print(f"Segments done: {done}/{total}", end='\r' if done < total else '\n')
+
+    frame_results, info = transcribe_video(args.video, args.model_path,
+                                           classifier_kind=args.classifier,
+                                           workers=args.workers,
+                                           segment_seconds=args.segment_seconds,
+                                           overlap_seconds=args.overlap_seconds,
+                                           frame_step=args.frame_step,
+                                           mirror=args.mirror,
+                                           progress=progress)
+
+    video_seconds = info['n_frames'] / info['fps']
+    print(f"Processed {len(frame_results)} frames ({video_seconds:.0f}s of video) in "
+          f"{info['n_segments']} segments in {info['wall_time']:.1f}s "
+          f"({video_seconds / info['wall_time']:.1f}x real time)")
+
+    timeline = build_timeline(frame_results, info['fps'],
+                              min_duration=args.min_duration,
+                              max_gap=args.max_gap,
+                              min_confidence=args.min_confidence,
+                              frame_step=args.frame_step)
+
+    # Write the timeline
+    os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+    if output_path.endswith('.csv'):
+        with open(output_path, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=['letter', 'start', 'end', 'confidence', 'frames'])
+            writer.writeheader()
+            writer.writerows(timeline)
+    else:
+        with open(output_path, 'w') as f:
+            json.dump({'video': args.video, 'fps': info['fps'], 'timeline': timeline}, f, indent=2)
+    print(f"Timeline written to {output_path}")
+
+    if args.frames_output:
+        with open(args.frames_output, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['frame', 'time', 'label', 'confidence'])
+            for frame_index, label, confidence in frame_results:
+                writer.writerow([frame_index, frame_index / info['fps'], label or '', confidence])
+        print(f"Per-frame predictions written to {args.frames_output}")
+
+    print("Transcript: " + ' '.join(entry['letter'] for entry in timeline))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+import os
+import numpy as np
+import argparse
+from asl_recognition.models.classifier import ASLClassifier
+from asl_recognition.models.incremental import remap_labels
+from asl_recognition.models.tuning import stratified_subsample
+
+def load_dataset(path, label_mapping):
+    """
+    Load a landmark dataset and map its labels onto the model's label indices.
+
+    Args:
+        path: Path to an .npz file created by create_landmark_dataset
+        label_mapping: The model's label mapping
+
+    Returns:
+        X, y
+    """
+    data = np.load(path, allow_pickle=True)
+    y = remap_labels(data['y'], data['label_mapping'].item(), label_mapping)
+    return data['X'], y
+
+def main():
+    parser = argparse.ArgumentParser(description='Incrementally update a trained ASL model with new data')
+    parser.add_argument('--model_path', type=str, default='asl_recognition/data/asl_model.pkl',
+                        help='Path to the trained model')
+    parser.add_argument('--new_data', type=str, required=True,
+                        help='Landmark dataset (.npz) with the new samples')
+    parser.add_argument('--replay_data', type=str, default=None,
+                        help='Landmark dataset (.npz) of older samples to mix in, e.g. train_landmarks.npz')
+    parser.add_argument('--replay_fraction', type=float, default=0.1,
+                        help='Stratified fraction of the replay data to use')
+    parser.add_argument('--n_new_trees', type=int, default=20,
+                        help='Number of trees to add')
+    parser.add_argument('--max_trees', type=int, default=None,
+                        help='Tree budget after the update')
+    parser.add_argument('--replace', type=str, default='oldest', choices=['oldest', 'weakest'],
+                        help='Which trees to drop when the budget is exceeded')
+    parser.add_argument('--promote', action='store_true',
+                        help='Also overwrite --model_path with the updated model')
+    args = parser.parse_args()
+
+    # Load the current model
+    classifier = ASLClassifier()
+    classifier.load(args.model_path)
+
+    # Load the new data
+    X_new, y_new = load_dataset(args.new_data, classifier.label_mapping)
+    print(f"Loaded {len(X_new)} new samples.")
+
+    X_replay, y_replay = None, None
+    if args.replay_data:
+        X_replay, y_replay = load_dataset(args.replay_data, classifier.label_mapping)
+        X_replay, y_replay = stratified_subsample(X_replay, y_replay, args.replay_fraction)
+        print(f"Mixing in {len(X_replay)} replay samples.")
+
+    classifier.update(X_new, y_new,
+                      n_new_trees=args.n_new_trees,
+                      max_trees=args.max_trees,
+                      replace=args.replace,
+                      X_replay=X_replay,
+                      y_replay=y_replay)
+
+    # Save as a new version next to the current model
+    base, ext = os.path.splitext(args.model_path)
+    version_path = f"{base}_v{classifier.version}{ext}"
+    classifier.save(version_path)
+
+    if args.promote:
+        classifier.save(args.model_path)
+
+    print("Update complete!")
+
+if __name__ == "__main__":
+    main()
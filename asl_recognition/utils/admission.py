@@ -0,0 +1,274 @@
+import asyncio
+import collections
+import math
+import os
+import time
+from contextlib import asynccontextmanager
+
+from fastapi import HTTPException
+
+
+class AdmissionController:
+    """
+    Limits concurrent prediction work and bounds the wait queue in front of it.
+
+    Requests beyond the concurrency limit wait in a queue. A client that already
+    holds its fair share of slots and queue places is rejected with 429. When the
+    queue is full, the newest waiter of the most loaded client is evicted (429)
+    in favour of a less loaded client; if there is no such client, or a request
+    waits longer than the queue timeout, it is rejected with 503. Freed slots go
+    to the waiting client with the fewest running requests, so one noisy client
+    cannot starve the rest. Rejections carry Retry-After and a suggested polling
+    interval based on recent service times.
+
+    All state is touched from the event loop only, so no locking is needed.
+    """
+
+    def __init__(self, max_concurrency=2, max_queue=16, queue_timeout=1.0,
+                 min_poll_interval_ms=250):
+        """
+        Initialize the controller.
+
+        Args:
+            max_concurrency: Maximum number of requests processed at once
+            max_queue: Maximum number of requests waiting for a slot
+            queue_timeout: Maximum time in seconds a request may wait for a slot
+            min_poll_interval_ms: Lower bound for the suggested polling interval
+        """
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.min_poll_interval_ms = min_poll_interval_ms
+
+        self._in_flight = 0
+        self._waiters = collections.deque()
+        # Slots plus queue places held by each client, and slots alone
+        self._client_load = collections.Counter()
+        self._client_running = collections.Counter()
+        self._service_time = None
+
+        # Counters
+        self.admitted = 0
+        self.rejected_busy = 0
+        self.rejected_fair_share = 0
+        self.timed_out = 0
+
+    @classmethod
+    def from_env(cls):
+        """
+        Create a controller configured from ASL_MAX_CONCURRENCY, ASL_MAX_QUEUE,
+        ASL_QUEUE_TIMEOUT_MS and ASL_MIN_POLL_INTERVAL_MS.
+
+        Returns:
+            AdmissionController instance
+        """
+        return cls(
+            max_concurrency=int(os.environ.get('ASL_MAX_CONCURRENCY', '2')),
+            max_queue=int(os.environ.get('ASL_MAX_QUEUE', '16')),
+            queue_timeout=float(os.environ.get('ASL_QUEUE_TIMEOUT_MS', '1000')) / 1000,
+            min_poll_interval_ms=int(os.environ.get('ASL_MIN_POLL_INTERVAL_MS', '250')))
+
+    @property
+    def in_flight(self):
+        return self._in_flight
+
+    @property
+    def queue_depth(self):
+        return len(self._waiters)
+
+    def fair_share(self, client_id):
+        """
+        Number of slots plus queue places a single client may hold, given the
+        clients currently active.
+
+        Args:
+            client_id: Identifier of the client asking for admission
+
+        Returns:
+            Maximum load for the client
+        """
+        active = len(self._client_load)
+        if client_id not in self._client_load:
+            active += 1
+        return max(1, (self.max_concurrency + self.max_queue) // active)
+
+    def estimated_wait(self):
+        """
+        Estimate how long a new request would wait for a slot.
+
+        Returns:
+            Estimated wait in seconds
+        """
+        service_time = self._service_time if self._service_time is not None else 0.1
+        backlog = self._in_flight + len(self._waiters)
+        return backlog / self.max_concurrency * service_time
+
+    def stats(self):
+        """
+        Returns:
+            Dictionary with current load and counters
+        """
+        return {
+            'in_flight': self._in_flight,
+            'queue_depth': len(self._waiters),
+            'max_concurrency': self.max_concurrency,
+            'max_queue': self.max_queue,
+            'active_clients': len(self._client_load),
+            'avg_service_ms': round((self._service_time or 0.0) * 1000, 3),
+            'admitted': self.admitted,
+            'rejected_busy': self.rejected_busy,
+            'rejected_fair_share': self.rejected_fair_share,
+            'timed_out': self.timed_out
+        }
+
+    @asynccontextmanager
+    async def admit(self, client_id):
+        """
+        Hold a processing slot for the duration of the block.
+
+        Args:
+            client_id: Identifier of the client (see client_id_from_request)
+
+        Raises:
+            HTTPException: 429 if the client is over its fair share, 503 if the
+                           queue is full or the wait timed out
+        """
+        if self._client_load[client_id] >= self.fair_share(client_id):
+            self.rejected_fair_share += 1
+            self._reject(429, "Too many concurrent requests from this client")
+
+        if self._in_flight >= self.max_concurrency and len(self._waiters) >= self.max_queue:
+            if not self._evict_for(client_id):
+                self.rejected_busy += 1
+                self._reject(503, "Server is busy")
+
+        self._client_load[client_id] += 1
+        try:
+            await self._acquire_slot(client_id)
+            self.admitted += 1
+            self._client_running[client_id] += 1
+            start = time.perf_counter()
+            try:
+                yield
+            finally:
+                self._record_service_time(time.perf_counter() - start)
+                self._client_running[client_id] -= 1
+                if self._client_running[client_id] <= 0:
+                    del self._client_running[client_id]
+                self._release_slot()
+        finally:
+            self._client_load[client_id] -= 1
+            if self._client_load[client_id] <= 0:
+                del self._client_load[client_id]
+
+    async def _acquire_slot(self, client_id):
+        if self._in_flight < self.max_concurrency and not self._waiters:
+            self._in_flight += 1
+            return
+
+        # Resolved with True when a slot is handed over, False when evicted
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append((waiter, client_id))
+        try:
+            granted = await asyncio.wait_for(waiter, self.queue_timeout)
+        except BaseException as e:
+            if waiter.done() and not waiter.cancelled() and waiter.result():
+                # The slot was handed over just as we gave up; pass it on
+                self._release_slot()
+            else:
+                self._remove_waiter(waiter)
+
+            if isinstance(e, asyncio.TimeoutError):
+                self.timed_out += 1
+                self._reject(503, "Timed out waiting for a processing slot")
+            raise
+
+        if not granted:
+            self.rejected_fair_share += 1
+            self._reject(429, "Too many concurrent requests from this client")
+
+    def _release_slot(self):
+        # Hand the slot directly to the live waiter whose client has the
+        # fewest running requests (oldest first among equals)
+        chosen = None
+        for entry in self._waiters:
+            waiter, client_id = entry
+            if waiter.done():
+                continue
+            if chosen is None or self._client_running[client_id] < self._client_running[chosen[1]]:
+                chosen = entry
+
+        if chosen is not None:
+            self._waiters.remove(chosen)
+            chosen[0].set_result(True)
+            return
+
+        self._waiters.clear()
+        self._in_flight -= 1
+
+    def _evict_for(self, client_id):
+        # Make room in a full queue by evicting the newest waiter of the most
+        # loaded client, if that client holds clearly more than the newcomer
+        heaviest = max(
+            (waiting_client for _, waiting_client in self._waiters),
+            key=lambda waiting_client: self._client_load[waiting_client],
+            default=None)
+        if heaviest is None or self._client_load[heaviest] <= self._client_load[client_id] + 1:
+            return False
+
+        for entry in reversed(self._waiters):
+            waiter, waiting_client = entry
+            if waiting_client == heaviest and not waiter.done():
+                self._waiters.remove(entry)
+                waiter.set_result(False)
+                return True
+        return False
+
+    def _remove_waiter(self, waiter):
+        for entry in self._waiters:
+            if entry[0] is waiter:
+                self._waiters.remove(entry)
+                return
+
+    def _record_service_time(self, seconds):
+        if self._service_time is None:
+            self._service_time = seconds
+        else:
+            self._service_time = 0.9 * self._service_time + 0.1 * seconds
+
+    def _reject(self, status_code, reason):
+        wait = self.estimated_wait()
+        retry_after = max(1, math.ceil(wait))
+        poll_interval_ms = max(self.min_poll_interval_ms, int(wait * 1000))
+        raise HTTPException(
+            status_code=status_code,
+            detail={
+                'error': reason,
+                'retry_after': retry_after,
+                'suggested_poll_interval_ms': poll_interval_ms
+            },
+            headers={
+                'Retry-After': str(retry_after),
+                'X-Suggested-Poll-Interval-Ms': str(poll_interval_ms)
+            })
+
+
+def client_id_from_request(request):
+    """
+    Identify the client for fair-share accounting.
+
+    Args:
+        request: Incoming request
+
+    Returns:
+        The X-Client-ID header if present, otherwise the client address
+    """
+    client_id = request.headers.get('X-Client-ID')
+    if client_id:
+        return client_id
+    if request.client is not None:
+        return request.client.host
+    return 'anonymous'
@@ -0,0 +1,148 @@
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import numpy as np
+
+
+class MicroBatcher:
+    """
+    Collects landmark vectors from concurrent requests and classifies them
+    together.
+
+    Request threads call predict(), which queues the vector and blocks until
+    its result is ready. A single scheduler thread takes the first queued
+    vector, keeps collecting until either max_batch_size vectors are waiting or
+    max_wait_ms has passed, runs one batched prediction and hands each result
+    back to its request. A forest's predict_proba on 32 rows costs little more
+    than on one, so this trades a bounded wait for much less classifier work.
+    """
+
+    def __init__(self, predict_batch, max_batch_size=32, max_wait_ms=2.0):
+        """
+        Initialize the batcher.
+
+        Args:
+            predict_batch: Callable taking an (n, n_features) array and returning
+                           n results (e.g. classifier.predict_batch)
+            max_batch_size: Maximum number of vectors per batch
+            max_wait_ms: Maximum time to wait for more vectors after the first one
+        """
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1")
+
+        self.predict_batch = predict_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+
+        self._queue = queue.SimpleQueue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+        # Counters
+        self.batches = 0
+        self.items = 0
+        self.largest_batch = 0
+
+    @classmethod
+    def from_env(cls, predict_batch):
+        """
+        Create a batcher configured from ASL_BATCH_MAX_SIZE and ASL_BATCH_MAX_WAIT_MS.
+
+        Args:
+            predict_batch: Batched prediction callable
+
+        Returns:
+            MicroBatcher instance
+        """
+        return cls(
+            predict_batch,
+            max_batch_size=int(os.environ.get('ASL_BATCH_MAX_SIZE', '32')),
+            max_wait_ms=float(os.environ.get('ASL_BATCH_MAX_WAIT_MS', '2')))
+
+    def submit(self, vector):
+        """
+        Queue a vector for the next batch.
+
+        Args:
+            vector: 1D numpy array of features
+
+        Returns:
+            concurrent.futures.Future resolving to the prediction for the vector
+        """
+        self._ensure_started()
+        future = Future()
+        self._queue.put((vector, future))
+        return future
+
+    def predict(self, vector):
+        """
+        Classify a vector as part of a batch, blocking until the result is ready.
+
+        Args:
+            vector: 1D numpy array of features
+
+        Returns:
+            The prediction for the vector (e.g. a (label, confidence) tuple)
+        """
+        return self.submit(vector).result()
+
+    def stats(self):
+        """
+        Returns:
+            Dictionary with batch counters
+        """
+        return {
+            'max_batch_size': self.max_batch_size,
+            'max_wait_ms': self.max_wait * 1000,
+            'batches': self.batches,
+            'items': self.items,
+            'avg_batch_size': round(self.items / self.batches, 3) if self.batches else 0.0,
+            'largest_batch': self.largest_batch
+        }
+
+    def _ensure_started(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name='asl-micro-batcher', daemon=True)
+                self._thread.start()
+
+    def _collect(self):
+        # Block for the first item, then gather more until the batch is full
+        # or the wait window closes
+        batch = [self._queue.get()]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                if remaining <= 0:
+                    batch.append(self._queue.get_nowait())
+                else:
+                    batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            futures = [future for _, future in batch]
+
+            try:
+                results = self.predict_batch(np.vstack([vector for vector, _ in batch]))
+            except Exception as e:
+                for future in futures:
+                    future.set_exception(e)
+                continue
+
+            self.batches += 1
+            self.items += len(batch)
+            self.largest_batch = max(self.largest_batch, len(batch))
+
+            for future, result in zip(futures, results):
+                future.set_result(result)
@@ -0,0 +1,97 @@
+import numpy as np
+
+
+def near_duplicate_groups(X, tolerance=0.05, method='radius'):
+    """
+    Pick representatives for groups of near-identical landmark vectors.
+
+    'grid' quantizes every coordinate to a cell of size tolerance and keeps the
+    first sample of each cell. It is the fastest, but in 63 dimensions close
+    neighbours usually straddle a cell edge, so it removes little.
+
+    'radius' walks the samples in order and keeps one unless a kept sample is
+    within tolerance of it on every coordinate (Chebyshev distance), using a
+    KD-tree to find neighbours. This catches near-duplicates regardless of
+    where the grid edges fall.
+
+    Args:
+        X: numpy array of normalized landmarks
+        tolerance: Largest per-coordinate difference treated as a duplicate
+        method: 'radius' or 'grid'
+
+    Returns:
+        numpy array of the indices of the kept samples, in their original order
+    """
+    if method == 'grid':
+        cells = np.floor(X / tolerance).astype(np.int64)
+        _, first = np.unique(cells, axis=0, return_index=True)
+        return np.sort(first)
+
+    if method != 'radius':
+        raise ValueError(f"Unsupported dedup method: {method}")
+
+    from sklearn.neighbors import KDTree
+
+    neighbours = KDTree(X, metric='chebyshev').query_radius(X, tolerance)
+    covered = np.zeros(len(X), dtype=bool)
+    kept = []
+    for i in range(len(X)):
+        if covered[i]:
+            continue
+        kept.append(i)
+        covered[neighbours[i]] = True
+
+    return np.array(kept, dtype=np.int64)
+
+
+def deduplicate_landmarks(X, y, tolerance=0.05, method='radius'):
+    """
+    Remove near-duplicate samples within each class.
+
+    Args:
+        X: numpy array of normalized landmarks
+        y: numpy array of labels
+        tolerance: Largest per-coordinate difference treated as a duplicate
+        method: 'radius' or 'grid' (see near_duplicate_groups)
+
+    Returns:
+        X_dedup: numpy array of the kept landmarks
+        y_dedup: numpy array of the kept labels
+        report: Dictionary mapping each label to its before, after and dropped counts
+    """
+    keep = []
+    report = {}
+
+    for label in np.unique(y):
+        indices = np.flatnonzero(y == label)
+        kept = indices[near_duplicate_groups(X[indices], tolerance, method)]
+        keep.append(kept)
+        report[label] = {
+            'before': len(indices),
+            'after': len(kept),
+            'dropped': len(indices) - len(kept)
+        }
+
+    keep = np.sort(np.concatenate(keep))
+    return X[keep], y[keep], report
+
+
+def print_dedup_report(report, label_mapping=None):
+    """
+    Print the per-class result of deduplicate_landmarks.
+
+    Args:
+        report: Report returned by deduplicate_landmarks
+        label_mapping: Optional label mapping of the dataset (name -> index or
+                       index -> name)
+    """
+    label_mapping = label_mapping or {}
+    names = {v: k for k, v in label_mapping.items()}
+
+    before = sum(r['before'] for r in report.values())
+    after = sum(r['after'] for r in report.values())
+    print(f"Deduplication kept {after} of {before} samples ({before - after} dropped).")
+    for label, counts in report.items():
+        name = names.get(label, label_mapping.get(label, label))
+        print(f"  {name}: {counts['before']} -> {counts['after']} "
+              f"({counts['dropped']} dropped)")
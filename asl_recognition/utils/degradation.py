@@ -0,0 +1,258 @@
+import os
+import struct
+import time
+from collections import deque
+
+import cv2
+import numpy as np
+
+# Degradation levels; each level also applies the cheaper modes below it
+LEVEL_NAMES = ('full', 'downscale', 'lite_detector', 'fewer_trees')
+
+# JPEG decode reductions, largest first
+REDUCED_DECODE_FLAGS = ((8, cv2.IMREAD_REDUCED_COLOR_8),
+                        (4, cv2.IMREAD_REDUCED_COLOR_4),
+                        (2, cv2.IMREAD_REDUCED_COLOR_2))
+
+
+def encoded_image_size(image_data):
+    """
+    Read the size of a JPEG or PNG image from its header, without decoding it.
+
+    Args:
+        image_data: Encoded image bytes
+
+    Returns:
+        (width, height), or None for other formats or malformed headers
+    """
+    if image_data[:8] == b'\x89PNG\r\n\x1a\n' and len(image_data) >= 24:
+        return struct.unpack('>II', image_data[16:24])
+
+    if image_data[:2] != b'\xff\xd8':
+        return None
+    # Walk the JPEG markers up to the start-of-frame segment
+    i = 2
+    while i + 9 <= len(image_data):
+        if image_data[i] != 0xFF:
+            return None
+        marker = image_data[i + 1]
+        if marker == 0xFF:
+            i += 1
+            continue
+        if marker == 0x01 or 0xD0 <= marker <= 0xD8:
+            i += 2
+            continue
+        if 0xC0 <= marker <= 0xCF and marker not in (0xC4, 0xC8, 0xCC):
+            height, width = struct.unpack('>HH', image_data[i + 5:i + 9])
+            return width, height
+        i += 2 + struct.unpack('>H', image_data[i + 2:i + 4])[0]
+    return None
+
+
+def decode_image(image_data, max_side=None):
+    """
+    Decode an image, optionally at reduced resolution.
+
+    With max_side, JPEG images are decoded at 1/2, 1/4 or 1/8 scale (the
+    largest reduction that keeps the longer side at least max_side), which
+    libjpeg does during decoding and is cheaper than a full decode. Other
+    formats are decoded at full size.
+
+    Args:
+        image_data: Encoded image bytes
+        max_side: Smallest longer side to reduce to, or None for full resolution
+
+    Returns:
+        BGR image as a numpy array, or None if the data cannot be decoded
+    """
+    nparr = np.frombuffer(image_data, np.uint8)
+    flag = cv2.IMREAD_COLOR
+    if max_side is not None and image_data[:2] == b'\xff\xd8':
+        size = encoded_image_size(image_data)
+        if size is not None:
+            for factor, reduced_flag in REDUCED_DECODE_FLAGS:
+                if max(size) // factor >= max_side:
+                    flag = reduced_flag
+                    break
+    return cv2.imdecode(nparr, flag)
+
+
+class DegradationController:
+    """
+    Trades accuracy for latency when the server is overloaded.
+
+    Every finished request reports its latency and the current admission
+    queue depth. When the queue is at least queue_high deep or the p95 latency
+    of recent requests is above target_p95_ms, the controller moves one level
+    deeper, to a cheaper mode:
+        1 'downscale'     - JPEG images are decoded at reduced resolution, down
+                            to about max_side (see decode_image); MediaPipe
+                            resizes its input itself, so decoding is the cost
+                            that resolution drives
+        2 'lite_detector' - MediaPipe Hands runs with model_complexity=0
+        3 'fewer_trees'   - forests use tree_fraction of their trees and
+                            cascades only their first stage
+    It moves back one level when the queue is empty and either the p95 latency
+    is below recover_ratio * target_p95_ms or fewer than min_samples requests
+    finished in the window_ms since the last change (too little traffic to
+    measure, or to be overloaded). Levels change at most once per
+    cooldown_ms, and latencies from before a change are discarded, so each
+    decision is based on the current mode.
+
+    All state is touched from the event loop only, so no locking is needed;
+    request threads read the current level once, when they start, and pass it
+    to the level's settings so a request is served at a single level.
+
+    from_env leaves the controller off unless ASL_DEGRADE_TARGET_P95_MS is set.
+    """
+
+    def __init__(self, target_p95_ms=500.0, queue_high=4, max_level=3, window=200,
+                 window_ms=5000.0, min_samples=20, cooldown_ms=2000.0, recover_ratio=0.5,
+                 max_side=320, tree_fraction=0.25):
+        """
+        Initialize the controller.
+
+        Args:
+            target_p95_ms: p95 latency above which to degrade (0 disables the controller)
+            queue_high: Admission queue depth at which to degrade
+            max_level: Deepest level to use (0 to 3)
+            window: Most recent latencies the p95 is computed over
+            window_ms: Age beyond which latencies are no longer recent
+            min_samples: Latencies needed before the p95 is used
+            cooldown_ms: Minimum time between level changes
+            recover_ratio: Fraction of target_p95_ms the p95 must fall below to recover
+            max_side: Smallest longer image side decoded to from level 1 on
+            tree_fraction: Fraction of forest trees used at level 3
+        """
+        if not 0 <= max_level < len(LEVEL_NAMES):
+            raise ValueError(f"max_level must be between 0 and {len(LEVEL_NAMES) - 1}")
+
+        self.target_p95_ms = target_p95_ms
+        self.queue_high = queue_high
+        self.max_level = max_level
+        self.window_seconds = window_ms / 1000
+        self.min_samples = min_samples
+        self.cooldown = cooldown_ms / 1000
+        self.recover_ratio = recover_ratio
+        self.max_side = max_side
+        self.tree_fraction = tree_fraction
+
+        self.level = 0
+        self._latencies = deque(maxlen=window)
+        self._last_change = 0.0
+        self._p95_ms = None
+
+        # Counters
+        self.degradations = 0
+        self.recoveries = 0
+
+    @classmethod
+    def from_env(cls):
+        """
+        Create a controller configured from ASL_DEGRADE_TARGET_P95_MS,
+        ASL_DEGRADE_QUEUE_HIGH, ASL_DEGRADE_MAX_LEVEL, ASL_DEGRADE_COOLDOWN_MS,
+        ASL_DEGRADE_MAX_SIDE and ASL_DEGRADE_TREE_FRACTION.
+
+        Returns:
+            DegradationController instance
+        """
+        return cls(
+            target_p95_ms=float(os.environ.get('ASL_DEGRADE_TARGET_P95_MS', '0')),
+            queue_high=int(os.environ.get('ASL_DEGRADE_QUEUE_HIGH', '4')),
+            max_level=int(os.environ.get('ASL_DEGRADE_MAX_LEVEL', '3')),
+            cooldown_ms=float(os.environ.get('ASL_DEGRADE_COOLDOWN_MS', '2000')),
+            max_side=int(os.environ.get('ASL_DEGRADE_MAX_SIDE', '320')),
+            tree_fraction=float(os.environ.get('ASL_DEGRADE_TREE_FRACTION', '0.25')))
+
+    @property
+    def enabled(self):
+        return self.target_p95_ms > 0 and self.max_level > 0
+
+    @property
+    def level_name(self):
+        return LEVEL_NAMES[self.level]
+
+    def image_max_side(self, level):
+        """
+        Returns:
+            max_side for decode_image at the given level, or None for full resolution
+        """
+        return self.max_side if level >= 1 else None
+
+    def model_complexity(self, level):
+        """
+        Returns:
+            MediaPipe Hands model_complexity at the given level
+        """
+        return 0 if level >= 2 else 1
+
+    def classifier_tree_fraction(self, level):
+        """
+        Returns:
+            Fraction of forest trees to use at the given level
+        """
+        return self.tree_fraction if level >= 3 else 1.0
+
+    def observe(self, latency_ms, queue_depth):
+        """
+        Record a finished request and step the level if needed.
+
+        Args:
+            latency_ms: Latency of the request, or None to only report the queue depth
+            queue_depth: Current admission queue depth
+        """
+        if not self.enabled:
+            return
+        now = time.monotonic()
+        if latency_ms is not None:
+            self._latencies.append((now, latency_ms))
+        if now - self._last_change < self.cooldown:
+            return
+
+        # Forget latencies that are no longer recent
+        while self._latencies and now - self._latencies[0][0] > self.window_seconds:
+            self._latencies.popleft()
+
+        self._p95_ms = (float(np.percentile([latency for _, latency in self._latencies], 95))
+                        if len(self._latencies) >= self.min_samples else None)
+        overloaded = queue_depth >= self.queue_high or (
+            self._p95_ms is not None and self._p95_ms > self.target_p95_ms)
+        # Too few requests over a whole window since the last change means the
+        # load is light (and too light to ever measure a p95)
+        quiet = self._p95_ms is None and now - self._last_change >= self.window_seconds
+        relaxed = queue_depth == 0 and (
+            quiet or (self._p95_ms is not None and
+                      self._p95_ms < self.target_p95_ms * self.recover_ratio))
+
+        if overloaded and self.level < self.max_level:
+            self._change_level(self.level + 1, now)
+            self.degradations += 1
+        elif relaxed and self.level > 0:
+            self._change_level(self.level - 1, now)
+            self.recoveries += 1
+
+    def _change_level(self, level, now):
+        self.level = level
+        self._last_change = now
+        self._latencies.clear()
+        self._p95_ms = None
+
+    def stats(self):
+        """
+        Returns:
+            Dictionary with the current level, its settings and counters
+        """
+        return {
+            'enabled': self.enabled,
+            'level': self.level,
+            'level_name': self.level_name,
+            'max_level': self.max_level,
+            'target_p95_ms': self.target_p95_ms,
+            'recent_p95_ms': round(self._p95_ms, 3) if self._p95_ms is not None else None,
+            'queue_high': self.queue_high,
+            'image_max_side': self.image_max_side(self.level),
+            'model_complexity': self.model_complexity(self.level),
+            'tree_fraction': self.classifier_tree_fraction(self.level),
+            'degradations': self.degradations,
+            'recoveries': self.recoveries
+        }
@@ -1,25 +1,92 @@
 import cv2
 import numpy as np
 import mediapipe as mp
+import hashlib
 import os
-from tqdm import tqdm
+import queue
+import threading
+from contextlib import contextmanager
+
+from .landmark_store import save_landmark_dataset
 
 # Initialize MediaPipe Hand module
 mp_hands = mp.solutions.hands
 mp_drawing = mp.solutions.drawing_utils
 mp_drawing_styles = mp.solutions.drawing_styles
 
-def extract_landmarks(image_path, hands=None):
+class HandsPool:
+    """
+    A bounded pool of MediaPipe Hands instances.
+    
+    A Hands graph must not be used by two threads at once, so each concurrent
+    caller borrows its own instance. Instances are created lazily, up to size.
+    """
+    
+    def __init__(self, size, **hands_kwargs):
+        """
+        Initialize the pool.
+        
+        Args:
+            size: Maximum number of Hands instances
+            **hands_kwargs: Arguments passed to mp_hands.Hands
+        """
+        self.size = size
+        self.hands_kwargs = hands_kwargs
+        self._available = queue.Queue()
+        self._created = 0
+        self._lock = threading.Lock()
+    
+    @contextmanager
+    def acquire(self):
+        """
+        Borrow a Hands instance, waiting if all of them are in use.
+        
+        Yields:
+            hands: MediaPipe Hands object
+        """
+        try:
+            hands = self._available.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                if self._created < self.size:
+                    self._created += 1
+                    create = True
+                else:
+                    create = False
+            hands = mp_hands.Hands(**self.hands_kwargs) if create else self._available.get()
+        
+        try:
+            yield hands
+        finally:
+            self._available.put(hands)
+
+def landmarks_to_array(hand_landmarks):
+    """
+    Convert a MediaPipe hand landmark list to a numpy array.
+    
+    Args:
+        hand_landmarks: MediaPipe NormalizedLandmarkList for one hand
+    
+    Returns:
+        landmarks: numpy array of shape (21, 3)
+    """
+    landmarks_array = np.zeros((21, 3))
+    for i, landmark in enumerate(hand_landmarks.landmark):
+        landmarks_array[i] = [landmark.x, landmark.y, landmark.z]
+    return landmarks_array
+
+def extract_landmarks(image_path, hands=None, draw=True):
     """
     Extract hand landmarks from an image.
     
     Args:
         image_path: Path to the image file
         hands: MediaPipe Hands object (optional)
+        draw: Whether to return a copy of the image with the landmarks drawn
     
     Returns:
         landmarks: numpy array of shape (21, 3) containing landmarks or None if no hand detected
-        processed_img: image with landmarks drawn
+        processed_img: image with landmarks drawn (None if draw is False)
     """
     # Initialize Hands if not provided
     if hands is None:
@@ -40,6 +107,11 @@ def extract_landmarks(image_path, hands=None):
     # Process the image
     results = hands.process(image_rgb)
     
+    if not draw:
+        if results.multi_hand_landmarks:
+            return landmarks_to_array(results.multi_hand_landmarks[0]), None
+        return None, None
+    
     # Prepare output image
     processed_img = image.copy()
     
@@ -55,18 +127,153 @@ def extract_landmarks(image_path, hands=None):
                 mp_drawing_styles.get_default_hand_connections_style())
         
         # Extract the first detected hand's landmarks
-        landmarks = results.multi_hand_landmarks[0]
-        
-        # Convert landmarks to numpy array
-        landmarks_array = np.zeros((21, 3))
-        for i, landmark in enumerate(landmarks.landmark):
-            landmarks_array[i] = [landmark.x, landmark.y, landmark.z]
-        
-        return landmarks_array, processed_img
+        return landmarks_to_array(results.multi_hand_landmarks[0]), processed_img
     
     # No hand detected
     return None, processed_img
 
+# cv2.imread flags that decode JPEGs directly at 1/2, 1/4 or 1/8 resolution
+REDUCED_DECODE_FLAGS = {
+    1: cv2.IMREAD_COLOR,
+    2: cv2.IMREAD_REDUCED_COLOR_2,
+    4: cv2.IMREAD_REDUCED_COLOR_4,
+    8: cv2.IMREAD_REDUCED_COLOR_8
+}
+
+_STAGE_DONE = object()
+
+def _put(stage_queue, item, stop):
+    """Put into a bounded queue, giving up once the pipeline is stopped."""
+    while not stop.is_set():
+        try:
+            stage_queue.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            pass
+    return False
+
+def _get(stage_queue, stop):
+    """Get from a queue, returning _STAGE_DONE once the pipeline is stopped."""
+    while not stop.is_set():
+        try:
+            return stage_queue.get(timeout=0.1)
+        except queue.Empty:
+            pass
+    return _STAGE_DONE
+
+def iter_image_landmarks(image_paths, hands=None, n_readers=2, n_decoders=2, queue_size=32,
+                         reduce_factor=1, reduce_min_bytes=0):
+    """
+    Extract landmarks from many images with pipelined I/O and decoding.
+    
+    Reader threads prefetch file bytes, decoder threads turn them into RGB
+    frames, and the calling thread runs hand detection. Bounded queues between
+    the stages keep memory flat while letting reads and decodes run ahead of
+    detection.
+    
+    Args:
+        image_paths: List of image file paths
+        hands: MediaPipe Hands object (optional, static image mode is created if None)
+        n_readers: Number of file reader threads
+        n_decoders: Number of decoder threads
+        queue_size: Capacity of each queue between stages
+        reduce_factor: Decode at 1/reduce_factor resolution (1, 2, 4 or 8); landmarks
+                       are in normalized image coordinates, so they are unaffected
+                       apart from detection quality
+        reduce_min_bytes: Only reduce files at least this large
+    
+    Yields:
+        (index, landmarks) in completion order, where index is the position in
+        image_paths and landmarks is a (21, 3) numpy array or None
+    """
+    if reduce_factor not in REDUCED_DECODE_FLAGS:
+        raise ValueError(f"reduce_factor must be one of {sorted(REDUCED_DECODE_FLAGS)}")
+    
+    # Initialize Hands if not provided
+    if hands is None:
+        hands = mp_hands.Hands(
+            static_image_mode=True,
+            max_num_hands=1,
+            min_detection_confidence=0.5)
+    
+    path_queue = queue.Queue()
+    bytes_queue = queue.Queue(maxsize=queue_size)
+    frame_queue = queue.Queue(maxsize=queue_size)
+    stop = threading.Event()
+    
+    for item in enumerate(image_paths):
+        path_queue.put(item)
+    for _ in range(n_readers):
+        path_queue.put(_STAGE_DONE)
+    
+    def read():
+        while True:
+            item = path_queue.get()
+            if item is _STAGE_DONE:
+                return
+            index, image_path = item
+            try:
+                with open(image_path, 'rb') as f:
+                    data = f.read()
+            except OSError:
+                data = None
+            if not _put(bytes_queue, (index, image_path, data), stop):
+                return
+    
+    def decode():
+        while True:
+            item = _get(bytes_queue, stop)
+            if item is _STAGE_DONE:
+                return
+            index, image_path, data = item
+            image_rgb = None
+            if data:
+                flag = REDUCED_DECODE_FLAGS[reduce_factor if len(data) >= reduce_min_bytes else 1]
+                image = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), flag)
+                if image is not None:
+                    # Convert to RGB (MediaPipe requires RGB input)
+                    image_rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+            if not _put(frame_queue, (index, image_path, image_rgb), stop):
+                return
+    
+    def close_stages(readers, decoders):
+        # Each stage ends once every thread of the previous stage has finished
+        for thread in readers:
+            thread.join()
+        for _ in decoders:
+            _put(bytes_queue, _STAGE_DONE, stop)
+        for thread in decoders:
+            thread.join()
+        _put(frame_queue, _STAGE_DONE, stop)
+    
+    readers = [threading.Thread(target=read, daemon=True) for _ in range(n_readers)]
+    decoders = [threading.Thread(target=decode, daemon=True) for _ in range(n_decoders)]
+    for thread in readers + decoders:
+        thread.start()
+    threading.Thread(target=close_stages, args=(readers, decoders), daemon=True).start()
+    
+    try:
+        while True:
+            item = frame_queue.get()
+            if item is _STAGE_DONE:
+                return
+            index, image_path, image_rgb = item
+            
+            if image_rgb is None:
+                print(f"Could not read image: {image_path}")
+                yield index, None
+                continue
+            
+            # Process the image
+            results = hands.process(image_rgb)
+            if results.multi_hand_landmarks:
+                yield index, landmarks_to_array(results.multi_hand_landmarks[0])
+            else:
+                yield index, None
+    finally:
+        # Unblock the other stages if the caller stops early
+        stop.set()
+
 def normalize_landmarks(landmarks):
     """
     Normalize landmarks to make them translation and scale invariant.
@@ -98,23 +305,59 @@ def normalize_landmarks(landmarks):
     # Flatten the array from (21, 3) to (63,)
     return normalized.flatten()
 
-def create_landmark_dataset(data_dir, output_path, label_mapping=None):
+def shard_bounds(n_items, shard_index, shard_count):
     """
-    Create a dataset of hand landmarks from a directory of images.
+    Get the slice of a sorted list that a shard is responsible for.
+    
+    Args:
+        n_items: Length of the list
+        shard_index: Index of the shard, 0 <= shard_index < shard_count
+        shard_count: Number of shards
+    
+    Returns:
+        (start, end) indices, end exclusive
+    """
+    if not 0 <= shard_index < shard_count:
+        raise ValueError(f"Shard index {shard_index} out of range for {shard_count} shards")
+    return n_items * shard_index // shard_count, n_items * (shard_index + 1) // shard_count
+
+def file_list_digest(relative_paths, labels, label_mapping):
+    """
+    Fingerprint the image list and labels a dataset was extracted from.
+    
+    Shards of one extraction must share it; merge_landmark_shards checks this.
+    
+    Args:
+        relative_paths: Image paths relative to the data directory, in order
+        labels: Label of each image
+        label_mapping: Dictionary mapping directory names to label indices
+    
+    Returns:
+        Hex digest string
+    """
+    digest = hashlib.sha256()
+    for path, label in zip(relative_paths, labels):
+        digest.update(f"{path}\t{label}\n".encode('utf-8'))
+    digest.update(repr(sorted(label_mapping.items())).encode('utf-8'))
+    return digest.hexdigest()
+
+def list_dataset_images(data_dir, label_mapping=None):
+    """
+    List the images of a dataset directory in a deterministic order.
     
     Args:
         data_dir: Directory containing subdirectories of images, where
                  each subdirectory name is the label
-        output_path: Path to save the dataset
         label_mapping: Dictionary mapping directory names to label indices
+                       (default: sorted directory names numbered from 0)
     
     Returns:
-        X: numpy array of landmarks
-        y: numpy array of labels
-        failed_images: list of images where landmark extraction failed
+        image_paths: list of image paths, sorted by class and file name
+        image_labels: list of the label of each image
+        label_mapping: the label mapping used
     """
-    # Get subdirectories (classes)
-    subdirs = [d for d in os.listdir(data_dir) if os.path.isdir(os.path.join(data_dir, d))]
+    # Get subdirectories (classes), sorted so every run sees the same order
+    subdirs = sorted(d for d in os.listdir(data_dir) if os.path.isdir(os.path.join(data_dir, d)))
     
     # Create label mapping if not provided
     if label_mapping is None:
@@ -122,60 +365,187 @@ def create_landmark_dataset(data_dir, output_path, label_mapping=None):
     
     print(f"Found {len(subdirs)} classes: {', '.join(subdirs)}")
     
+    # Collect image files and labels from each subdirectory
+    image_paths = []
+    image_labels = []
+    for subdir in subdirs:
+        subdir_path = os.path.join(data_dir, subdir)
+        if not os.path.isdir(subdir_path):
+            continue
+        
+        # Get image files in subdirectory
+        image_files = sorted(f for f in os.listdir(subdir_path) if f.lower().endswith(('.png', '.jpg', '.jpeg')))
+        
+        print(f"Found {len(image_files)} images in class {subdir}")
+        
+        image_paths.extend(os.path.join(subdir_path, f) for f in image_files)
+        image_labels.extend([label_mapping[subdir]] * len(image_files))
+    
+    return image_paths, image_labels, label_mapping
+
+def create_landmark_dataset(data_dir, output_path, label_mapping=None, n_readers=2,
+                            n_decoders=2, reduce_factor=1, reduce_min_bytes=0,
+                            shard_index=0, shard_count=1):
+    """
+    Create a dataset of hand landmarks from a directory of images.
+    
+    Images are processed in sorted order. With shard_count > 1 only the
+    shard_index-th contiguous slice of that order is processed, and the output
+    also records what merge_landmark_shards needs to combine the shards into
+    the dataset a single run would have produced.
+    
+    Args:
+        data_dir: Directory containing subdirectories of images, where
+                 each subdirectory name is the label
+        output_path: Path to save the dataset
+        label_mapping: Dictionary mapping directory names to label indices
+        n_readers: Number of file reader threads (see iter_image_landmarks)
+        n_decoders: Number of decoder threads
+        reduce_factor: Decode at 1/reduce_factor resolution (1, 2, 4 or 8)
+        reduce_min_bytes: Only reduce files at least this large
+        shard_index: Index of the slice of the images to process
+        shard_count: Number of slices the images are split into
+    
+    Returns:
+        X: numpy array of landmarks
+        y: numpy array of labels
+        failed_images: list of images where landmark extraction failed
+    """
+    from tqdm import tqdm
+    
+    image_paths, image_labels, label_mapping = list_dataset_images(data_dir, label_mapping)
+    
     # Initialize MediaPipe Hands
     hands = mp_hands.Hands(
         static_image_mode=True,
         max_num_hands=1,
         min_detection_confidence=0.5)
     
-    # Lists to store landmarks and labels
+    # Keep only this shard's slice
+    n_images = len(image_paths)
+    if shard_count > 1:
+        relative_paths = [os.path.relpath(path, data_dir) for path in image_paths]
+        digest = file_list_digest(relative_paths, image_labels, label_mapping)
+        start, end = shard_bounds(n_images, shard_index, shard_count)
+        image_paths = image_paths[start:end]
+        image_labels = image_labels[start:end]
+        print(f"Shard {shard_index + 1}/{shard_count}: images {start} to {end - 1} of {n_images}")
+    
+    # Extract landmarks, overlapping reads and decodes with detection
+    extracted = [None] * len(image_paths)
+    for index, landmarks in tqdm(iter_image_landmarks(image_paths, hands,
+                                                      n_readers=n_readers,
+                                                      n_decoders=n_decoders,
+                                                      reduce_factor=reduce_factor,
+                                                      reduce_min_bytes=reduce_min_bytes),
+                                 total=len(image_paths)):
+        extracted[index] = landmarks
+    
+    # Lists to store landmarks and labels, in file order
     landmarks_list = []
     labels_list = []
     failed_images = []
     
-    # Process each subdirectory
-    for subdir in subdirs:
-        subdir_path = os.path.join(data_dir, subdir)
-        if not os.path.isdir(subdir_path):
-            continue
-        
-        # Get image files in subdirectory
-        image_files = [f for f in os.listdir(subdir_path) if f.lower().endswith(('.png', '.jpg', '.jpeg'))]
-        
-        print(f"Processing {len(image_files)} images in class {subdir}...")
-        
-        # Process each image
-        for image_file in tqdm(image_files):
-            image_path = os.path.join(subdir_path, image_file)
-            
-            # Extract landmarks
-            landmarks, _ = extract_landmarks(image_path, hands)
-            
-            if landmarks is not None:
-                # Normalize landmarks
-                normalized_landmarks = normalize_landmarks(landmarks)
-                
-                # Add to lists
-                landmarks_list.append(normalized_landmarks)
-                labels_list.append(label_mapping[subdir])
-            else:
-                failed_images.append(image_path)
+    for image_path, label, landmarks in zip(image_paths, image_labels, extracted):
+        if landmarks is not None:
+            # Normalize landmarks
+            landmarks_list.append(normalize_landmarks(landmarks))
+            labels_list.append(label)
+        else:
+            failed_images.append(image_path)
     
     # Convert lists to numpy arrays
     X = np.array(landmarks_list)
     y = np.array(labels_list)
     
     # Create output directory if it doesn't exist
-    os.makedirs(os.path.dirname(output_path), exist_ok=True)
-    
-    # Save the dataset with allow_pickle=True
-    np.savez(output_path, X=X, y=y, label_mapping=label_mapping)
+    os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+    
+    # Save the dataset with its per-class index (see utils.landmark_store)
+    if shard_count > 1:
+        save_landmark_dataset(output_path, X, y, label_mapping,
+                              shard_index=shard_index, shard_count=shard_count,
+                              n_images=n_images, shard_start=start, shard_end=end,
+                              file_list_digest=digest,
+                              failed_images=np.array([os.path.relpath(path, data_dir) for path in failed_images]))
+    else:
+        save_landmark_dataset(output_path, X, y, label_mapping)
     
     print(f"Dataset created with {len(X)} samples.")
     print(f"Failed to extract landmarks from {len(failed_images)} images.")
     
     return X, y, failed_images
 
+def merge_landmark_shards(shard_paths, output_path):
+    """
+    Combine the shards of a sharded create_landmark_dataset run.
+    
+    The shards must come from the same image list and label mapping, and
+    together cover it exactly once. The merged dataset is identical to the one
+    a single run over all images produces.
+    
+    Args:
+        shard_paths: Paths of the shard .npz files, in any order
+        output_path: Path to save the merged dataset
+    
+    Returns:
+        X: numpy array of landmarks
+        y: numpy array of labels
+        failed_images: list of images (relative to the data directory) where
+                       landmark extraction failed
+    """
+    shards = [np.load(path, allow_pickle=True) for path in shard_paths]
+    if not shards:
+        raise ValueError("No shards given")
+    for path, shard in zip(shard_paths, shards):
+        if 'shard_index' not in shard:
+            raise ValueError(f"{path} is not a dataset shard")
+    
+    # Validate that the shards belong together and cover every image once
+    first = shards[0]
+    shard_count = int(first['shard_count'])
+    label_mapping = first['label_mapping'].item()
+    by_index = {}
+    for position, (path, shard) in enumerate(zip(shard_paths, shards)):
+        if int(shard['shard_count']) != shard_count:
+            raise ValueError(f"{path} is one of {int(shard['shard_count'])} shards, expected {shard_count}")
+        if str(shard['file_list_digest']) != str(first['file_list_digest']):
+            raise ValueError(f"{path} was extracted from a different image list")
+        if shard['label_mapping'].item() != label_mapping:
+            raise ValueError(f"{path} has a different label mapping")
+        index = int(shard['shard_index'])
+        if index in by_index:
+            raise ValueError(f"Shard {index} given twice ({shard_paths[by_index[index]]} and {path})")
+        by_index[index] = position
+    
+    missing = sorted(set(range(shard_count)) - set(by_index))
+    if missing:
+        raise ValueError(f"Missing shards: {missing}")
+    
+    ordered = [shards[by_index[index]] for index in range(shard_count)]
+    n_images = int(first['n_images'])
+    for index, shard in enumerate(ordered):
+        start, end = shard_bounds(n_images, index, shard_count)
+        if (int(shard['shard_start']), int(shard['shard_end'])) != (start, end):
+            raise ValueError(f"Shard {index} covers the wrong images")
+    
+    # Concatenate in shard order, which is the single-run file order
+    X_parts = [shard['X'] for shard in ordered if len(shard['X'])]
+    y_parts = [shard['y'] for shard in ordered if len(shard['y'])]
+    X = np.concatenate(X_parts) if X_parts else np.array([])
+    y = np.concatenate(y_parts) if y_parts else np.array([])
+    failed_images = [str(path) for shard in ordered for path in shard['failed_images']]
+    
+    # Create output directory if it doesn't exist
+    os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+    
+    save_landmark_dataset(output_path, X, y, label_mapping)
+    
+    print(f"Merged {shard_count} shards into {len(X)} samples.")
+    print(f"Failed to extract landmarks from {len(failed_images)} of {n_images} images.")
+    
+    return X, y, failed_images
+
 def visualize_landmarks(landmarks, image=None, size=(400, 400)):
     """
     Visualize landmarks on a blank image or an existing image.
@@ -0,0 +1,128 @@
+import numpy as np
+
+
+def build_class_index(y):
+    """
+    Build the per-class index saved with every landmark dataset.
+
+    class_samples lists the sample indices grouped by label (in file order
+    within each label); the samples of class_labels[i] are
+    class_samples[class_offsets[i]:class_offsets[i + 1]].
+
+    Args:
+        y: numpy array of labels
+
+    Returns:
+        Dictionary with class_labels, class_offsets and class_samples arrays
+    """
+    y = np.asarray(y)
+    class_samples = np.argsort(y, kind='stable')
+    class_labels, counts = np.unique(y, return_counts=True)
+    class_offsets = np.concatenate([[0], np.cumsum(counts)])
+    return {
+        'class_labels': class_labels,
+        'class_offsets': class_offsets,
+        'class_samples': class_samples
+    }
+
+
+def save_landmark_dataset(output_path, X, y, label_mapping, **extra):
+    """
+    Save a landmark dataset together with its per-class index.
+
+    Args:
+        output_path: Path of the .npz file
+        X: numpy array of landmarks
+        y: numpy array of labels
+        label_mapping: Dictionary mapping class names to label indices
+        **extra: Additional arrays to store
+    """
+    np.savez(output_path, X=X, y=y, label_mapping=label_mapping,
+             **build_class_index(y), **extra)
+
+
+def load_landmark_dataset(path):
+    """
+    Load a landmark dataset and its per-class index.
+
+    Datasets saved before the index existed get it built on load.
+
+    Args:
+        path: Path of the .npz file
+
+    Returns:
+        Dictionary with X, y, label_mapping (or None) and the index arrays
+    """
+    data = np.load(path, allow_pickle=True)
+    dataset = {
+        'X': data['X'],
+        'y': data['y'],
+        'label_mapping': data['label_mapping'].item() if 'label_mapping' in data else None
+    }
+    if 'class_samples' in data:
+        dataset.update({key: data[key] for key in ('class_labels', 'class_offsets', 'class_samples')})
+    else:
+        dataset.update(build_class_index(dataset['y']))
+    return dataset
+
+
+def class_sample_indices(dataset, label):
+    """
+    Get the indices of a class's samples from the index.
+
+    Args:
+        dataset: Dictionary returned by load_landmark_dataset
+        label: Label index
+
+    Returns:
+        numpy array of sample indices, in file order
+    """
+    position = np.searchsorted(dataset['class_labels'], label)
+    if position == len(dataset['class_labels']) or dataset['class_labels'][position] != label:
+        return np.array([], dtype=np.int64)
+    start, end = dataset['class_offsets'][position], dataset['class_offsets'][position + 1]
+    return dataset['class_samples'][start:end]
+
+
+def select_classes(dataset, class_names, relabel=True):
+    """
+    Select the samples of some classes from an extracted dataset.
+
+    Only the selected rows are copied, using the per-class index; no image
+    is read.
+
+    Args:
+        dataset: Path of a landmark .npz file, or a dictionary returned by
+                 load_landmark_dataset
+        class_names: Class names (e.g. ['A', 'B', 'C']) to keep, in the order
+                     their new labels should follow
+        relabel: Renumber the labels 0..len(class_names)-1 in the order of
+                 class_names; otherwise keep the labels of the full dataset
+
+    Returns:
+        X: numpy array of landmarks, grouped by class in class_names order
+        y: numpy array of labels
+        label_mapping: Dictionary mapping the selected class names to their labels
+    """
+    if isinstance(dataset, str):
+        dataset = load_landmark_dataset(dataset)
+    label_mapping = dataset['label_mapping']
+    if label_mapping is None:
+        raise ValueError("The dataset has no label mapping to select classes by name")
+
+    missing = [name for name in class_names if name not in label_mapping]
+    if missing:
+        raise ValueError(f"Classes not in the dataset: {', '.join(map(str, missing))}")
+
+    indices = []
+    labels = []
+    subset_mapping = {}
+    for new_label, name in enumerate(class_names):
+        label = new_label if relabel else label_mapping[name]
+        class_indices = class_sample_indices(dataset, label_mapping[name])
+        indices.append(class_indices)
+        labels.append(np.full(len(class_indices), label, dtype=dataset['y'].dtype))
+        subset_mapping[name] = label
+
+    indices = np.concatenate(indices)
+    return dataset['X'][indices], np.concatenate(labels), subset_mapping
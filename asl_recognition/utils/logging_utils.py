@@ -0,0 +1,216 @@
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import time
+import uuid
+from contextlib import contextmanager
+
+# Root logger name for the whole package
+LOGGER_NAME = 'asl_recognition'
+
+# Keeps the listener alive for the lifetime of the process
+_listener = None
+
+
+class DebugSamplingFilter(logging.Filter):
+    """
+    Let through only a fraction of DEBUG records. Records at INFO and above always pass.
+    """
+
+    def __init__(self, sample_rate=1.0):
+        super().__init__()
+        self.sample_rate = sample_rate
+
+    def filter(self, record):
+        if record.levelno > logging.DEBUG or self.sample_rate >= 1.0:
+            return True
+        return random.random() < self.sample_rate
+
+
+class StructuredFormatter(logging.Formatter):
+    """
+    Format records as single-line JSON. Structured fields passed through
+    ``extra={'fields': {...}}`` are merged into the top-level object.
+    """
+
+    def format(self, record):
+        entry = {
+            'ts': round(record.created, 3),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage()
+        }
+
+        fields = getattr(record, 'fields', None)
+        if fields:
+            entry.update(fields)
+
+        if record.exc_info:
+            entry['exc_info'] = self.formatException(record.exc_info)
+
+        return json.dumps(entry, default=str)
+
+
+def setup_logging(level=None, debug_sample_rate=None, structured=None):
+    """
+    Configure the package logger with a non-blocking queue-based handler.
+
+    Records are put on an in-memory queue by the calling thread and written to
+    stderr by a background listener thread, so request handlers never block on
+    the stream. Calling this more than once is a no-op.
+
+    Args:
+        level: Log level name or number (default: ASL_LOG_LEVEL or 'INFO')
+        debug_sample_rate: Fraction of DEBUG records to keep
+                           (default: ASL_LOG_DEBUG_SAMPLE_RATE or 1.0)
+        structured: Emit JSON lines instead of plain text
+                    (default: True unless ASL_LOG_FORMAT is 'text')
+
+    Returns:
+        logger: The configured package logger
+    """
+    global _listener
+
+    logger = logging.getLogger(LOGGER_NAME)
+    if _listener is not None:
+        return logger
+
+    if level is None:
+        level = os.environ.get('ASL_LOG_LEVEL', 'INFO')
+    if isinstance(level, str):
+        level = logging.getLevelName(level.upper())
+    if debug_sample_rate is None:
+        debug_sample_rate = float(os.environ.get('ASL_LOG_DEBUG_SAMPLE_RATE', '1.0'))
+    if structured is None:
+        structured = os.environ.get('ASL_LOG_FORMAT', 'json').lower() != 'text'
+
+    # The stream handler only ever runs on the listener thread
+    stream_handler = logging.StreamHandler()
+    if structured:
+        stream_handler.setFormatter(StructuredFormatter())
+    else:
+        stream_handler.setFormatter(logging.Formatter(
+            '%(asctime)s %(levelname)s %(name)s: %(message)s'))
+
+    # Sample before enqueueing so dropped records cost nothing downstream
+    queue_handler = logging.handlers.QueueHandler(queue.SimpleQueue())
+    queue_handler.addFilter(DebugSamplingFilter(debug_sample_rate))
+
+    logger.setLevel(level)
+    logger.addHandler(queue_handler)
+    logger.propagate = False
+
+    _listener = logging.handlers.QueueListener(
+        queue_handler.queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_stop_listener)
+
+    return logger
+
+
+def _stop_listener():
+    if _listener is not None:
+        _listener.stop()
+
+
+def _restart_listener_after_fork():
+    # Only the forking thread survives fork(), so a child (e.g. a prefork
+    # worker) needs its own listener or its records would pile up unread
+    global _listener
+    if _listener is None:
+        return
+    _listener = logging.handlers.QueueListener(
+        _listener.queue, *_listener.handlers,
+        respect_handler_level=_listener.respect_handler_level)
+    _listener.start()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_restart_listener_after_fork)
+
+
+def get_logger(name):
+    """
+    Get a child of the package logger.
+
+    Args:
+        name: Name of the module or component
+
+    Returns:
+        logger: logging.Logger instance
+    """
+    return logging.getLogger(f'{LOGGER_NAME}.{name}')
+
+
+class RequestLog:
+    """
+    Collects stage timings and the outcome of a single request and emits them
+    as one structured INFO record when the request finishes.
+    """
+
+    def __init__(self, logger, endpoint, request_id=None):
+        self.logger = logger
+        self.endpoint = endpoint
+        self.request_id = request_id or uuid.uuid4().hex[:16]
+        self.stages = {}
+        self.outcome = None
+        self.fields = {}
+        self._start = time.perf_counter()
+
+    @contextmanager
+    def stage(self, name):
+        """
+        Time a stage of the request pipeline in milliseconds.
+
+        Repeated stages (e.g. one per image of a batch) add up.
+
+        Args:
+            name: Name of the stage (e.g. 'decode', 'detect', 'classify')
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = self.stages.get(name, 0.0) + (time.perf_counter() - start) * 1000
+
+    def server_timing(self):
+        """
+        Returns:
+            The stage timings as a Server-Timing header value
+        """
+        return ', '.join(f'{name};dur={ms:.3f}' for name, ms in self.stages.items())
+
+    def elapsed_ms(self):
+        """
+        Returns:
+            Milliseconds since the request started
+        """
+        return (time.perf_counter() - self._start) * 1000
+
+    def finish(self, outcome=None, **fields):
+        """
+        Emit the request record. Does nothing when INFO is disabled.
+
+        Args:
+            outcome: Final outcome of the request (overrides any outcome set earlier)
+            **fields: Extra structured fields to include
+        """
+        if outcome is not None:
+            self.outcome = outcome
+        if not self.logger.isEnabledFor(logging.INFO):
+            return
+
+        record = {
+            'request_id': self.request_id,
+            'endpoint': self.endpoint,
+            'outcome': self.outcome,
+            'total_ms': round(self.elapsed_ms(), 3),
+            'stages_ms': {name: round(ms, 3) for name, ms in self.stages.items()}
+        }
+        record.update(self.fields)
+        record.update(fields)
+        self.logger.info('request', extra={'fields': record})
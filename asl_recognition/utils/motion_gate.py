@@ -0,0 +1,178 @@
+import collections
+import os
+import threading
+import time
+
+import numpy as np
+
+
+class _SessionState:
+    __slots__ = ('vector', 'prediction', 'reused_since_refresh', 'refreshed_at',
+                 'frames', 'classified', 'reused')
+
+    def __init__(self):
+        self.vector = None
+        self.prediction = None
+        self.reused_since_refresh = 0
+        self.refreshed_at = 0.0
+        self.frames = 0
+        self.classified = 0
+        self.reused = 0
+
+
+class MotionGate:
+    """
+    Per-session temporal reuse of predictions.
+
+    While a user holds a sign, consecutive frames produce almost the same
+    normalized landmarks. If a new vector is within threshold of the vector
+    that was last classified for the session, the cached prediction is
+    returned instead of calling the classifier. A real classification is forced
+    after refresh_frames reused frames or refresh_ms milliseconds.
+
+    Distance is the mean displacement of the 21 landmarks in normalized units
+    (the wrist to middle-finger-MCP distance is 1). Sessions are kept in LRU
+    order and the oldest are dropped beyond max_sessions.
+    """
+
+    def __init__(self, threshold=0.05, refresh_frames=10, refresh_ms=1000, max_sessions=1024):
+        """
+        Initialize the gate.
+
+        Args:
+            threshold: Maximum mean landmark displacement for reuse (0 disables reuse)
+            refresh_frames: Force a classification after this many reused frames
+            refresh_ms: Force a classification after this many milliseconds
+            max_sessions: Maximum number of sessions to keep
+        """
+        self.threshold = threshold
+        self.refresh_frames = refresh_frames
+        self.refresh_ms = refresh_ms
+        self.max_sessions = max_sessions
+
+        self._sessions = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls):
+        """
+        Create a gate configured from ASL_MOTION_THRESHOLD, ASL_MOTION_REFRESH_FRAMES,
+        ASL_MOTION_REFRESH_MS and ASL_MOTION_MAX_SESSIONS.
+
+        Returns:
+            MotionGate instance
+        """
+        return cls(
+            threshold=float(os.environ.get('ASL_MOTION_THRESHOLD', '0.05')),
+            refresh_frames=int(os.environ.get('ASL_MOTION_REFRESH_FRAMES', '10')),
+            refresh_ms=float(os.environ.get('ASL_MOTION_REFRESH_MS', '1000')),
+            max_sessions=int(os.environ.get('ASL_MOTION_MAX_SESSIONS', '1024')))
+
+    @property
+    def enabled(self):
+        return self.threshold > 0
+
+    @staticmethod
+    def distance(a, b):
+        """
+        Mean per-landmark displacement between two flattened landmark vectors.
+
+        Args:
+            a: Flattened landmarks (63,)
+            b: Flattened landmarks (63,)
+
+        Returns:
+            Mean Euclidean distance between corresponding landmarks
+        """
+        return float(np.linalg.norm((a - b).reshape(-1, 3), axis=1).mean())
+
+    def lookup(self, session_id, vector):
+        """
+        Return the cached prediction for the session if the hand has not moved
+        and no refresh is due. Counts the frame either way.
+
+        Args:
+            session_id: Client-provided session identifier
+            vector: Normalized landmark vector of the new frame
+
+        Returns:
+            Cached prediction, or None if the frame must be classified
+        """
+        now = time.monotonic()
+        with self._lock:
+            state = self._sessions.get(session_id)
+            if state is None:
+                state = _SessionState()
+                self._sessions[session_id] = state
+                while len(self._sessions) > self.max_sessions:
+                    self._sessions.popitem(last=False)
+            else:
+                self._sessions.move_to_end(session_id)
+
+            state.frames += 1
+
+            if (state.vector is None
+                    or state.reused_since_refresh >= self.refresh_frames
+                    or (now - state.refreshed_at) * 1000 >= self.refresh_ms
+                    or self.distance(vector, state.vector) > self.threshold):
+                return None
+
+            state.reused_since_refresh += 1
+            state.reused += 1
+            return state.prediction
+
+    def store(self, session_id, vector, prediction):
+        """
+        Record a freshly classified frame for the session.
+
+        Args:
+            session_id: Client-provided session identifier
+            vector: Normalized landmark vector that was classified
+            prediction: Classifier output for the vector
+        """
+        with self._lock:
+            state = self._sessions.get(session_id)
+            if state is None:
+                return
+            state.vector = vector
+            state.prediction = prediction
+            state.reused_since_refresh = 0
+            state.refreshed_at = time.monotonic()
+            state.classified += 1
+
+    def session_stats(self, session_id):
+        """
+        Args:
+            session_id: Client-provided session identifier
+
+        Returns:
+            Dictionary of counters for the session, or None if unknown
+        """
+        with self._lock:
+            state = self._sessions.get(session_id)
+            if state is None:
+                return None
+            return {
+                'frames': state.frames,
+                'classified': state.classified,
+                'reused': state.reused,
+                'skipped_fraction': round(state.reused / state.frames, 4) if state.frames else 0.0
+            }
+
+    def stats(self):
+        """
+        Returns:
+            Dictionary with configuration and counters summed over all sessions
+        """
+        with self._lock:
+            frames = sum(state.frames for state in self._sessions.values())
+            reused = sum(state.reused for state in self._sessions.values())
+            return {
+                'threshold': self.threshold,
+                'refresh_frames': self.refresh_frames,
+                'refresh_ms': self.refresh_ms,
+                'sessions': len(self._sessions),
+                'frames': frames,
+                'reused': reused,
+                'skipped_fraction': round(reused / frames, 4) if frames else 0.0
+            }
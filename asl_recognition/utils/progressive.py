@@ -0,0 +1,171 @@
+import os
+import time
+
+import numpy as np
+
+from .landmark_extraction import (list_dataset_images, iter_image_landmarks,
+                                  normalize_landmarks, mp_hands)
+from .landmark_store import save_landmark_dataset
+
+
+def stratified_orders(image_labels, random_state=42):
+    """
+    Shuffle the images of every class independently.
+
+    Taking the first n images of each order gives a stratified random sample,
+    and larger samples contain the smaller ones, so growing a sample only
+    needs the new images.
+
+    Args:
+        image_labels: Label of each image
+        random_state: Seed of the shuffle
+
+    Returns:
+        Dictionary mapping each label to a shuffled numpy array of image indices
+    """
+    rng = np.random.default_rng(random_state)
+    image_labels = np.asarray(image_labels)
+    return {label: rng.permutation(np.flatnonzero(image_labels == label))
+            for label in np.unique(image_labels)}
+
+
+def progressive_extraction(data_dir, output_path, model_type='random_forest', initial_per_class=100,
+                           growth=2.0, val_per_class=200, tolerance=0.001, patience=1,
+                           max_per_class=None, label_mapping=None, n_readers=2, n_decoders=2,
+                           reduce_factor=1, random_state=42):
+    """
+    Extract landmarks from a growing stratified sample until accuracy plateaus.
+
+    A fixed validation sample of val_per_class images per class is extracted
+    first. Training then starts from initial_per_class images per class; after
+    every round a fresh model is trained and scored on the validation sample,
+    and the sample grows by the factor growth (extracting only the new
+    images). Extraction stops once accuracy has improved by less than
+    tolerance over the best round for patience rounds in a row, or when the
+    images run out.
+
+    Args:
+        data_dir: Directory containing subdirectories of images, where
+                 each subdirectory name is the label
+        output_path: Path to save the dataset of every extracted sample
+        model_type: Backend trained in each round (see models.backends)
+        initial_per_class: Training images per class in the first round
+        growth: Factor the per-class sample grows by between rounds
+        val_per_class: Validation images per class
+        tolerance: Smallest accuracy gain that counts as an improvement
+        patience: Rounds without improvement before stopping
+        max_per_class: Optional cap on training images per class
+        label_mapping: Dictionary mapping directory names to label indices
+        n_readers: Number of file reader threads (see iter_image_landmarks)
+        n_decoders: Number of decoder threads
+        reduce_factor: Decode at 1/reduce_factor resolution
+        random_state: Seed of the sampling
+
+    Returns:
+        X: numpy array of the extracted landmarks (training and validation)
+        y: numpy array of labels
+        curve: list of dictionaries, one per round, with per_class,
+               images_extracted, fraction_extracted, train_samples,
+               val_accuracy, extract_time and train_time
+    """
+    from asl_recognition.models.backends import create_model
+
+    image_paths, image_labels, label_mapping = list_dataset_images(data_dir, label_mapping)
+    n_images = len(image_paths)
+    orders = stratified_orders(image_labels, random_state)
+
+    hands = mp_hands.Hands(
+        static_image_mode=True,
+        max_num_hands=1,
+        min_detection_confidence=0.5)
+
+    # Normalized landmarks (or None) of every image extracted so far
+    extracted = {}
+
+    def extract(indices):
+        paths = [image_paths[i] for i in indices]
+        for position, landmarks in iter_image_landmarks(paths, hands, n_readers=n_readers,
+                                                        n_decoders=n_decoders,
+                                                        reduce_factor=reduce_factor):
+            extracted[indices[position]] = (normalize_landmarks(landmarks)
+                                            if landmarks is not None else None)
+
+    def samples(indices):
+        kept = [i for i in sorted(indices) if extracted[i] is not None]
+        return (np.array([extracted[i] for i in kept]).reshape(-1, 63),
+                np.array([image_labels[i] for i in kept]))
+
+    # Fixed validation sample, at most half of each class
+    val_indices = []
+    pools = {}
+    for label, order in orders.items():
+        n_val = min(val_per_class, len(order) // 2)
+        val_indices.extend(order[:n_val].tolist())
+        pools[label] = order[n_val:]
+    extract(val_indices)
+    X_val, y_val = samples(val_indices)
+    print(f"Validation sample: {len(X_val)} samples from {len(val_indices)} images")
+
+    curve = []
+    train_indices = []
+    per_class = 0
+    target = initial_per_class
+    best_accuracy = None
+    rounds_without_gain = 0
+    largest_pool = max(len(pool) for pool in pools.values())
+    if max_per_class is not None:
+        largest_pool = min(largest_pool, max_per_class)
+
+    while per_class < largest_pool:
+        next_per_class = min(int(target), largest_pool)
+
+        # Extract only the images this round adds
+        start = time.perf_counter()
+        new_indices = [i for pool in pools.values() for i in pool[per_class:next_per_class].tolist()]
+        extract(new_indices)
+        extract_time = time.perf_counter() - start
+        train_indices.extend(new_indices)
+        per_class = next_per_class
+
+        # Train a fresh model on the current sample and validate it
+        X_train, y_train = samples(train_indices)
+        start = time.perf_counter()
+        model = create_model(model_type)
+        model.fit(X_train, y_train)
+        train_time = time.perf_counter() - start
+        accuracy = float(model.score(X_val, y_val))
+
+        curve.append({
+            'round': len(curve) + 1,
+            'per_class': per_class,
+            'images_extracted': len(extracted),
+            'fraction_extracted': len(extracted) / n_images,
+            'train_samples': len(X_train),
+            'val_accuracy': accuracy,
+            'extract_time': extract_time,
+            'train_time': train_time
+        })
+        print(f"Round {len(curve)}: {per_class} images/class, {len(extracted)}/{n_images} images "
+              f"extracted ({len(extracted) / n_images:.1%}), validation accuracy {accuracy:.4f}")
+
+        # Stop once accuracy has plateaued
+        if best_accuracy is not None and accuracy - best_accuracy < tolerance:
+            rounds_without_gain += 1
+            if rounds_without_gain >= patience:
+                print(f"Accuracy plateaued (gain below {tolerance} for {patience} round(s)).")
+                break
+        else:
+            rounds_without_gain = 0
+        best_accuracy = accuracy if best_accuracy is None else max(best_accuracy, accuracy)
+        target *= growth
+
+    # Save every extracted sample, in file order
+    X, y = samples(list(extracted))
+    os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+    save_landmark_dataset(output_path, X, y, label_mapping)
+
+    failed = sum(landmarks is None for landmarks in extracted.values())
+    print(f"Dataset created with {len(X)} samples from {len(extracted)} of {n_images} images "
+          f"({failed} without a detected hand).")
+
+    return X, y, curve
@@ -0,0 +1,140 @@
+import base64
+import json
+
+import numpy as np
+from fastapi.responses import Response
+
+# Optional fast encoders; fall back to the standard library when missing
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+# Supported landmark payload formats
+LANDMARK_FORMATS = ('dicts', 'flat', 'packed', 'none')
+
+JSON_MEDIA_TYPE = 'application/json'
+MSGPACK_MEDIA_TYPES = ('application/msgpack', 'application/x-msgpack')
+
+
+def encode_landmarks(landmarks_array, landmark_format='dicts', binary=False):
+    """
+    Encode raw hand landmarks for a response body.
+
+    Args:
+        landmarks_array: numpy array of shape (21, 3) or None if no hand was found
+        landmark_format: One of LANDMARK_FORMATS:
+                         'dicts'  - list of {x, y, z, index} dicts (default, verbose)
+                         'flat'   - flat list of 63 floats (x0, y0, z0, x1, ...)
+                         'packed' - 63 little-endian float32 values (252 bytes),
+                                    base64-encoded unless the body is binary
+                         'none'   - no landmarks
+        binary: Whether the body encoding can carry raw bytes (MessagePack)
+
+    Returns:
+        Encoded landmarks
+    """
+    if landmark_format not in LANDMARK_FORMATS:
+        raise ValueError(f"Unsupported landmark format: {landmark_format}")
+
+    if landmarks_array is None or landmark_format == 'none':
+        return []
+
+    if landmark_format == 'flat':
+        return landmarks_array.ravel().tolist()
+
+    if landmark_format == 'packed':
+        packed = np.ascontiguousarray(landmarks_array, dtype='<f4').tobytes()
+        return packed if binary else base64.b64encode(packed).decode('ascii')
+
+    # One tolist() call instead of 63 float() conversions
+    return [
+        {"x": x, "y": y, "z": z, "index": i}
+        for i, (x, y, z) in enumerate(landmarks_array.tolist())
+    ]
+
+
+def wants_msgpack(accept):
+    """
+    Check whether the client asked for a MessagePack body.
+
+    Args:
+        accept: Value of the Accept header (may be None)
+
+    Returns:
+        True if MessagePack was requested and msgpack is installed
+    """
+    if msgpack is None or not accept:
+        return False
+    return any(media_type in accept for media_type in MSGPACK_MEDIA_TYPES)
+
+
+def encode_response(payload, landmark_format='dicts', accept=None, headers=None, status_code=200):
+    """
+    Serialize a prediction directly to a response, skipping FastAPI's
+    response_model validation.
+
+    Args:
+        payload: Prediction dictionary; its 'landmarks' entry holds the raw
+                 (21, 3) landmarks array or None
+        landmark_format: Landmark format (see encode_landmarks)
+        accept: Value of the Accept header, used to choose JSON or MessagePack
+        headers: Extra response headers
+        status_code: HTTP status code
+
+    Returns:
+        fastapi Response with a JSON or MessagePack body
+    """
+    binary = wants_msgpack(accept)
+
+    body = dict(payload)
+    body['landmarks'] = encode_landmarks(payload.get('landmarks'), landmark_format, binary)
+
+    return _serialize(body, binary, headers, status_code)
+
+
+def encode_batch_response(payloads, landmark_format='dicts', accept=None, headers=None,
+                          status_code=200):
+    """
+    Serialize the predictions of a batch request as {"results": [...]}, in
+    the same encoding encode_response would pick.
+
+    Args:
+        payloads: List of prediction dictionaries (see encode_response)
+        landmark_format: Landmark format (see encode_landmarks)
+        accept: Value of the Accept header, used to choose JSON or MessagePack
+        headers: Extra response headers
+        status_code: HTTP status code
+
+    Returns:
+        fastapi Response with a JSON or MessagePack body
+    """
+    binary = wants_msgpack(accept)
+
+    results = []
+    for payload in payloads:
+        body = dict(payload)
+        body['landmarks'] = encode_landmarks(payload.get('landmarks'), landmark_format, binary)
+        results.append(body)
+
+    return _serialize({'results': results}, binary, headers, status_code)
+
+
+def _serialize(body, binary, headers, status_code):
+    if binary:
+        content = msgpack.packb(body, use_bin_type=True)
+        media_type = MSGPACK_MEDIA_TYPES[0]
+    elif orjson is not None:
+        content = orjson.dumps(body)
+        media_type = JSON_MEDIA_TYPE
+    else:
+        content = json.dumps(body, separators=(',', ':')).encode('utf-8')
+        media_type = JSON_MEDIA_TYPE
+
+    return Response(content=content, status_code=status_code,
+                    media_type=media_type, headers=headers)
@@ -0,0 +1,403 @@
+import asyncio
+import hashlib
+import json
+import os
+import queue
+import random
+import struct
+import threading
+import time
+
+import numpy as np
+
+from .degradation import encoded_image_size
+
+# Traffic logs start with FILE_MAGIC, followed by records of
+# <u32 header length><u32 payload length><JSON header><payload>
+FILE_MAGIC = b'ASLTRAF1'
+RECORD_PREFIX = struct.Struct('<II')
+
+# What the payload of a record holds
+RECORD_MODES = ('images', 'landmarks')
+
+
+def anonymize(value):
+    """
+    Hash a session or client identifier so records keep their grouping but
+    not the identifier itself.
+
+    Args:
+        value: Identifier, or None
+
+    Returns:
+        Short hex digest, or None
+    """
+    if value is None:
+        return None
+    return hashlib.blake2b(str(value).encode('utf-8'), digest_size=6).hexdigest()
+
+
+def result_outcome(result):
+    """
+    Outcome of a prediction result, for requests without their own RequestLog
+    outcome (the images of a batch).
+
+    Args:
+        result: Prediction dictionary, or None
+
+    Returns:
+        'ok', 'no_hand', 'invalid_image' or 'server_error'
+    """
+    if result is None:
+        return 'server_error'
+    if 'error' in result:
+        return 'invalid_image'
+    return 'ok' if result['has_hand'] else 'no_hand'
+
+
+class TrafficRecorder:
+    """
+    Samples API requests into a compact local traffic log for offline replay.
+
+    Each sampled request becomes one record: a JSON header with its timestamp,
+    endpoint, anonymized session and client, outcome, per-stage timings,
+    prediction and image size and format, followed by a payload holding the
+    encoded image ('images' mode) or only the 21x3 landmarks as float32
+    ('landmarks' mode, which keeps no picture of the user). Records are
+    written by a background thread; when it falls behind, records are dropped
+    rather than slowing requests down. Recording stops once the log reaches
+    max_bytes.
+
+    The log is opened on the first record, after any fork. With several
+    worker processes, put {pid} in the path so each worker writes its own
+    log; load_traffic merges them.
+    """
+
+    def __init__(self, path=None, sample_rate=0.0, mode='landmarks', max_bytes=1 << 30,
+                 queue_size=1024):
+        """
+        Initialize the recorder.
+
+        Args:
+            path: Log file path, may contain {pid} (None disables recording)
+            sample_rate: Fraction of requests to record
+            mode: 'images' to store the images, 'landmarks' to store only landmarks
+            max_bytes: Size at which the log stops growing
+            queue_size: Records that may wait for the writer thread
+        """
+        if mode not in RECORD_MODES:
+            raise ValueError(f"Unsupported record mode: {mode}")
+
+        self.path = path
+        self.sample_rate = sample_rate
+        self.mode = mode
+        self.max_bytes = max_bytes
+
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._thread = None
+        self._lock = threading.Lock()
+
+        # Counters
+        self.recorded = 0
+        self.dropped = 0
+        self.bytes_written = 0
+
+    @classmethod
+    def from_env(cls):
+        """
+        Create a recorder configured from ASL_RECORD_PATH, ASL_RECORD_SAMPLE_RATE,
+        ASL_RECORD_MODE and ASL_RECORD_MAX_MB.
+
+        Returns:
+            TrafficRecorder instance
+        """
+        return cls(
+            path=os.environ.get('ASL_RECORD_PATH') or None,
+            sample_rate=float(os.environ.get('ASL_RECORD_SAMPLE_RATE', '0.01')),
+            mode=os.environ.get('ASL_RECORD_MODE', 'landmarks'),
+            max_bytes=int(float(os.environ.get('ASL_RECORD_MAX_MB', '1024')) * (1 << 20)))
+
+    @property
+    def enabled(self):
+        return self.path is not None and self.sample_rate > 0
+
+    def sample(self):
+        """
+        Decide whether to record the current request.
+
+        Returns:
+            True if the request should be recorded
+        """
+        return self.enabled and random.random() < self.sample_rate
+
+    def record(self, request_log, image_data, result, session_id=None, client_id=None,
+               content_type=None, batch_index=None):
+        """
+        Queue a record of a finished request (or of one image of a batch).
+
+        Args:
+            request_log: RequestLog of the request, after finish()
+            image_data: Encoded image bytes
+            result: Prediction dictionary, or None if the request failed
+            session_id: X-Session-ID of the request, or None
+            client_id: Client identifier used for admission, or None
+            content_type: Media type of the upload, or None
+            batch_index: Position of the image in a batch request, or None
+        """
+        total_ms = request_log.elapsed_ms()
+        header = {
+            'ts': time.time() - total_ms / 1000,
+            'endpoint': request_log.endpoint,
+            'request_id': request_log.request_id,
+            'session': anonymize(session_id),
+            'client': anonymize(client_id),
+            'outcome': request_log.outcome if batch_index is None else result_outcome(result),
+            'total_ms': round(total_ms, 3),
+            'stages_ms': {name: round(ms, 3) for name, ms in request_log.stages.items()},
+            'degradation_level': request_log.fields.get('degradation_level'),
+            'batch_index': batch_index,
+            'content_type': content_type,
+            'image_bytes': len(image_data),
+            'image_size': encoded_image_size(image_data),
+            'sign': result.get('sign') if result else None,
+            'confidence': result.get('confidence') if result else None,
+            'has_hand': result.get('has_hand') if result else None
+        }
+
+        if self.mode == 'images':
+            payload = bytes(image_data)
+            header['payload'] = 'image'
+        elif result is not None and result.get('landmarks') is not None:
+            payload = np.ascontiguousarray(result['landmarks'], dtype='<f4').tobytes()
+            header['payload'] = 'landmarks'
+        else:
+            payload = b''
+            header['payload'] = 'none'
+
+        self._ensure_started()
+        try:
+            self._queue.put_nowait((header, payload))
+        except queue.Full:
+            self.dropped += 1
+
+    def stats(self):
+        """
+        Returns:
+            Dictionary with the configuration and counters
+        """
+        return {
+            'enabled': self.enabled,
+            'mode': self.mode,
+            'sample_rate': self.sample_rate,
+            'recorded': self.recorded,
+            'dropped': self.dropped,
+            'bytes_written': self.bytes_written
+        }
+
+    def _ensure_started(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='traffic-recorder',
+                                                daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        path = self.path.format(pid=os.getpid())
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path, 'ab') as f:
+            if f.tell() == 0:
+                f.write(FILE_MAGIC)
+            self.bytes_written = f.tell()
+
+            while True:
+                header, payload = self._queue.get()
+                encoded = json.dumps(header, separators=(',', ':')).encode('utf-8')
+                size = RECORD_PREFIX.size + len(encoded) + len(payload)
+                if self.bytes_written + size > self.max_bytes:
+                    self.dropped += 1
+                    continue
+                f.write(RECORD_PREFIX.pack(len(encoded), len(payload)))
+                f.write(encoded)
+                f.write(payload)
+                # Keep the log readable while the server runs
+                f.flush()
+                self.bytes_written += size
+                self.recorded += 1
+
+
+def read_traffic(path):
+    """
+    Read the records of a traffic log.
+
+    A record cut short (e.g. by a crash while writing) ends the log.
+
+    Args:
+        path: Log file path
+
+    Yields:
+        (header, payload) tuples; payload is image bytes, a (21, 3) float32
+        landmarks array or None, according to header['payload']
+    """
+    with open(path, 'rb') as f:
+        if f.read(len(FILE_MAGIC)) != FILE_MAGIC:
+            raise ValueError(f"{path} is not a traffic log")
+        while True:
+            prefix = f.read(RECORD_PREFIX.size)
+            if len(prefix) < RECORD_PREFIX.size:
+                return
+            header_length, payload_length = RECORD_PREFIX.unpack(prefix)
+            encoded = f.read(header_length)
+            payload = f.read(payload_length)
+            if len(encoded) < header_length or len(payload) < payload_length:
+                return
+            header = json.loads(encoded)
+            if header['payload'] == 'landmarks':
+                payload = np.frombuffer(payload, dtype='<f4').reshape(21, 3)
+            elif header['payload'] == 'none':
+                payload = None
+            yield header, payload
+
+
+def load_traffic(paths):
+    """
+    Load and merge traffic logs in request order.
+
+    Args:
+        paths: List of log file paths
+
+    Returns:
+        List of (header, payload) tuples sorted by timestamp
+    """
+    records = [record for path in paths for record in read_traffic(path)]
+    records.sort(key=lambda record: record[0]['ts'])
+    return records
+
+
+async def replay_traffic(records, send, speed=1.0, concurrency=None):
+    """
+    Send recorded requests again with their original spacing.
+
+    Args:
+        records: List of (header, payload) tuples from load_traffic
+        send: Coroutine function taking (header, payload) and returning a
+              dictionary with outcome, sign and stages_ms, or None to skip
+              the record
+        speed: Replay speed relative to the recording (2.0 is twice as fast);
+               0 sends as fast as concurrency allows
+        concurrency: Maximum requests in flight (default: unlimited, except
+                     at speed 0 where it defaults to 1)
+
+    Returns:
+        List of replayed records: the recorded header under 'recorded' and
+        the new latency_ms (from the scheduled time), lag_ms (how late it
+        was sent), outcome, sign and stages_ms
+    """
+    if not records:
+        return []
+    if speed == 0 and concurrency is None:
+        concurrency = 1
+    slots = asyncio.Semaphore(concurrency) if concurrency else None
+
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    first_ts = records[0][0]['ts']
+    replayed = []
+
+    async def replay_one(header, payload, scheduled):
+        if slots is not None and speed > 0:
+            await slots.acquire()
+        try:
+            sent = loop.time()
+            result = await send(header, payload)
+            finished = loop.time()
+        finally:
+            if slots is not None:
+                slots.release()
+        if result is None:
+            return
+        replayed.append(dict(result, recorded=header,
+                             lag_ms=(sent - scheduled) * 1000,
+                             latency_ms=(finished - scheduled) * 1000))
+
+    tasks = []
+    for header, payload in records:
+        if speed > 0:
+            # Wait until the record's time in the (scaled) recording
+            scheduled = start + (header['ts'] - first_ts) / speed
+            delay = scheduled - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+        else:
+            # As fast as possible: send as soon as a slot is free
+            await slots.acquire()
+            scheduled = loop.time()
+        tasks.append(loop.create_task(replay_one(header, payload, scheduled)))
+    await asyncio.gather(*tasks)
+    return replayed
+
+
+def percentiles(values, points=(50, 95, 99)):
+    """
+    Args:
+        values: List of numbers
+
+    Returns:
+        Dictionary mapping 'p50' etc. to rounded percentiles, or None if empty
+    """
+    if not values:
+        return None
+    return {f'p{point}': round(float(np.percentile(values, point)), 3) for point in points}
+
+
+def summarize_replay(replayed, wall_time):
+    """
+    Compare a replay with the recording it came from.
+
+    Args:
+        replayed: List returned by replay_traffic
+        wall_time: Duration of the replay in seconds
+
+    Returns:
+        Dictionary with throughput, recorded and replayed latency and stage
+        percentiles, outcome counts, prediction agreement and send lag
+    """
+    recorded = [entry['recorded'] for entry in replayed]
+    stage_names = sorted({name for entry in replayed for name in entry['stages_ms']} |
+                         {name for header in recorded for name in header['stages_ms']})
+
+    outcomes = {}
+    for entry in replayed:
+        outcomes[entry['outcome']] = outcomes.get(entry['outcome'], 0) + 1
+
+    compared = [entry for entry in replayed
+                if entry['recorded']['sign'] is not None and entry['sign'] is not None]
+    agreement = (sum(entry['sign'] == entry['recorded']['sign'] for entry in compared) / len(compared)
+                 if compared else None)
+
+    # replayed is in completion order, not recording order
+    timestamps = [header['ts'] for header in recorded]
+    recorded_span = max(timestamps) - min(timestamps) if timestamps else 0.0
+    return {
+        'requests': len(replayed),
+        'recorded_seconds': round(recorded_span, 3),
+        'replay_seconds': round(wall_time, 3),
+        'throughput': round(len(replayed) / wall_time, 3) if wall_time > 0 else None,
+        'latency_ms': {
+            'recorded': percentiles([header['total_ms'] for header in recorded]),
+            'replayed': percentiles([entry['latency_ms'] for entry in replayed])
+        },
+        'stages_ms': {
+            name: {
+                'recorded': percentiles([header['stages_ms'][name] for header in recorded
+                                         if name in header['stages_ms']]),
+                'replayed': percentiles([entry['stages_ms'][name] for entry in replayed
+                                         if name in entry['stages_ms']])
+            }
+            for name in stage_names
+        },
+        'lag_ms': percentiles([entry['lag_ms'] for entry in replayed]),
+        'outcomes': outcomes,
+        'sign_agreement': agreement
+    }
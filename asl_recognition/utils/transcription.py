@@ -0,0 +1,247 @@
+import time
+
+import cv2
+import numpy as np
+
+from .landmark_extraction import landmarks_to_array, normalize_landmarks
+
+# Per-process state of transcription workers (see init_worker)
+_worker = {}
+
+
+def plan_segments(n_frames, fps, segment_seconds=60.0, overlap_seconds=2.0):
+    """
+    Split a video into segments that can be transcribed independently.
+
+    Each segment starts overlap_seconds before the frames it is responsible
+    for, so the tracker has warmed up by the time those frames arrive. Only
+    the frames a segment is responsible for are kept, so every frame appears
+    exactly once after merging.
+
+    Args:
+        n_frames: Number of frames in the video
+        fps: Frame rate of the video
+        segment_seconds: Length of the part of the video each segment owns
+        overlap_seconds: Warm-up frames processed before a segment's own frames
+
+    Returns:
+        List of (read_start, own_start, own_end) frame indices, own_end exclusive
+    """
+    segment_frames = max(1, int(round(segment_seconds * fps)))
+    overlap_frames = int(round(overlap_seconds * fps))
+
+    segments = []
+    for own_start in range(0, n_frames, segment_frames):
+        own_end = min(own_start + segment_frames, n_frames)
+        segments.append((max(0, own_start - overlap_frames), own_start, own_end))
+    return segments
+
+
+def init_worker(model_path, classifier_kind='full', min_detection_confidence=0.5,
+                min_tracking_confidence=0.5):
+    """
+    Load the classifier once per worker process.
+
+    Args:
+        model_path: Path to the trained model
+        classifier_kind: 'full' (ASLClassifier) or 'a_to_f' (ASLAtoFClassifier)
+        min_detection_confidence: MediaPipe detection threshold
+        min_tracking_confidence: MediaPipe tracking threshold
+    """
+    if classifier_kind == 'a_to_f':
+        from asl_recognition.models.a_to_f_classifier import ASLAtoFClassifier
+        classifier = ASLAtoFClassifier()
+    else:
+        from asl_recognition.models.classifier import ASLClassifier
+        classifier = ASLClassifier()
+    classifier.load(model_path, inference_only=True)
+
+    _worker['classifier'] = classifier
+    _worker['classifier_kind'] = classifier_kind
+    _worker['hands_kwargs'] = {
+        'static_image_mode': False,
+        'max_num_hands': 1,
+        'min_detection_confidence': min_detection_confidence,
+        'min_tracking_confidence': min_tracking_confidence
+    }
+
+
+def transcribe_segment(video_path, segment, frame_step=1, mirror=False):
+    """
+    Classify the frames of one segment in tracking mode.
+
+    Runs in a worker process initialized with init_worker. A fresh Hands
+    instance is created per segment so tracking state never leaks between
+    segments.
+
+    Args:
+        video_path: Path to the video
+        segment: (read_start, own_start, own_end) from plan_segments
+        frame_step: Classify every frame_step-th frame
+        mirror: Flip frames horizontally, as the live demo does
+
+    Returns:
+        List of (frame_index, label, confidence) for the segment's own frames;
+        label is None where no hand was found
+    """
+    import mediapipe as mp
+
+    read_start, own_start, own_end = segment
+    classifier = _worker['classifier']
+
+    cap = cv2.VideoCapture(video_path)
+    cap.set(cv2.CAP_PROP_POS_FRAMES, read_start)
+    frame_index = int(cap.get(cv2.CAP_PROP_POS_FRAMES))
+
+    results = []
+    with mp.solutions.hands.Hands(**_worker['hands_kwargs']) as hands:
+        while frame_index < own_end:
+            # Skipped frames are only grabbed, not decoded
+            if (frame_index - own_start) % frame_step:
+                if not cap.grab():
+                    break
+                frame_index += 1
+                continue
+
+            success, image = cap.read()
+            if not success:
+                break
+
+            if mirror:
+                image = cv2.flip(image, 1)
+
+            detection = hands.process(cv2.cvtColor(image, cv2.COLOR_BGR2RGB))
+            if frame_index >= own_start:
+                label, confidence = None, 0.0
+                if detection.multi_hand_landmarks:
+                    normalized_landmarks = normalize_landmarks(
+                        landmarks_to_array(detection.multi_hand_landmarks[0]))
+                    label, confidence = classifier.predict(normalized_landmarks)
+                    if _worker['classifier_kind'] == 'a_to_f' and str(label).isdigit():
+                        # The A-F model returns class indices (see a_to_f_api.LETTER_MAP)
+                        label = classifier.letters[int(label)]
+                results.append((frame_index, label, float(confidence)))
+
+            frame_index += 1
+
+    cap.release()
+    return results
+
+
+def build_timeline(frame_results, fps, min_duration=0.3, max_gap=0.2, min_confidence=0.6,
+                   frame_step=1):
+    """
+    Merge per-frame predictions into a debounced letter timeline.
+
+    Consecutive frames with the same label form a run; runs of the same label
+    separated by less than max_gap seconds (of no hand, or of other labels
+    too short to count) are joined. A run becomes a timeline entry if it lasts
+    at least min_duration seconds and its mean confidence reaches
+    min_confidence. Each classified frame stands for the frame_step frames
+    up to the next classified one.
+
+    Args:
+        frame_results: List of (frame_index, label, confidence), in any order
+        fps: Frame rate of the video
+        min_duration: Shortest run, in seconds, that counts as a letter
+        max_gap: Longest interruption, in seconds, inside one letter
+        min_confidence: Lowest mean confidence of a kept letter
+        frame_step: Spacing of the classified frames (see transcribe_video)
+
+    Returns:
+        List of dictionaries with letter, start, end (seconds), confidence
+        (mean over the run) and frames
+    """
+    frame_results = sorted(frame_results)
+    # Frames apart that still belong to one letter
+    max_gap_frames = max_gap * fps + frame_step
+
+    # Collapse frames into runs of the same label
+    runs = []
+    for frame_index, label, confidence in frame_results:
+        if label is None:
+            continue
+        if runs and runs[-1]['label'] == label and frame_index - runs[-1]['last'] <= max_gap_frames:
+            run = runs[-1]
+            run['last'] = frame_index
+            run['confidences'].append(confidence)
+        else:
+            runs.append({'label': label, 'first': frame_index, 'last': frame_index,
+                         'confidences': [confidence]})
+
+    # Drop flickers, then join runs of the same letter that they interrupted
+    min_frames = min_duration * fps
+    timeline = []
+    for run in runs:
+        duration_frames = run['last'] - run['first'] + frame_step
+        if duration_frames < min_frames or np.mean(run['confidences']) < min_confidence:
+            continue
+
+        previous = timeline[-1] if timeline else None
+        if (previous is not None and previous['label'] == run['label']
+                and run['first'] - previous['last'] <= max_gap_frames):
+            previous['last'] = run['last']
+            previous['confidences'].extend(run['confidences'])
+        else:
+            timeline.append(run)
+
+    return [{
+        'letter': run['label'],
+        'start': run['first'] / fps,
+        'end': (run['last'] + frame_step) / fps,
+        'confidence': float(np.mean(run['confidences'])),
+        'frames': len(run['confidences'])
+    } for run in timeline]
+
+
+def transcribe_video(video_path, model_path, classifier_kind='full', workers=None,
+                     segment_seconds=60.0, overlap_seconds=2.0, frame_step=1, mirror=False,
+                     progress=None):
+    """
+    Transcribe a video into per-frame predictions using worker processes.
+
+    Args:
+        video_path: Path to the video
+        model_path: Path to the trained model
+        classifier_kind: 'full' or 'a_to_f'
+        workers: Number of worker processes (default: CPU count)
+        segment_seconds: Length of each segment
+        overlap_seconds: Tracker warm-up before each segment
+        frame_step: Classify every frame_step-th frame
+        mirror: Flip frames horizontally
+        progress: Optional callable invoked with (segments_done, segments_total)
+
+    Returns:
+        frame_results: List of (frame_index, label, confidence), in frame order
+        info: Dictionary with fps, n_frames, n_segments and wall_time
+    """
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        raise ValueError(f"Could not open video: {video_path}")
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+    n_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    cap.release()
+
+    segments = plan_segments(n_frames, fps, segment_seconds, overlap_seconds)
+
+    start = time.perf_counter()
+    frame_results = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker,
+                             initargs=(model_path, classifier_kind)) as executor:
+        futures = [executor.submit(transcribe_segment, video_path, segment, frame_step, mirror)
+                   for segment in segments]
+        for done, future in enumerate(as_completed(futures), 1):
+            frame_results.extend(future.result())
+            if progress is not None:
+                progress(done, len(futures))
+
+    frame_results.sort()
+    info = {
+        'fps': fps,
+        'n_frames': n_frames,
+        'n_segments': len(segments),
+        'wall_time': time.perf_counter() - start
+    }
+    return frame_results, info
@@ -0,0 +1,414 @@
+import os
+import threading
+import time
+from collections import deque
+
+import cv2
+import numpy as np
+
+from .landmark_extraction import landmarks_to_array, normalize_landmarks
+
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp')
+
+
+class FrameDirectorySource:
+    """
+    Reads a directory of images in file-name order with the part of the
+    cv2.VideoCapture interface the demo uses.
+
+    Files that cannot be decoded are skipped (and counted in skipped), so
+    only the end of the list ends the stream.
+    """
+
+    def __init__(self, directory, fps=30.0):
+        """
+        Initialize the source.
+
+        Args:
+            directory: Directory containing the frames
+            fps: Frame rate the frames were captured at
+        """
+        self.paths = sorted(os.path.join(directory, f) for f in os.listdir(directory)
+                            if f.lower().endswith(IMAGE_EXTENSIONS))
+        self.fps = fps
+        self.index = 0
+        self.skipped = 0
+
+    def isOpened(self):
+        return self.index < len(self.paths)
+
+    def read(self):
+        while self.index < len(self.paths):
+            image = cv2.imread(self.paths[self.index])
+            self.index += 1
+            if image is not None:
+                return True, image
+            self.skipped += 1
+        return False, None
+
+    def get(self, prop):
+        if prop == cv2.CAP_PROP_FPS:
+            return self.fps
+        if prop == cv2.CAP_PROP_FRAME_COUNT:
+            return len(self.paths)
+        return 0
+
+    def release(self):
+        pass
+
+
+class PacedSource:
+    """
+    Delivers frames from a recorded source no faster than its frame rate, the
+    way a live camera would.
+    """
+
+    def __init__(self, source, fps):
+        """
+        Initialize the wrapper.
+
+        Args:
+            source: cv2.VideoCapture or FrameDirectorySource
+            fps: Replay frame rate
+        """
+        self.source = source
+        self.interval = 1.0 / fps
+        self._due = None
+
+    def isOpened(self):
+        return self.source.isOpened()
+
+    def read(self):
+        now = time.perf_counter()
+        if self._due is None:
+            self._due = now
+        elif self._due > now:
+            time.sleep(self._due - now)
+        self._due += self.interval
+        return self.source.read()
+
+    def get(self, prop):
+        return self.source.get(prop)
+
+    def release(self):
+        self.source.release()
+
+
+def open_replay_source(path, realtime=False, fps=None):
+    """
+    Open a video file or a directory of frames for replay.
+
+    Args:
+        path: Video file or directory of images
+        realtime: Deliver frames at the recording's frame rate instead of as
+                  fast as they can be decoded
+        fps: Frame rate override (directories default to 30)
+
+    Returns:
+        Source with isOpened(), read(), get() and release()
+    """
+    if os.path.isdir(path):
+        source = FrameDirectorySource(path, fps or 30.0)
+    else:
+        source = cv2.VideoCapture(path)
+
+    if realtime:
+        replay_fps = fps or source.get(cv2.CAP_PROP_FPS) or 30.0
+        source = PacedSource(source, replay_fps)
+
+    return source
+
+
+def infer_frame(hands, classifier, image, seq, captured_at):
+    """
+    Run hand detection and classification on one BGR frame.
+
+    Args:
+        hands: MediaPipe Hands object
+        classifier: ASLClassifier used for predictions
+        image: BGR frame (already flipped if needed)
+        seq: Frame sequence number
+        captured_at: time.perf_counter() when the frame was captured
+
+    Returns:
+        Dictionary with seq, captured_at, hand_landmarks (MediaPipe, for
+        drawing), label, confidence, and wait_ms, detect_ms, classify_ms and
+        latency_ms (capture to result)
+    """
+    start = time.perf_counter()
+
+    # Convert the image to RGB and detect the hand
+    image_rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+    results = hands.process(image_rgb)
+    detected = time.perf_counter()
+
+    result = {'seq': seq, 'captured_at': captured_at, 'hand_landmarks': None,
+              'label': None, 'confidence': None, 'classify_ms': None}
+    if results.multi_hand_landmarks:
+        result['hand_landmarks'] = results.multi_hand_landmarks[0]
+
+        # Normalize landmarks and make prediction
+        normalized_landmarks = normalize_landmarks(
+            landmarks_to_array(results.multi_hand_landmarks[0]))
+        result['label'], result['confidence'] = classifier.predict(normalized_landmarks)
+        result['classify_ms'] = (time.perf_counter() - detected) * 1000
+
+    done = time.perf_counter()
+    result['wait_ms'] = (start - captured_at) * 1000
+    result['detect_ms'] = (detected - start) * 1000
+    result['latency_ms'] = (done - captured_at) * 1000
+    return result
+
+
+def summarize_results(results, frames_read, wall_time):
+    """
+    Summarize per-frame results of a replay run.
+
+    Args:
+        results: List of dictionaries returned by infer_frame
+        frames_read: Number of frames delivered by the source
+        wall_time: Duration of the run in seconds
+
+    Returns:
+        Dictionary with frame counts, capture and inference FPS, the fraction of
+        frames with a detected hand, and p50/p95/p99 of each timing in ms
+    """
+    summary = {
+        'frames_read': frames_read,
+        'frames_inferred': len(results),
+        'wall_time_s': wall_time,
+        'capture_fps': frames_read / wall_time if wall_time > 0 else 0.0,
+        'inference_fps': len(results) / wall_time if wall_time > 0 else 0.0,
+        'hand_detected': (sum(r['label'] is not None for r in results) / len(results)
+                          if results else 0.0)
+    }
+
+    for name in ('wait_ms', 'detect_ms', 'classify_ms', 'latency_ms'):
+        values = [r[name] for r in results if r[name] is not None]
+        if values:
+            p50, p95, p99 = np.percentile(values, [50, 95, 99])
+            summary[name] = {'p50': float(p50), 'p95': float(p95), 'p99': float(p99)}
+
+    return summary
+
+
+class LatestFrame:
+    """
+    A single-slot buffer that only ever holds the newest frame.
+
+    Writers overwrite the slot, so a slow reader skips stale frames instead of
+    working through a backlog.
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._item = None
+        self._seq = 0
+        self.closed = False
+
+    def put(self, frame, timestamp):
+        """
+        Replace the held frame.
+
+        Args:
+            frame: Image (numpy array)
+            timestamp: time.perf_counter() when the frame was captured
+        """
+        with self._condition:
+            self._seq += 1
+            self._item = (self._seq, frame, timestamp)
+            self._condition.notify_all()
+
+    def get_newer(self, seq, timeout=None):
+        """
+        Wait for a frame newer than seq.
+
+        Args:
+            seq: Sequence number of the last frame the caller has seen (0 for none)
+            timeout: Maximum seconds to wait
+
+        Returns:
+            (seq, frame, timestamp), or None on timeout or once closed with no newer frame
+        """
+        with self._condition:
+            self._condition.wait_for(lambda: self._seq > seq or self.closed, timeout)
+            if self._seq > seq:
+                return self._item
+            return None
+
+    def close(self):
+        """Wake up waiting readers; no more frames will arrive."""
+        with self._condition:
+            self.closed = True
+            self._condition.notify_all()
+
+
+class PipelineStats:
+    """
+    Thread-safe rates and latencies of the pipeline stages over a sliding window.
+    """
+
+    def __init__(self, window=30):
+        """
+        Initialize the stats.
+
+        Args:
+            window: Number of recent events each rate and latency is averaged over
+        """
+        self.window = window
+        self._lock = threading.Lock()
+        self._ticks = {}
+        self._latencies = {}
+        self._counts = {}
+
+    def tick(self, stage, timestamp=None):
+        """
+        Count one event of a stage (e.g. a captured or classified frame).
+
+        Args:
+            stage: Stage name
+            timestamp: time.perf_counter() of the event (now if None)
+        """
+        with self._lock:
+            ticks = self._ticks.setdefault(stage, deque(maxlen=self.window))
+            ticks.append(time.perf_counter() if timestamp is None else timestamp)
+            self._counts[stage] = self._counts.get(stage, 0) + 1
+
+    def record(self, name, ms):
+        """
+        Record a latency sample.
+
+        Args:
+            name: Latency name
+            ms: Latency in milliseconds
+        """
+        with self._lock:
+            self._latencies.setdefault(name, deque(maxlen=self.window)).append(ms)
+
+    def snapshot(self):
+        """
+        Get the current rates and mean latencies.
+
+        Returns:
+            Dictionary with 'fps' (per stage), 'latency_ms' (per name) and
+            'frames' (total events per stage)
+        """
+        with self._lock:
+            fps = {}
+            for stage, ticks in self._ticks.items():
+                span = ticks[-1] - ticks[0] if len(ticks) > 1 else 0
+                fps[stage] = (len(ticks) - 1) / span if span > 0 else 0.0
+            latency_ms = {name: sum(values) / len(values)
+                          for name, values in self._latencies.items() if values}
+            return {'fps': fps, 'latency_ms': latency_ms, 'frames': dict(self._counts)}
+
+
+class RecognitionPipeline:
+    """
+    Runs capture and inference on their own threads for a live demo.
+
+    The capture thread reads frames as fast as the source delivers them and
+    keeps only the newest. The inference thread always takes the newest frame,
+    runs hand detection and classification, and publishes the result. A
+    renderer (the caller) draws the newest frame with the newest result, so
+    the display never waits for inference and inference never works on stale
+    frames.
+    """
+
+    def __init__(self, cap, hands, classifier, flip=True, stats_window=30, on_result=None):
+        """
+        Initialize the pipeline.
+
+        Args:
+            cap: cv2.VideoCapture (or any object with read() and isOpened())
+            hands: MediaPipe Hands object in video mode
+            classifier: ASLClassifier used for predictions
+            flip: Mirror frames horizontally (selfie view)
+            stats_window: Number of recent frames the overlay stats average over
+            on_result: Optional callable receiving every inference result
+        """
+        self.cap = cap
+        self.hands = hands
+        self.classifier = classifier
+        self.flip = flip
+        self.on_result = on_result
+
+        self.frames = LatestFrame()
+        self.stats = PipelineStats(stats_window)
+        self._result = None
+        self._result_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._threads = []
+
+    def start(self):
+        """Start the capture and inference threads."""
+        self._threads = [
+            threading.Thread(target=self._capture_loop, name='capture', daemon=True),
+            threading.Thread(target=self._inference_loop, name='inference', daemon=True)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self):
+        """Stop both threads and wait for them."""
+        self._stop.set()
+        self.frames.close()
+        for thread in self._threads:
+            thread.join()
+
+    @property
+    def running(self):
+        """Whether the capture thread is still delivering frames."""
+        return not self.frames.closed
+
+    def latest_result(self):
+        """
+        Get the newest inference result.
+
+        Returns:
+            Dictionary returned by infer_frame, or None before the first result
+        """
+        with self._result_lock:
+            return self._result
+
+    def _capture_loop(self):
+        while not self._stop.is_set() and self.cap.isOpened():
+            success, image = self.cap.read()
+            captured_at = time.perf_counter()
+            if not success:
+                # Camera failure, or the end of a replayed video
+                print("No more frames from the capture source.")
+                break
+
+            # Flip the image horizontally for a more intuitive selfie-view display
+            if self.flip:
+                image = cv2.flip(image, 1)
+
+            self.frames.put(image, captured_at)
+            self.stats.tick('capture', captured_at)
+
+        self.frames.close()
+
+    def _inference_loop(self):
+        seq = 0
+        while not self._stop.is_set():
+            item = self.frames.get_newer(seq, timeout=0.5)
+            if item is None:
+                if self.frames.closed:
+                    break
+                continue
+            seq, image, captured_at = item
+
+            result = infer_frame(self.hands, self.classifier, image, seq, captured_at)
+            self.stats.record('queue', result['wait_ms'])
+            self.stats.record('detect', result['detect_ms'])
+            if result['classify_ms'] is not None:
+                self.stats.record('classify', result['classify_ms'])
+            self.stats.record('inference_total', result['latency_ms'])
+            self.stats.tick('inference')
+
+            with self._result_lock:
+                self._result = result
+            if self.on_result is not None:
+                self.on_result(result)
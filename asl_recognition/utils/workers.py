@@ -0,0 +1,239 @@
+import gc
+import importlib
+import os
+import signal
+import socket
+import sys
+import time
+
+# Thread pools that size themselves from the environment when the library is
+# first imported; set them before numpy, scikit-learn or OpenCV are imported.
+# MediaPipe's own inference threads read none of these and are not capped
+THREAD_ENV_VARS = (
+    'OMP_NUM_THREADS',
+    'OPENBLAS_NUM_THREADS',
+    'MKL_NUM_THREADS',
+    'NUMEXPR_NUM_THREADS',
+    'VECLIB_MAXIMUM_THREADS'
+)
+
+
+def available_cpus():
+    """
+    Get the CPUs this process may run on.
+
+    Returns:
+        Sorted list of CPU ids
+    """
+    if hasattr(os, 'sched_getaffinity'):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def set_thread_env(n_threads):
+    """
+    Limit the native thread pools of the current process and its children.
+
+    Only takes effect for libraries imported afterwards.
+
+    Args:
+        n_threads: Threads each pool may use
+    """
+    for name in THREAD_ENV_VARS:
+        os.environ[name] = str(n_threads)
+
+
+def limit_opencv_threads(n_threads):
+    """
+    Limit OpenCV's thread pool if OpenCV is loaded.
+
+    Args:
+        n_threads: Threads OpenCV may use
+    """
+    cv2 = sys.modules.get('cv2')
+    if cv2 is not None:
+        cv2.setNumThreads(n_threads)
+
+
+def plan_cpu_sets(n_workers, cpus=None):
+    """
+    Split the CPUs into one disjoint set per worker.
+
+    With more workers than CPUs, workers share CPUs round-robin.
+
+    Args:
+        n_workers: Number of workers
+        cpus: CPU ids to split (default: available_cpus())
+
+    Returns:
+        List of n_workers sets of CPU ids
+    """
+    cpus = list(cpus) if cpus is not None else available_cpus()
+    if n_workers >= len(cpus):
+        return [{cpus[i % len(cpus)]} for i in range(n_workers)]
+
+    per_worker, extra = divmod(len(cpus), n_workers)
+    cpu_sets = []
+    start = 0
+    for i in range(n_workers):
+        end = start + per_worker + (1 if i < extra else 0)
+        cpu_sets.append(set(cpus[start:end]))
+        start = end
+    return cpu_sets
+
+
+def pin_to_cpus(cpus):
+    """
+    Restrict the current process to the given CPUs.
+
+    Args:
+        cpus: Set of CPU ids
+
+    Returns:
+        True if the process was pinned, False where affinity is not supported
+    """
+    if not hasattr(os, 'sched_setaffinity'):
+        return False
+    os.sched_setaffinity(0, cpus)
+    return True
+
+
+class PreforkServer:
+    """
+    Serves an ASGI app from several forked worker processes.
+
+    The parent imports the app module and calls its load_model() before
+    forking, so the model (and everything else imported) is shared by the
+    workers copy-on-write instead of loaded once per worker. Every worker runs
+    its own uvicorn server on the listening socket created by the parent, with
+    its native thread pools limited and, optionally, pinned to its own CPUs.
+    Workers that exit unexpectedly are restarted.
+    """
+
+    def __init__(self, app_module, host='0.0.0.0', port=8000, workers=None,
+                 threads_per_worker=None, pin_cpus=False, log_level='info'):
+        """
+        Initialize the server.
+
+        Args:
+            app_module: Name of the module defining app (and optionally load_model)
+            host: Interface to listen on
+            port: Port to listen on
+            workers: Number of worker processes (default: one per available CPU)
+            threads_per_worker: Native threads per worker (default: available
+                                CPUs divided by workers, at least 1)
+            pin_cpus: Pin each worker to its own share of the CPUs
+            log_level: uvicorn log level
+        """
+        cpus = available_cpus()
+        self.app_module = app_module
+        self.host = host
+        self.port = port
+        self.workers = workers or len(cpus)
+        self.threads_per_worker = threads_per_worker or max(1, len(cpus) // self.workers)
+        self.cpu_sets = plan_cpu_sets(self.workers, cpus) if pin_cpus else None
+        self.log_level = log_level
+
+        self.app = None
+        self._socket = None
+        self._children = {}
+        self._stopping = False
+
+    def preload(self):
+        """
+        Import the app and load its model in the parent process.
+        """
+        # Thread limits must be in place before numpy and OpenCV are imported
+        set_thread_env(self.threads_per_worker)
+
+        module = importlib.import_module(self.app_module)
+        if hasattr(module, 'load_model'):
+            try:
+                module.load_model()
+            except Exception as e:
+                # The workers' startup handlers try again and report the error
+                print(f"Could not preload the model: {e}")
+        self.app = module.app
+        limit_opencv_threads(self.threads_per_worker)
+
+        # Move everything loaded so far out of the garbage collector's reach, so
+        # collections in the workers do not write to (and un-share) those pages
+        gc.collect()
+        gc.freeze()
+
+    def run(self):
+        """
+        Preload, fork the workers and supervise them until interrupted.
+        """
+        if self.app is None:
+            self.preload()
+
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._socket.bind((self.host, self.port))
+        self._socket.listen(2048)
+        self._socket.set_inheritable(True)
+
+        print(f"Serving {self.app_module} on http://{self.host}:{self.port} with "
+              f"{self.workers} workers x {self.threads_per_worker} threads"
+              + (f", pinned to CPUs {[sorted(cpus) for cpus in self.cpu_sets]}"
+                 if self.cpu_sets else ""))
+
+        signal.signal(signal.SIGTERM, self._handle_stop)
+        signal.signal(signal.SIGINT, self._handle_stop)
+
+        for index in range(self.workers):
+            self._spawn(index)
+
+        while self._children:
+            try:
+                pid, status = os.wait()
+            except ChildProcessError:
+                break
+            except InterruptedError:
+                continue
+
+            index = self._children.pop(pid, None)
+            if index is not None and not self._stopping:
+                print(f"Worker {index} (pid {pid}) exited with status {status}; restarting")
+                time.sleep(1)
+                self._spawn(index)
+
+        self._socket.close()
+
+    def _handle_stop(self, signum, frame):
+        self._stopping = True
+        for pid in list(self._children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def _spawn(self, index):
+        pid = os.fork()
+        if pid:
+            self._children[pid] = index
+            return
+
+        # Worker process
+        exit_code = 0
+        try:
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            self._run_worker(index)
+        except BaseException:
+            import traceback
+            traceback.print_exc()
+            exit_code = 1
+        finally:
+            os._exit(exit_code)
+
+    def _run_worker(self, index):
+        import uvicorn
+
+        if self.cpu_sets is not None:
+            pin_to_cpus(self.cpu_sets[index])
+        limit_opencv_threads(self.threads_per_worker)
+
+        config = uvicorn.Config(self.app, log_level=self.log_level)
+        uvicorn.Server(config).run(sockets=[self._socket])